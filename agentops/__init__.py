@@ -126,6 +126,26 @@ def configure(**kwargs):
             - exporter: Custom span exporter for OpenTelemetry trace data
             - processor: Custom span processor for OpenTelemetry trace data
             - exporter_endpoint: Endpoint for the exporter
+            - spill_to_disk: Spill spans to a disk journal instead of dropping them when the export queue is full
+            - spill_dir: Directory for the span spill journal
+            - spill_max_bytes: Maximum disk usage of the span spill journal
+            - async_flush: Flush spans on a background thread instead of blocking when sessions end
+            - export_compression: Compression for exported spans (gzip, deflate, zstd or none)
+            - export_compression_level: Compression level for exported spans
+            - adaptive_export: Adapt export batch size and flush delay to load instead of using fixed values
+            - export_workers: Number of concurrent span export workers
+            - export_file_dir: Write spans to local files in this directory instead of the exporter endpoint
+            - tail_sample_rate: Fraction of uneventful sessions to export with tail sampling (disabled when unset)
+            - tail_sample_latency_threshold: Sessions lasting at least this many milliseconds are always kept by tail sampling
+            - tail_sample_token_threshold: Sessions using at least this many LLM tokens are always kept by tail sampling
+            - sample_rate: Fraction of traces sampled when they start (head sampling)
+            - span_rate_limits: Maximum spans per second keyed by span kind or span name prefix
+            - lazy_serialization: Serialize decorator inputs/outputs on the export thread instead of the caller's thread
+            - background_auth: Authenticate on a background thread so init() does not wait on the network; spans are buffered until then
+            - jwt_cache_dir: Directory caching the auth token for other processes on the host, so they skip the auth request
+            - compress_uploads: Send log and object uploads gzip-compressed (turn off for proxies that reject it)
+            - json_backend: JSON encoder used to serialize recorded values ('json' or 'orjson')
+            - disabled: Turn AgentOps off: init() does nothing and decorators apply no instrumentation
     """
     global _client
     
@@ -146,6 +166,26 @@ def configure(**kwargs):
         "exporter",
         "processor",
         "exporter_endpoint",
+        "spill_to_disk",
+        "spill_dir",
+        "spill_max_bytes",
+        "async_flush",
+        "export_compression",
+        "export_compression_level",
+        "adaptive_export",
+        "export_workers",
+        "export_file_dir",
+        "tail_sample_rate",
+        "tail_sample_latency_threshold",
+        "tail_sample_token_threshold",
+        "sample_rate",
+        "span_rate_limits",
+        "lazy_serialization",
+        "background_auth",
+        "jwt_cache_dir",
+        "compress_uploads",
+        "json_backend",
+        "disabled",
     }
 
     # Check for invalid parameters
@@ -1,5 +1,5 @@
 from .client import Client
-from .api import ApiClient
+from .api import ApiClient, AsyncApiClient
 
 
-__all__ = ["Client", "ApiClient"]
+__all__ = ["Client", "ApiClient", "AsyncApiClient"]
@@ -6,15 +6,15 @@ This module provides the client for the AgentOps API.
 
 from typing import Dict, Optional, Type, TypeVar, cast
 
-from agentops.client.api.base import BaseApiClient
+from agentops.client.api.base import AsyncBaseApiClient, BaseApiClient
 from agentops.client.api.types import AuthTokenResponse
-from agentops.client.api.versions.v3 import V3Client
-from agentops.client.api.versions.v4 import V4Client
+from agentops.client.api.versions.v3 import AsyncV3Client, V3Client
+from agentops.client.api.versions.v4 import AsyncV4Client, V4Client
 
 # Define a type variable for client classes
 T = TypeVar("T", bound=BaseApiClient)
 
-__all__ = ["ApiClient", "BaseApiClient", "AuthTokenResponse"]
+__all__ = ["ApiClient", "AsyncApiClient", "BaseApiClient", "AsyncBaseApiClient", "AuthTokenResponse"]
 
 
 class ApiClient:
@@ -69,3 +69,33 @@ class ApiClient:
         if version not in self._clients:
             self._clients[version] = client_class(self.endpoint)
         return cast(T, self._clients[version])
+
+
+class AsyncApiClient(ApiClient):
+    """
+    Master API client whose version-specific clients are asynchronous.
+
+    Mirrors ApiClient, but every request method is a coroutine backed by a
+    shared httpx connection pool, so it can be awaited from async code
+    without blocking the event loop.
+    """
+
+    @property
+    def v3(self) -> AsyncV3Client:  # type: ignore[override]
+        """
+        Get the async V3 API client.
+
+        Returns:
+            The async V3 API client
+        """
+        return self._get_client("v3", AsyncV3Client)
+
+    @property
+    def v4(self) -> AsyncV4Client:  # type: ignore[override]
+        """
+        Get the async V4 API client.
+
+        Returns:
+            The async V4 API client
+        """
+        return self._get_client("v4", AsyncV4Client)
@@ -4,11 +4,13 @@ Base API client classes for making HTTP requests.
 This module provides the foundation for all API clients in the AgentOps SDK.
 """
 
-from typing import Any, Dict, Optional, Protocol
+from typing import Any, AsyncIterable, Dict, Iterable, Optional, Protocol, Union
 
+import httpx
 import requests
 
 from agentops.client.api.types import AuthTokenResponse
+from agentops.client.http.async_http_client import AsyncHttpClient
 from agentops.client.http.http_client import HttpClient
 
 
@@ -78,6 +80,7 @@ class BaseApiClient:
         data: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
         timeout: int = 30,
+        content: Optional[Union[bytes, Iterable[bytes]]] = None,
     ) -> requests.Response:
         """
         Make a generic HTTP request
@@ -88,6 +91,7 @@ class BaseApiClient:
             data: Request payload (for POST, PUT methods)
             headers: Request headers
             timeout: Request timeout in seconds
+            content: Raw request body sent instead of ``data``, streamed when it is an iterable
 
         Returns:
             Response from the API
@@ -98,7 +102,9 @@ class BaseApiClient:
         url = self._get_full_url(path)
 
         try:
-            response = self.http_client.request(method=method, url=url, data=data, headers=headers, timeout=timeout)
+            response = self.http_client.request(
+                method=method, url=url, data=data, headers=headers, timeout=timeout, content=content
+            )
 
             self.last_response = response
             return response
@@ -159,3 +165,136 @@ class BaseApiClient:
             Response from the API
         """
         return self.request("delete", path, headers=headers)
+
+
+class AsyncBaseApiClient(BaseApiClient):
+    """
+    Asynchronous counterpart of BaseApiClient.
+
+    Requests go through AsyncHttpClient, so awaiting them never blocks the
+    event loop. Header and URL handling is shared with BaseApiClient.
+    """
+
+    def __init__(self, endpoint: str):
+        """
+        Initialize the async API client.
+
+        Args:
+            endpoint: The base URL for the API
+        """
+        self.endpoint = endpoint
+        self.http_client = AsyncHttpClient()
+        self.last_response: Optional[httpx.Response] = None
+
+    def prepare_headers(self, custom_headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Prepare headers for API requests.
+
+        Connection management headers are left out: httpx keeps connections
+        alive on its own, and HTTP/2 forbids them.
+
+        Args:
+            custom_headers: Additional headers to include
+
+        Returns:
+            Headers dictionary with standard headers and any custom headers
+        """
+        headers = {"Content-Type": "application/json"}
+
+        if custom_headers:
+            headers.update(custom_headers)
+
+        return headers
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        content: Optional[Union[bytes, AsyncIterable[bytes]]] = None,
+    ) -> httpx.Response:
+        """
+        Make a generic HTTP request
+
+        Args:
+            method: HTTP method (e.g., 'get', 'post', 'put', 'delete')
+            path: API endpoint path
+            data: Request payload (for POST, PUT methods)
+            headers: Request headers
+            timeout: Request timeout in seconds
+            content: Raw request body sent instead of ``data``, streamed when it is an iterable
+
+        Returns:
+            Response from the API
+
+        Raises:
+            Exception: If the request fails
+        """
+        url = self._get_full_url(path)
+
+        try:
+            response = await self.http_client.request(
+                method=method, url=url, data=data, headers=headers, timeout=timeout, content=content
+            )
+
+            self.last_response = response
+            return response
+        except httpx.HTTPError as e:
+            self.last_response = None
+            raise Exception(f"{method.upper()} request failed: {str(e)}") from e
+
+    async def post(self, path: str, data: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        """
+        Make POST request
+
+        Args:
+            path: API endpoint path
+            data: Request payload
+            headers: Request headers
+
+        Returns:
+            Response from the API
+        """
+        return await self.request("post", path, data=data, headers=headers)
+
+    async def get(self, path: str, headers: Dict[str, str]) -> httpx.Response:
+        """
+        Make GET request
+
+        Args:
+            path: API endpoint path
+            headers: Request headers
+
+        Returns:
+            Response from the API
+        """
+        return await self.request("get", path, headers=headers)
+
+    async def put(self, path: str, data: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        """
+        Make PUT request
+
+        Args:
+            path: API endpoint path
+            data: Request payload
+            headers: Request headers
+
+        Returns:
+            Response from the API
+        """
+        return await self.request("put", path, data=data, headers=headers)
+
+    async def delete(self, path: str, headers: Dict[str, str]) -> httpx.Response:
+        """
+        Make DELETE request
+
+        Args:
+            path: API endpoint path
+            headers: Request headers
+
+        Returns:
+            Response from the API
+        """
+        return await self.request("delete", path, headers=headers)
@@ -4,7 +4,7 @@ API client versions package.
 This package contains client implementations for different API versions.
 """
 
-from agentops.client.api.versions.v3 import V3Client
-from agentops.client.api.versions.v4 import V4Client
+from agentops.client.api.versions.v3 import AsyncV3Client, V3Client
+from agentops.client.api.versions.v4 import AsyncV4Client, V4Client
 
-__all__ = ["V3Client", "V4Client"]
+__all__ = ["V3Client", "V4Client", "AsyncV3Client", "AsyncV4Client"]
@@ -8,11 +8,49 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
-from agentops.client.api.base import BaseApiClient
+from agentops.client.api.base import AsyncBaseApiClient, BaseApiClient
 from agentops.client.api.types import AuthTokenResponse
 from agentops.exceptions import ApiServerException
 from agentops.logging import logger
 
+_AUTH_TOKEN_PATH = "/v3/auth/token"
+
+
+def _parse_auth_token_response(r: Any) -> Optional[AuthTokenResponse]:
+    """
+    Extract the auth token response, logging and returning None on failure.
+
+    Args:
+        r: Response from the auth/token endpoint (requests or httpx)
+
+    Returns:
+        The parsed response, or None if authentication failed
+    """
+    try:
+        if r.status_code != 200:
+            error_msg = f"Authentication failed: {r.status_code}"
+            try:
+                error_data = r.json()
+                if "error" in error_data:
+                    error_msg = f"{error_data['error']}"
+            except Exception:
+                pass
+            raise ApiServerException(error_msg)
+
+        try:
+            jr = r.json()
+            token = jr.get("token")
+            if not token:
+                raise ApiServerException("No token in authentication response")
+
+            return jr
+        except Exception as e:
+            raise ApiServerException(f"Failed to process authentication response: {str(e)}")
+    except Exception as e:
+        logger.error(f"{str(e)} - Perhaps an invalid API key?")
+        return None
+
+
 class V3Client(BaseApiClient):
     """Client for the AgentOps V3 API"""
 
@@ -27,34 +65,15 @@ class V3Client(BaseApiClient):
         super().__init__(endpoint)
 
     def fetch_auth_token(self, api_key: str) -> AuthTokenResponse:
-        path = "/v3/auth/token"
-        data = {"api_key": api_key}
-        headers = self.prepare_headers()
+        r = self.post(_AUTH_TOKEN_PATH, {"api_key": api_key}, self.prepare_headers())
+        return _parse_auth_token_response(r)
 
-        r = self.post(path, data, headers)
+    # Add V3-specific API methods here
 
-        try:
-            if r.status_code != 200:
-                error_msg = f"Authentication failed: {r.status_code}"
-                try:
-                    error_data = r.json()
-                    if "error" in error_data:
-                        error_msg = f"{error_data['error']}"
-                except Exception:
-                    pass
-                raise ApiServerException(error_msg)
 
-            try:
-                jr = r.json()
-                token = jr.get("token")
-                if not token:
-                    raise ApiServerException("No token in authentication response")
-
-                return jr
-            except Exception as e:
-                raise ApiServerException(f"Failed to process authentication response: {str(e)}")
-        except Exception as e:
-            logger.error(f"{str(e)} - Perhaps an invalid API key?")
-            return None
+class AsyncV3Client(AsyncBaseApiClient):
+    """Asynchronous client for the AgentOps V3 API"""
 
-    # Add V3-specific API methods here
+    async def fetch_auth_token(self, api_key: str) -> AuthTokenResponse:
+        r = await self.post(_AUTH_TOKEN_PATH, {"api_key": api_key}, self.prepare_headers())
+        return _parse_auth_token_response(r)
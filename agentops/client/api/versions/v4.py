@@ -3,17 +3,140 @@ V4 API client for the AgentOps API.
 
 This module provides the client for the V4 version of the AgentOps API.
 """
-from typing import Optional, Union, Dict
+import codecs
+import json
+import zlib
+from typing import IO, Any, AsyncIterator, Iterable, Iterator, Optional, Union, Dict
 
-from agentops.client.api.base import BaseApiClient
+from agentops.client.api.base import AsyncBaseApiClient, BaseApiClient
 from agentops.exceptions import ApiServerException
 from agentops.client.api.types import UploadedObjectResponse
 
+_OBJECT_UPLOAD_PATH = "/v4/objects/upload/"
+_LOGFILE_UPLOAD_PATH = "/v4/logs/upload/"
 
-class V4Client(BaseApiClient):
-    """Client for the AgentOps V4 API"""
+# Characters (or bytes) read from the upload source per compressed chunk
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+UploadBody = Union[str, bytes, IO, Iterable[Union[str, bytes]]]
+
+
+def _iter_text(body: UploadBody, chunk_size: int) -> Iterator[str]:
+    """Yield the text of an upload body piece by piece, decoding bytes as UTF-8"""
+    if isinstance(body, str):
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+        return
+
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        view = memoryview(body)
+        pieces: Iterable[Union[str, bytes]] = (
+            bytes(view[start : start + chunk_size]) for start in range(0, len(view), chunk_size)
+        )
+    elif hasattr(body, "read"):
+        pieces = iter(lambda: body.read(chunk_size), body.read(0))  # type: ignore[union-attr]
+    else:
+        pieces = body  # type: ignore[assignment]
+
+    # Multi-byte characters may straddle two pieces
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for piece in pieces:
+        yield piece if isinstance(piece, str) else decoder.decode(piece)
+    yield decoder.decode(b"", final=True)
+
+
+def _json_string(body: UploadBody, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode an upload body as a JSON string, one chunk at a time.
+
+    Args:
+        body: Text, UTF-8 bytes, a file-like object or an iterable of text or bytes
+        chunk_size: Number of characters or bytes read from the source per chunk
+    Returns:
+        Iterator over the non-empty chunks of the JSON document
+    """
+    yield b'"'
+    for text in _iter_text(body, chunk_size):
+        # JSON escapes characters independently, so escaping piece by piece matches escaping the whole
+        escaped = json.dumps(text)[1:-1].encode("ascii")
+        # An empty chunk would end a chunked transfer early
+        if escaped:
+            yield escaped
+    yield b'"'
+
+
+def _gzip_json_string(body: UploadBody, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode an upload body as a gzip-compressed JSON string, one chunk at a time.
+
+    The decompressed stream is the JSON document the uploads have always sent;
+    only one chunk of the source is held in memory at a time.
+
+    Args:
+        body: Text, UTF-8 bytes, a file-like object or an iterable of text or bytes
+        chunk_size: Number of characters or bytes read from the source per chunk
+    Returns:
+        Iterator over the compressed chunks
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for piece in _json_string(body, chunk_size):
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _upload_content(body: UploadBody, compress: bool) -> Iterator[bytes]:
+    return _gzip_json_string(body) if compress else _json_string(body)
+
+
+async def _aupload_content(body: UploadBody, compress: bool) -> AsyncIterator[bytes]:
+    """Async iterator over the chunks of ``_upload_content``, as required by httpx.AsyncClient"""
+    for chunk in _upload_content(body, compress):
+        yield chunk
+
+
+def _upload_headers(headers: Dict[str, str], compress: bool) -> Dict[str, str]:
+    headers = {**headers, "Content-Type": "application/json"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return headers
+
+
+def _parse_upload_response(response: Any) -> UploadedObjectResponse:
+    """
+    Turn an upload response into an UploadedObjectResponse.
+
+    Args:
+        response: Response from an upload endpoint (requests or httpx)
+    Returns:
+        UploadedObjectResponse: The parsed response.
+    Raises:
+        ApiServerException: If the upload failed or the response is malformed.
+    """
+    if response.status_code != 200:
+        error_msg = f"Upload failed: {response.status_code}"
+        try:
+            error_data = response.json()
+            if "error" in error_data:
+                error_msg = error_data["error"]
+        except Exception:
+            pass
+        raise ApiServerException(error_msg)
+
+    try:
+        response_data = response.json()
+        return UploadedObjectResponse(**response_data)
+    except Exception as e:
+        raise ApiServerException(f"Failed to process upload response: {str(e)}")
+
+
+class _V4AuthMixin:
+    """Bearer token handling shared by the sync and async V4 clients"""
     auth_token: str
-    
+    # Whether uploads are sent gzip-compressed (Config.compress_uploads)
+    compress_uploads: bool = True
+
     def set_auth_token(self, token: str):
         """
         Set the authentication token for API requests.
@@ -39,64 +162,82 @@ class V4Client(BaseApiClient):
             headers.update(custom_headers)
         return headers
 
-    def upload_object(self, body: Union[str, bytes]) -> UploadedObjectResponse:
+
+class V4Client(_V4AuthMixin, BaseApiClient):
+    """Client for the AgentOps V4 API"""
+
+    def upload_object(self, body: UploadBody) -> UploadedObjectResponse:
         """
         Upload an object to the API and return the response.
-        
+
+        The body is streamed in chunks, gzip-compressed unless ``compress_uploads`` is off,
+        rather than loaded into a single request body.
+
         Args:
-            body: The object to upload, either as a string or bytes.
+            body: The object to upload, as a string, UTF-8 bytes, a file-like object or an iterable of chunks.
         Returns:
             UploadedObjectResponse: The response from the API after upload.
         """
-        if isinstance(body, bytes):
-            body = body.decode("utf-8")
-        
-        response = self.post("/v4/objects/upload/", body, self.prepare_headers())
-        
-        if response.status_code != 200:
-            error_msg = f"Upload failed: {response.status_code}"
-            try:
-                error_data = response.json()
-                if "error" in error_data:
-                    error_msg = error_data["error"]
-            except Exception:
-                pass
-            raise ApiServerException(error_msg)
-    
-        try:
-            response_data = response.json()
-            return UploadedObjectResponse(**response_data)
-        except Exception as e:
-            raise ApiServerException(f"Failed to process upload response: {str(e)}")
-        
+        response = self.request(
+            "post",
+            _OBJECT_UPLOAD_PATH,
+            headers=_upload_headers(self.prepare_headers(), self.compress_uploads),
+            content=_upload_content(body, self.compress_uploads),
+        )
+        return _parse_upload_response(response)
 
-    def upload_logfile(self, body: Union[str, bytes], trace_id: int) -> UploadedObjectResponse:
+    def upload_logfile(self, body: UploadBody, trace_id: int) -> UploadedObjectResponse:
         """
         Upload an log file to the API and return the response.
-        
+
+        The body is streamed in chunks, gzip-compressed unless ``compress_uploads`` is off,
+        rather than loaded into a single request body.
+
         Args:
-            body: The log file to upload, either as a string or bytes.
+            body: The log file to upload, as a string, UTF-8 bytes, a file-like object or an iterable of chunks.
+            trace_id: The trace the log file belongs to.
         Returns:
             UploadedObjectResponse: The response from the API after upload.
         """
-        if isinstance(body, bytes):
-            body = body.decode("utf-8")
-        
-        response = self.post("/v4/logs/upload/", body, {**self.prepare_headers(), "Trace-Id": str(trace_id)})
-        
-        if response.status_code != 200:
-            error_msg = f"Upload failed: {response.status_code}"
-            try:
-                error_data = response.json()
-                if "error" in error_data:
-                    error_msg = error_data["error"]
-            except Exception:
-                pass
-            raise ApiServerException(error_msg)
-    
-        try:
-            response_data = response.json()
-            return UploadedObjectResponse(**response_data)
-        except Exception as e:
-            raise ApiServerException(f"Failed to process upload response: {str(e)}")
+        headers = _upload_headers({**self.prepare_headers(), "Trace-Id": str(trace_id)}, self.compress_uploads)
+        response = self.request(
+            "post", _LOGFILE_UPLOAD_PATH, headers=headers, content=_upload_content(body, self.compress_uploads)
+        )
+        return _parse_upload_response(response)
+
+
+class AsyncV4Client(_V4AuthMixin, AsyncBaseApiClient):
+    """Asynchronous client for the AgentOps V4 API"""
+
+    async def upload_object(self, body: UploadBody) -> UploadedObjectResponse:
+        """
+        Upload an object to the API and return the response.
+
+        Args:
+            body: The object to upload, as a string, UTF-8 bytes, a file-like object or an iterable of chunks.
+        Returns:
+            UploadedObjectResponse: The response from the API after upload.
+        """
+        response = await self.request(
+            "post",
+            _OBJECT_UPLOAD_PATH,
+            headers=_upload_headers(self.prepare_headers(), self.compress_uploads),
+            content=_aupload_content(body, self.compress_uploads),
+        )
+        return _parse_upload_response(response)
 
+    async def upload_logfile(self, body: UploadBody, trace_id: int) -> UploadedObjectResponse:
+        """
+        Upload an log file to the API and return the response.
+
+        Args:
+            body: The log file to upload, as a string, UTF-8 bytes, a file-like object or an iterable of chunks.
+            trace_id: The trace the log file belongs to.
+        Returns:
+            UploadedObjectResponse: The response from the API after upload.
+        """
+        headers = _upload_headers({**self.prepare_headers(), "Trace-Id": str(trace_id)}, self.compress_uploads)
+        response = await self.request(
+            "post", _LOGFILE_UPLOAD_PATH, headers=headers, content=_aupload_content(body, self.compress_uploads)
+        )
+        return _parse_upload_response(response)
@@ -1,13 +1,19 @@
 from typing import List, Optional, Union
 import atexit
+import threading
 
 from agentops.client.api import ApiClient
+from agentops.client.api.types import AuthTokenResponse
+from agentops.client.token_manager import TokenManager
 from agentops.config import Config
 from agentops.exceptions import AgentOpsClientNotInitializedException, NoApiKeyException, NoSessionException
+from agentops.helpers.serialization import set_json_backend
 from agentops.instrumentation import instrument_all
 from agentops.logging import logger
 from agentops.logging.config import configure_logging, intercept_opentelemetry_logging
 from agentops.sdk.core import TracingCore
+from agentops.sdk.decorators.factory import set_decorators_disabled
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
 
 # Global registry for active session
 _active_session = None
@@ -40,6 +46,8 @@ class Client:
     __instance = None  # Class variable for singleton pattern
 
     api: ApiClient
+    _auth_thread: Optional[threading.Thread] = None
+    token_manager: Optional[TokenManager] = None
 
     def __new__(cls, *args, **kwargs):
         if cls.__instance is None:
@@ -56,29 +64,53 @@ class Client:
         self.config = Config()
         self.configure(**kwargs)
 
+        if self.config.disabled:
+            # Nothing is traced; decorators applied from now on return their target unchanged
+            set_decorators_disabled(True)
+            logger.debug("AgentOps is disabled")
+            return None
+
         if not self.config.api_key:
             raise NoApiKeyException
 
         # TODO we may need to initialize logging before importing OTEL to capture all
         configure_logging(self.config)
         intercept_opentelemetry_logging()
+        set_json_backend(self.config.json_backend)
 
         self.api = ApiClient(self.config.endpoint)
+        self.api.v4.compress_uploads = self.config.compress_uploads
 
-        # Prefetch JWT token if enabled
-        # TODO: Move this validation somewhere else (and integrate with self.config.prefetch_jwt_token once we have a solution to that)
-        response = self.api.v3.fetch_auth_token(self.config.api_key)
-        if response is None:
-            return
-        
-        # Save the bearer for use with the v4 API
-        self.api.v4.set_auth_token(response["token"])
-
-        # Initialize TracingCore with the current configuration and project_id
         tracing_config = self.config.dict()
-        tracing_config["project_id"] = response["project_id"]
-
-        TracingCore.initialize_from_config(tracing_config, jwt=response["token"])
+        if not self.config.export_file_dir:
+            self._setup_token_manager()
+
+        if self.config.export_file_dir:
+            # Spans go to local files and are uploaded later with agentops.sdk.replay,
+            # so there is no need to reach the API (the host may have no egress at all)
+            TracingCore.initialize_from_config(tracing_config)
+        elif self.config.background_auth:
+            # Spans are recorded right away and buffered by the exporter until the
+            # token arrives, so startup does not wait on the network
+            TracingCore.initialize_from_config(tracing_config)
+            self._auth_thread = threading.Thread(
+                target=self._authenticate, name="agentops-auth", daemon=True
+            )
+            self._auth_thread.start()
+        else:
+            # Prefetch JWT token if enabled
+            # TODO: Move this validation somewhere else (and integrate with self.config.prefetch_jwt_token once we have a solution to that)
+            response = self.token_manager.get_token()
+            if response is None:
+                return
+
+            # Save the bearer for use with the v4 API
+            self.api.v4.set_auth_token(response["token"])
+
+            # Initialize TracingCore with the current configuration and project_id
+            tracing_config["project_id"] = response["project_id"]
+
+            TracingCore.initialize_from_config(tracing_config, jwt=response["token"])
 
         # Instrument LLM calls if enabled
         if self.config.instrument_llm_calls:
@@ -109,6 +141,58 @@ class Client:
         
         return session
 
+    def _setup_token_manager(self) -> None:
+        """Create the manager caching and refreshing the JWT of the configured API key"""
+        if self.token_manager is not None:
+            self.token_manager.close()
+        self.token_manager = TokenManager(
+            self.api.v3.fetch_auth_token,
+            self.config.api_key,
+            cache_dir=self.config.jwt_cache_dir,
+            cache_namespace=self.config.endpoint,
+        )
+        self.token_manager.add_listener(self._token_refreshed)
+        # Exports rejected because the token expired or was revoked trigger a refresh
+        AuthenticatedOTLPExporter.on_jwt_rejected = self.token_manager.token_rejected
+
+    def _token_refreshed(self, response: AuthTokenResponse) -> None:
+        """Switch the v4 API client and the exporters to a refreshed JWT"""
+        self.api.v4.set_auth_token(response["token"])
+        TracingCore.get_instance().authenticate(response["token"], response.get("project_id"))
+        logger.debug("Authentication token refreshed")
+
+    def _authenticate(self) -> None:
+        """Fetch the JWT and hand it to the v4 API client and the waiting exporters"""
+        core = TracingCore.get_instance()
+        try:
+            response = self.token_manager.get_token()
+        except Exception as e:
+            logger.error(f"Background authentication failed: {e}")
+            response = None
+        if response is None:
+            core.abandon_authentication()
+            return
+
+        self.api.v4.set_auth_token(response["token"])
+        core.authenticate(response["token"], response.get("project_id"))
+        logger.debug("Background authentication completed")
+
+    def wait_for_auth(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for background authentication to finish.
+
+        Args:
+            timeout: Maximum number of seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if no background authentication is in progress anymore
+        """
+        thread = self._auth_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
     def configure(self, **kwargs):
         """Update client configuration"""
         self.config.configure(**kwargs)
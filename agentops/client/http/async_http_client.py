@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import os
+import weakref
+from typing import AsyncIterable, Dict, Optional, Union
+
+import httpx
+
+from agentops.logging import logger
+
+
+class AsyncHttpClient:
+    """
+    Asynchronous HTTP client with connection pooling, built on httpx.
+
+    An ``httpx.AsyncClient`` is bound to the event loop it was first used on,
+    so one client (and its connection pool) is shared per running loop.
+    HTTP/2 is negotiated when the optional ``h2`` package is installed, which
+    lets concurrent requests share a single connection.
+    """
+
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 10.0
+
+    @classmethod
+    def _at_fork_reinit(cls) -> None:
+        """Forget the clients inherited from the parent; their connections are not the child's"""
+        cls._clients = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def http2_available() -> bool:
+        """Whether the h2 package needed for HTTP/2 is installed"""
+        return importlib.util.find_spec("h2") is not None
+
+    @classmethod
+    def _create_client(cls) -> httpx.AsyncClient:
+        """Create a client with the default pooling limits and headers"""
+        return httpx.AsyncClient(
+            http2=cls.http2_available(),
+            limits=httpx.Limits(
+                max_connections=cls.max_connections,
+                max_keepalive_connections=cls.max_keepalive_connections,
+                keepalive_expiry=cls.keepalive_expiry,
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """
+        Get or create the client shared by the running event loop.
+
+        Returns:
+            The httpx.AsyncClient for the current loop
+
+        Raises:
+            RuntimeError: If called outside of a running event loop
+        """
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None or client.is_closed:
+            client = cls._clients[loop] = cls._create_client()
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the client of the running event loop, if one was created"""
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    @classmethod
+    async def request(
+        cls,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: int = 30,
+        max_redirects: int = 5,
+        content: Optional[Union[bytes, AsyncIterable[bytes]]] = None,
+    ) -> httpx.Response:
+        """
+        Make a generic HTTP request
+
+        Args:
+            method: HTTP method (e.g., 'get', 'post', 'put', 'delete')
+            url: Full URL for the request
+            data: Request payload (for POST, PUT methods)
+            headers: Request headers
+            timeout: Request timeout in seconds
+            max_redirects: Maximum number of redirects to follow (default: 5)
+            content: Raw request body sent instead of ``data``; an async iterable is streamed with chunked encoding
+
+        Returns:
+            Response from the API
+
+        Raises:
+            httpx.HTTPError: If the request fails or the redirect limit is exceeded
+            ValueError: If an unsupported HTTP method is used
+        """
+        method = method.lower()
+        if method not in ("get", "post", "put", "delete"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        client = cls.get_client()
+        request = client.build_request(
+            method.upper(),
+            url,
+            json=data if method in ("post", "put") and content is None else None,
+            content=content if method in ("post", "put") else None,
+            headers=headers,
+            timeout=timeout,
+        )
+        response = await client.send(request, follow_redirects=False)
+        redirect_count = 0
+        while response.next_request is not None:
+            redirect_count += 1
+            if redirect_count > max_redirects:
+                await response.aclose()
+                raise httpx.TooManyRedirects(
+                    f"Exceeded maximum number of redirects ({max_redirects})", request=response.request
+                )
+            # httpx rewrites the method for 303 and drops the body as needed
+            next_request = response.next_request
+            if next_request.method != "GET" and content is not None and not isinstance(content, bytes):
+                # A streamed body has been consumed and cannot be sent again
+                return response
+            await response.aclose()
+            logger.debug(f"Following redirect ({redirect_count}/{max_redirects}) to: {next_request.url}")
+            response = await client.send(next_request, follow_redirects=False)
+
+        return response
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=AsyncHttpClient._at_fork_reinit)
@@ -1,4 +1,5 @@
-from typing import Callable, Dict, Optional
+import os
+from typing import Callable, Dict, Iterable, Optional, Union
 
 import requests
 
@@ -14,6 +15,11 @@ class HttpClient:
     _session: Optional[requests.Session] = None
     _project_id: Optional[str] = None
 
+    @classmethod
+    def _at_fork_reinit(cls) -> None:
+        """Drop the session inherited from the parent so the child opens its own connections"""
+        cls._session = None
+
     @classmethod
     def get_project_id(cls) -> Optional[str]:
         """Get the stored project ID"""
@@ -147,6 +153,7 @@ class HttpClient:
         headers: Optional[Dict] = None,
         timeout: int = 30,
         max_redirects: int = 5,
+        content: Optional[Union[bytes, Iterable[bytes]]] = None,
     ) -> requests.Response:
         """
         Make a generic HTTP request
@@ -158,6 +165,7 @@ class HttpClient:
             headers: Request headers
             timeout: Request timeout in seconds
             max_redirects: Maximum number of redirects to follow (default: 5)
+            content: Raw request body sent instead of ``data``; an iterable is streamed with chunked encoding
 
         Returns:
             Response from the API
@@ -174,10 +182,11 @@ class HttpClient:
             # Make the request with allow_redirects=False
             if method == "get":
                 response = session.get(url, headers=headers, timeout=timeout, allow_redirects=False)
-            elif method == "post":
-                response = session.post(url, json=data, headers=headers, timeout=timeout, allow_redirects=False)
-            elif method == "put":
-                response = session.put(url, json=data, headers=headers, timeout=timeout, allow_redirects=False)
+            elif method in ("post", "put"):
+                body = {"data": content} if content is not None else {"json": data}
+                response = session.request(
+                    method.upper(), url, headers=headers, timeout=timeout, allow_redirects=False, **body
+                )
             elif method == "delete":
                 response = session.delete(url, headers=headers, timeout=timeout, allow_redirects=False)
             else:
@@ -202,6 +211,10 @@ class HttpClient:
                 if response.status_code == 303:
                     method = "get"
                     data = None
+                    content = None
+                elif content is not None and not isinstance(content, bytes):
+                    # A streamed body has been consumed and cannot be sent again
+                    return response
 
                 logger.debug(f"Following redirect ({redirect_count}/{max_redirects}) to: {url}")
 
@@ -213,3 +226,7 @@ class HttpClient:
 
         # This should never be reached due to the max_redirects check above
         return response
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=HttpClient._at_fork_reinit)
@@ -0,0 +1,268 @@
+"""
+Caching and proactive refresh of the JWTs used to authenticate with the AgentOps API.
+
+A :class:`TokenManager` keeps the token fetched for an API key in memory and,
+when given a cache directory, in a file shared by every process of the host,
+so workers started together (or forked from a parent that already holds a
+token) do not each call the auth endpoint. Tokens are refreshed in the
+background shortly before the expiry found in their ``exp`` claim.
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent processes may both fetch a token
+    fcntl = None  # type: ignore
+
+from agentops.client.api.types import AuthTokenResponse
+from agentops.helpers.fork import register_at_fork_reinit
+from agentops.logging import logger
+
+# Seconds before expiry at which a token is refreshed
+DEFAULT_REFRESH_MARGIN = 300.0
+# Seconds between attempts after a failed refresh
+RETRY_INTERVAL = 30.0
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the expiry of a JWT without verifying it.
+
+    Args:
+        token: The encoded JWT
+
+    Returns:
+        The ``exp`` claim in seconds since the epoch, or None if it cannot be read
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except Exception:
+        return None
+
+
+class TokenManager:
+    """
+    Provides the JWT for an API key, fetching it only when no fresh one is cached.
+
+    Listeners added with ``add_listener`` are called with the new token
+    response whenever a refresh replaces the current token.
+    """
+
+    def __init__(
+        self,
+        fetch_token: Callable[[str], Optional[AuthTokenResponse]],
+        api_key: str,
+        cache_dir: Optional[str] = None,
+        cache_namespace: str = "",
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+    ):
+        """
+        Args:
+            fetch_token: Function fetching a token response for an API key, returning None on failure
+            api_key: The API key to authenticate with
+            cache_dir: Directory of the token file shared between processes; None keeps tokens in memory only
+            cache_namespace: Distinguishes tokens of the same API key for different endpoints
+            refresh_margin: Seconds before expiry at which a token is refreshed
+        """
+        self._fetch_token = fetch_token
+        self._api_key = api_key
+        self.refresh_margin = refresh_margin
+
+        self.cache_path: Optional[str] = None
+        if cache_dir:
+            # The file name must not reveal the API key
+            key = hashlib.sha256(f"{cache_namespace}\0{api_key}".encode()).hexdigest()[:32]
+            self.cache_path = os.path.join(cache_dir, f"jwt-{key}.json")
+
+        self._lock = threading.Lock()
+        self._token: Optional[AuthTokenResponse] = None
+        self._expires_at: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._refreshing = False
+        self._closed = False
+        self._listeners: List[Callable[[AuthTokenResponse], None]] = []
+
+        # Timer threads do not survive fork; children reschedule the refresh
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def add_listener(self, listener: Callable[[AuthTokenResponse], None]) -> None:
+        """Call ``listener`` with the token response every time a refresh replaces the token."""
+        self._listeners.append(listener)
+
+    def get_token(self) -> Optional[AuthTokenResponse]:
+        """
+        Get a token response that is not about to expire.
+
+        Returns:
+            The token response, or None if no token could be obtained
+        """
+        with self._lock:
+            if self._token is not None and self._is_fresh(self._expires_at):
+                return self._token
+            response = self._load_or_fetch()
+            if response is not None:
+                self._store(response)
+            return response
+
+    def refresh(self, rejected_token: Optional[str] = None) -> Optional[AuthTokenResponse]:
+        """
+        Replace the current token, preferring one another process already cached.
+
+        Args:
+            rejected_token: Token refused by the API; it is not reused even if it looks fresh
+
+        Returns:
+            The new token response, or None if the refresh failed
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            if rejected_token is not None and self._token is not None and self._token["token"] != rejected_token:
+                # Already replaced since the rejected request was sent
+                return self._token
+            try:
+                response = self._load_or_fetch(rejected_token or (self._token or {}).get("token"))
+            except Exception as e:
+                logger.warning(f"Failed to refresh the authentication token: {e}")
+                response = None
+            if response is None:
+                self._schedule_refresh(RETRY_INTERVAL)
+                return None
+            changed = self._token is None or self._token["token"] != response["token"]
+            self._store(response)
+
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(response)
+                except Exception as e:
+                    logger.warning(f"Error handling refreshed authentication token: {e}")
+        return response
+
+    def token_rejected(self, token: str) -> None:
+        """Refresh the token in the background after the API rejected ``token``."""
+        with self._lock:
+            if self._refreshing or self._closed:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(rejected_token=token)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="agentops-token-refresh", daemon=True).start()
+
+    def close(self) -> None:
+        """Stop refreshing the token."""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _is_fresh(self, expires_at: Optional[float]) -> bool:
+        # Tokens without a readable expiry are used until the API rejects them
+        return expires_at is None or time.time() < expires_at - self.refresh_margin
+
+    def _store(self, response: AuthTokenResponse) -> None:
+        self._token = response
+        self._expires_at = jwt_expiry(response["token"])
+        self._schedule_refresh()
+
+    def _schedule_refresh(self, delay: Optional[float] = None) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._closed:
+            return
+        if delay is None:
+            if self._expires_at is None:
+                return
+            # Spread the refreshes of processes sharing a token so one fetches and the others read its cache
+            delay = self._expires_at - self.refresh_margin - time.time()
+            delay = max(0.0, delay) + random.uniform(0, self.refresh_margin / 4)
+        self._timer = threading.Timer(delay, self.refresh)
+        self._timer.name = "agentops-token-refresh"
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _load_or_fetch(self, rejected_token: Optional[str] = None) -> Optional[AuthTokenResponse]:
+        if self.cache_path is None:
+            return self._fetch_token(self._api_key)
+
+        with self._cache_lock():
+            cached = self._read_cache()
+            if cached is not None and cached["token"] != rejected_token:
+                logger.debug("Using cached authentication token")
+                return cached
+            response = self._fetch_token(self._api_key)
+            if response is not None:
+                self._write_cache(response)
+            return response
+
+    @contextlib.contextmanager
+    def _cache_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the cache so only one process fetches a token at a time"""
+        assert self.cache_path is not None
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+            lock_file = open(self.cache_path + ".lock", "a")
+        except OSError as e:
+            logger.debug(f"Cannot lock the token cache: {e}")
+            yield
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+        finally:
+            lock_file.close()
+
+    def _read_cache(self) -> Optional[AuthTokenResponse]:
+        assert self.cache_path is not None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if not cached.get("token") or not self._is_fresh(jwt_expiry(cached["token"])):
+                return None
+            return {"token": cached["token"], "project_id": cached.get("project_id")}  # type: ignore
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable token cache {self.cache_path}: {e}")
+            return None
+
+    def _write_cache(self, response: AuthTokenResponse) -> None:
+        assert self.cache_path is not None
+        if jwt_expiry(response["token"]) is None:
+            # Other processes could not tell when it stops being valid
+            return
+        partial = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"token": response["token"], "project_id": response.get("project_id")}, f)
+            os.replace(partial, self.cache_path)
+        except OSError as e:
+            logger.debug(f"Failed to write token cache {self.cache_path}: {e}")
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+        self._timer = None
+        self._refreshing = False
+        if self._token is not None:
+            self._schedule_refresh()
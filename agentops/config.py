@@ -3,14 +3,14 @@ import logging
 import os
 import sys
 from dataclasses import asdict, dataclass, field
-from typing import Any, List, Optional, Set, TypedDict, Union
+from typing import Any, Dict, List, Optional, Set, TypedDict, Union
 from uuid import UUID
 
 from opentelemetry.sdk.trace import SpanProcessor
 from opentelemetry.sdk.trace.export import SpanExporter
 
 from agentops.exceptions import InvalidApiKeyException
-from agentops.helpers.env import get_env_bool, get_env_int, get_env_list
+from agentops.helpers.env import get_env_bool, get_env_dict, get_env_float, get_env_int, get_env_list
 from agentops.helpers.serialization import AgentOpsJSONEncoder
 
 from .logging.config import logger
@@ -32,6 +32,26 @@ class ConfigDict(TypedDict):
     log_level: Optional[Union[str, int]]
     fail_safe: Optional[bool]
     prefetch_jwt_token: Optional[bool]
+    spill_to_disk: Optional[bool]
+    spill_dir: Optional[str]
+    spill_max_bytes: Optional[int]
+    async_flush: Optional[bool]
+    export_compression: Optional[str]
+    export_compression_level: Optional[int]
+    adaptive_export: Optional[bool]
+    export_workers: Optional[int]
+    export_file_dir: Optional[str]
+    tail_sample_rate: Optional[float]
+    tail_sample_latency_threshold: Optional[int]
+    tail_sample_token_threshold: Optional[int]
+    sample_rate: Optional[float]
+    span_rate_limits: Optional[Dict[str, float]]
+    lazy_serialization: Optional[bool]
+    background_auth: Optional[bool]
+    jwt_cache_dir: Optional[str]
+    compress_uploads: Optional[bool]
+    json_backend: Optional[str]
+    disabled: Optional[bool]
 
 
 @dataclass
@@ -111,6 +131,106 @@ class Config:
         metadata={"description": "Whether to prefetch JWT token during initialization"},
     )
 
+    spill_to_disk: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_SPILL_TO_DISK", False),
+        metadata={"description": "Whether to spill spans to a disk journal instead of dropping them when the export queue is full"},
+    )
+
+    spill_dir: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_SPILL_DIR"),
+        metadata={"description": "Directory for the span spill journal. By default each process claims one under the temporary directory, recovering spans left by exited processes."},
+    )
+
+    spill_max_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_SPILL_MAX_BYTES", 256 * 1024 * 1024),
+        metadata={"description": "Maximum disk usage in bytes of the span spill journal before the oldest data is evicted"},
+    )
+
+    async_flush: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_ASYNC_FLUSH", False),
+        metadata={"description": "Whether ending a session flushes spans on a background thread instead of blocking the caller"},
+    )
+
+    export_compression: str = field(
+        default_factory=lambda: os.getenv("AGENTOPS_EXPORT_COMPRESSION", "gzip"),
+        metadata={"description": "Compression for exported spans: gzip, deflate, zstd (requires zstandard) or none"},
+    )
+
+    export_compression_level: Optional[int] = field(
+        default_factory=lambda: get_env_int("AGENTOPS_EXPORT_COMPRESSION_LEVEL", None),  # type: ignore
+        metadata={"description": "Compression level for exported spans. Defaults to the codec's own default."},
+    )
+
+    adaptive_export: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_ADAPTIVE_EXPORT", False),
+        metadata={"description": "Whether span export batch size and flush delay adapt to load and exporter health instead of staying fixed"},
+    )
+
+    export_workers: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_EXPORT_WORKERS", 1),
+        metadata={"description": "Number of concurrent span export workers. Spans of one trace always share a worker."},
+    )
+
+    export_file_dir: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_EXPORT_FILE_DIR"),
+        metadata={"description": "Write spans to rotating local files in this directory instead of sending them to the exporter endpoint. Upload them later with `python -m agentops.sdk.replay`."},
+    )
+
+    tail_sample_rate: Optional[float] = field(
+        default_factory=lambda: get_env_float("AGENTOPS_TAIL_SAMPLE_RATE", None),  # type: ignore
+        metadata={"description": "Enables tail sampling: errored, slow and expensive sessions are always exported, and this fraction (0-1) of the remaining sessions. Disabled when unset."},
+    )
+
+    tail_sample_latency_threshold: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_TAIL_SAMPLE_LATENCY_THRESHOLD", 30000),
+        metadata={"description": "With tail sampling, sessions lasting at least this many milliseconds are always exported"},
+    )
+
+    tail_sample_token_threshold: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_TAIL_SAMPLE_TOKEN_THRESHOLD", 20000),
+        metadata={"description": "With tail sampling, sessions whose LLM calls use at least this many tokens are always exported"},
+    )
+
+    sample_rate: float = field(
+        default_factory=lambda: get_env_float("AGENTOPS_SAMPLE_RATE", 1.0),
+        metadata={"description": "Fraction (0-1) of traces sampled when they start. Child spans follow their parent's decision; unsampled spans are not recorded at all."},
+    )
+
+    span_rate_limits: Dict[str, float] = field(
+        default_factory=lambda: get_env_dict("AGENTOPS_SPAN_RATE_LIMITS"),
+        metadata={"description": "Maximum spans per second keyed by span kind (e.g. llm) or span name prefix (e.g. openai.chat). Session spans are never limited. From the environment as `openai.chat=10,tool=50`."},
+    )
+
+    lazy_serialization: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_LAZY_SERIALIZATION", False),
+        metadata={"description": "Whether decorated functions' inputs and outputs are serialized on the export thread, and only for exported spans, instead of on the caller's thread"},
+    )
+
+    background_auth: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_BACKGROUND_AUTH", False),
+        metadata={"description": "Whether init() fetches the auth token on a background thread instead of waiting for it; spans are buffered in memory until it arrives"},
+    )
+
+    jwt_cache_dir: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_JWT_CACHE_DIR"),
+        metadata={"description": "Directory where the auth token is cached for reuse by other processes on the host (e.g. forked workers); tokens are kept in memory only when unset"},
+    )
+
+    compress_uploads: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_COMPRESS_UPLOADS", True),
+        metadata={"description": "Whether log and object uploads are sent gzip-compressed. Turn off for proxies or endpoints that do not accept a gzip Content-Encoding."},
+    )
+
+    json_backend: str = field(
+        default_factory=lambda: os.getenv("AGENTOPS_JSON_BACKEND", "json"),
+        metadata={"description": "JSON encoder used to serialize recorded values: `json` (standard library, default) or `orjson` if installed. orjson produces the same values in compact form and is several times faster."},
+    )
+
+    disabled: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_DISABLED", False),
+        metadata={"description": "Turn AgentOps off entirely: init() does nothing and decorators return the undecorated function. Set AGENTOPS_DISABLED before the decorated code is imported for decorators to add no overhead at all."},
+    )
+
     exporter_endpoint: Optional[str] = field(
         default_factory=lambda: os.getenv("AGENTOPS_EXPORTER_ENDPOINT", "https://otlp.agentops.ai/v1/traces"),
         metadata={
@@ -143,6 +263,26 @@ class Config:
         log_level: Optional[Union[str, int]] = None,
         fail_safe: Optional[bool] = None,
         prefetch_jwt_token: Optional[bool] = None,
+        spill_to_disk: Optional[bool] = None,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: Optional[int] = None,
+        async_flush: Optional[bool] = None,
+        export_compression: Optional[str] = None,
+        export_compression_level: Optional[int] = None,
+        adaptive_export: Optional[bool] = None,
+        export_workers: Optional[int] = None,
+        export_file_dir: Optional[str] = None,
+        tail_sample_rate: Optional[float] = None,
+        tail_sample_latency_threshold: Optional[int] = None,
+        tail_sample_token_threshold: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        span_rate_limits: Optional[Dict[str, float]] = None,
+        lazy_serialization: Optional[bool] = None,
+        background_auth: Optional[bool] = None,
+        jwt_cache_dir: Optional[str] = None,
+        compress_uploads: Optional[bool] = None,
+        json_backend: Optional[str] = None,
+        disabled: Optional[bool] = None,
         exporter: Optional[SpanExporter] = None,
         processor: Optional[SpanProcessor] = None,
         exporter_endpoint: Optional[str] = None,
@@ -205,6 +345,66 @@ class Config:
         if prefetch_jwt_token is not None:
             self.prefetch_jwt_token = prefetch_jwt_token
 
+        if spill_to_disk is not None:
+            self.spill_to_disk = spill_to_disk
+
+        if spill_dir is not None:
+            self.spill_dir = spill_dir
+
+        if spill_max_bytes is not None:
+            self.spill_max_bytes = spill_max_bytes
+
+        if async_flush is not None:
+            self.async_flush = async_flush
+
+        if export_compression is not None:
+            self.export_compression = export_compression
+
+        if export_compression_level is not None:
+            self.export_compression_level = export_compression_level
+
+        if adaptive_export is not None:
+            self.adaptive_export = adaptive_export
+
+        if export_workers is not None:
+            self.export_workers = export_workers
+
+        if export_file_dir is not None:
+            self.export_file_dir = export_file_dir
+
+        if tail_sample_rate is not None:
+            self.tail_sample_rate = tail_sample_rate
+
+        if tail_sample_latency_threshold is not None:
+            self.tail_sample_latency_threshold = tail_sample_latency_threshold
+
+        if tail_sample_token_threshold is not None:
+            self.tail_sample_token_threshold = tail_sample_token_threshold
+
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+        if span_rate_limits is not None:
+            self.span_rate_limits = span_rate_limits
+
+        if lazy_serialization is not None:
+            self.lazy_serialization = lazy_serialization
+
+        if background_auth is not None:
+            self.background_auth = background_auth
+
+        if jwt_cache_dir is not None:
+            self.jwt_cache_dir = jwt_cache_dir
+
+        if compress_uploads is not None:
+            self.compress_uploads = compress_uploads
+
+        if json_backend is not None:
+            self.json_backend = json_backend
+
+        if disabled is not None:
+            self.disabled = disabled
+
         if exporter is not None:
             self.exporter = exporter
 
@@ -234,6 +434,26 @@ class Config:
             "log_level": self.log_level,
             "fail_safe": self.fail_safe,
             "prefetch_jwt_token": self.prefetch_jwt_token,
+            "spill_to_disk": self.spill_to_disk,
+            "spill_dir": self.spill_dir,
+            "spill_max_bytes": self.spill_max_bytes,
+            "async_flush": self.async_flush,
+            "export_compression": self.export_compression,
+            "export_compression_level": self.export_compression_level,
+            "adaptive_export": self.adaptive_export,
+            "export_workers": self.export_workers,
+            "export_file_dir": self.export_file_dir,
+            "tail_sample_rate": self.tail_sample_rate,
+            "tail_sample_latency_threshold": self.tail_sample_latency_threshold,
+            "tail_sample_token_threshold": self.tail_sample_token_threshold,
+            "sample_rate": self.sample_rate,
+            "span_rate_limits": self.span_rate_limits,
+            "lazy_serialization": self.lazy_serialization,
+            "background_auth": self.background_auth,
+            "jwt_cache_dir": self.jwt_cache_dir,
+            "compress_uploads": self.compress_uploads,
+            "json_backend": self.json_backend,
+            "disabled": self.disabled,
             "exporter": self.exporter,
             "processor": self.processor,
             "exporter_endpoint": self.exporter_endpoint,
@@ -3,8 +3,13 @@ from .serialization import (
     AgentOpsJSONEncoder,
     serialize_uuid,
     safe_serialize,
+    safe_serialize_capped,
+    get_json_backend,
+    set_json_backend,
     is_jsonable,
     filter_unjsonable,
+    model_to_dict,
+    register_model_schema,
 )
 from .system import (
     get_host_env,
@@ -19,7 +24,8 @@ from .system import (
 )
 from .version import get_agentops_version, check_agentops_update
 from .debug import debug_print_function_params
-from .env import get_env_bool, get_env_int, get_env_list
+from .env import get_env_bool, get_env_dict, get_env_float, get_env_int, get_env_list
+from .fork import register_at_fork_reinit
 
 __all__ = [
     "get_ISO_time",
@@ -28,8 +34,13 @@ __all__ = [
     "AgentOpsJSONEncoder",
     "serialize_uuid",
     "safe_serialize",
+    "safe_serialize_capped",
+    "get_json_backend",
+    "set_json_backend",
     "is_jsonable",
     "filter_unjsonable",
+    "model_to_dict",
+    "register_model_schema",
     "get_host_env",
     "get_sdk_details",
     "get_os_details",
@@ -43,6 +54,9 @@ __all__ = [
     "check_agentops_update",
     "debug_print_function_params",
     "get_env_bool",
+    "get_env_dict",
+    "get_env_float",
     "get_env_int",
     "get_env_list",
+    "register_at_fork_reinit",
 ]
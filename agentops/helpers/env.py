@@ -1,7 +1,7 @@
 """Environment variable helper functions"""
 
 import os
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 
 
 def get_env_bool(key: str, default: bool) -> bool:
@@ -36,6 +36,22 @@ def get_env_int(key: str, default: int) -> int:
         return default
 
 
+def get_env_float(key: str, default: float) -> float:
+    """Get float from environment variable
+
+    Args:
+        key: Environment variable name
+        default: Default value if not set
+
+    Returns:
+        float: Parsed float value
+    """
+    try:
+        return float(os.getenv(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
 def get_env_list(key: str, default: Optional[List[str]] = None) -> Set[str]:
     """Get comma-separated list from environment variable
 
@@ -50,3 +66,20 @@ def get_env_list(key: str, default: Optional[List[str]] = None) -> Set[str]:
     if val is None:
         return set(default or [])
     return set(val.split(","))
+
+
+def get_env_dict(key: str, default: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Get comma-separated key=value pairs from environment variable
+
+    Args:
+        key: Environment variable name
+        default: Default mapping if not set
+
+    Returns:
+        Dict[str, str]: Parsed mapping; entries without "=" are ignored
+    """
+    val = os.getenv(key)
+    if val is None:
+        return dict(default or {})
+    pairs = (item.split("=", 1) for item in val.split(",") if "=" in item)
+    return {k.strip(): v.strip() for k, v in pairs}
@@ -0,0 +1,28 @@
+import os
+import weakref
+from typing import Callable
+
+
+def register_at_fork_reinit(method: Callable[[], None]) -> None:
+    """
+    Call a bound method in child processes right after ``os.fork()``.
+
+    Threads, locks held by other threads and pooled connections do not carry
+    over to a forked child in a usable state, so objects owning them register
+    a method that recreates them. Only a weak reference to the object is kept,
+    so registering does not keep it alive.
+
+    Args:
+        method: Bound method taking no arguments, e.g. ``self._at_fork_reinit``
+    """
+    if not hasattr(os, "register_at_fork"):
+        return
+
+    weak_method = weakref.WeakMethod(method)  # type: ignore[arg-type]
+
+    def after_in_child() -> None:
+        reinit = weak_method()
+        if reinit is not None:
+            reinit()
+
+    os.register_at_fork(after_in_child=after_in_child)
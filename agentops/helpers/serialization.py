@@ -1,70 +1,163 @@
 """Serialization helpers for AgentOps"""
 
 import json
+import os
+import weakref
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 from uuid import UUID
 
 from agentops.logging import logger
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
 
-def is_jsonable(x):
-    try:
-        json.dumps(x)
+JSON_BACKEND = "json"
+ORJSON_BACKEND = "orjson"
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_jsonable(x: Any, seen: Set[int]) -> bool:
+    if isinstance(x, _JSON_SCALARS):
         return True
-    except (TypeError, OverflowError):
-        return False
+    if isinstance(x, (list, tuple, dict)):
+        if id(x) in seen:  # Circular reference
+            return False
+        seen.add(id(x))
+        try:
+            if isinstance(x, dict):
+                return all(isinstance(k, _JSON_SCALARS) and _is_jsonable(v, seen) for k, v in x.items())
+            return all(_is_jsonable(item, seen) for item in x)
+        finally:
+            seen.discard(id(x))
+    return False
+
+
+def is_jsonable(x):
+    """Return whether ``json.dumps`` can encode ``x`` without a custom encoder
+
+    Checks the value's types in a single pass instead of attempting a dump.
+    """
+    return _is_jsonable(x, set())
 
 
 def filter_unjsonable(d: dict) -> dict:
+    def filter_value(v):
+        if isinstance(v, (dict, list)):
+            return filter_dict(v)
+        if isinstance(v, _JSON_SCALARS):
+            return v
+        if isinstance(v, UUID):
+            return str(v)
+        return v if is_jsonable(v) else ""
+
     def filter_dict(obj):
         if isinstance(obj, dict):
-            return {
-                k: (
-                    filter_dict(v)
-                    if isinstance(v, (dict, list)) or is_jsonable(v)
-                    else str(v)
-                    if isinstance(v, UUID)
-                    else ""
-                )
-                for k, v in obj.items()
-            }
+            return {k: filter_value(v) for k, v in obj.items()}
         elif isinstance(obj, list):
-            return [
-                (
-                    filter_dict(x)
-                    if isinstance(x, (dict, list)) or is_jsonable(x)
-                    else str(x)
-                    if isinstance(x, UUID)
-                    else ""
-                )
-                for x in obj
-            ]
+            return [filter_value(x) for x in obj]
         else:
             return obj if is_jsonable(obj) or isinstance(obj, UUID) else ""
 
     return filter_dict(d)
 
 
+# Exact-type conversions tried before the isinstance chain in _default
+_DEFAULT_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    UUID: str,
+    datetime: datetime.isoformat,
+    Decimal: str,
+    set: list,
+}
+
+
+def _default(obj: Any) -> Any:
+    """Convert a value the JSON encoders do not support natively"""
+    converter = _DEFAULT_CONVERTERS.get(type(obj))
+    if converter is not None:
+        return converter(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
 class AgentOpsJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for AgentOps types"""
 
     def default(self, obj: Any) -> Any:
-        if isinstance(obj, UUID):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if isinstance(obj, Decimal):
-            return str(obj)
-        if isinstance(obj, set):
-            return list(obj)
-        if hasattr(obj, "to_json"):
-            return obj.to_json()
-        if isinstance(obj, Enum):
-            return obj.value
-        return str(obj)
+        return _default(obj)
+
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj, cls=AgentOpsJSONEncoder)
+
+
+_ORJSON_OPTIONS = 0
+if orjson is not None:
+    # Non-string keys are stringified and dataclasses go through _default, as with json
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def _orjson_dumps(obj: Any) -> str:
+    return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+
+_BACKENDS: Dict[str, Callable[[Any], str]] = {JSON_BACKEND: _json_dumps}
+if orjson is not None:
+    _BACKENDS[ORJSON_BACKEND] = _orjson_dumps
+
+_dumps: Callable[[Any], str] = _json_dumps
+
+
+def get_json_backend() -> str:
+    """Return the name of the JSON backend used by safe_serialize and safe_serialize_capped"""
+    return next(name for name, dumps in _BACKENDS.items() if dumps is _dumps)
+
+
+def set_json_backend(name: str) -> str:
+    """Select the JSON backend used by safe_serialize and safe_serialize_capped
+
+    Args:
+        name: "json" for the standard library, or "orjson" if installed
+
+    Returns:
+        The backend now in use; unavailable backends fall back to "json"
+    """
+    global _dumps
+    if name not in _BACKENDS:
+        logger.debug(f"JSON backend {name!r} is not available, using {JSON_BACKEND}")
+        name = JSON_BACKEND
+    _dumps = _BACKENDS[name]
+    return name
+
+
+set_json_backend(os.getenv("AGENTOPS_JSON_BACKEND", JSON_BACKEND))
+
+
+def _serialize(obj: Any) -> str:
+    try:
+        return _dumps(obj)
+    except TypeError:
+        if _dumps is _json_dumps:
+            raise
+        # Values the native encoder rejects (e.g. integers beyond 64 bits) go through json
+        return _json_dumps(obj)
 
 
 def serialize_uuid(obj: UUID) -> str:
@@ -72,6 +165,112 @@ def serialize_uuid(obj: UUID) -> str:
     return str(obj)
 
 
+ModelConverter = Callable[[Any], dict]
+
+# Conversion resolved per model class; None means the class is not a model. Weakly
+# keyed, so classes created at runtime (e.g. pydantic create_model) can be collected.
+_MODEL_CONVERTERS: "weakref.WeakKeyDictionary[type, Optional[ModelConverter]]" = weakref.WeakKeyDictionary()
+# Field selections registered with register_model_schema
+_MODEL_SCHEMAS: Dict[type, Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]]]] = {}
+
+
+def register_model_schema(
+    cls: type, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None
+) -> None:
+    """Limit which fields of a model class are recorded
+
+    Applies to instances of ``cls`` and its subclasses converted by
+    ``model_to_dict`` and ``safe_serialize``. Pydantic models skip the
+    excluded fields entirely instead of dumping and discarding them.
+
+    Args:
+        cls: The model class
+        include: Only keep these top-level fields
+        exclude: Drop these top-level fields
+    """
+    _MODEL_SCHEMAS[cls] = (
+        frozenset(include) if include is not None else None,
+        frozenset(exclude) if exclude is not None else None,
+    )
+    _MODEL_CONVERTERS.clear()
+
+
+def _schema_for(cls: type) -> Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]]]:
+    for base in cls.__mro__:
+        if base in _MODEL_SCHEMAS:
+            return _MODEL_SCHEMAS[base]
+    return None, None
+
+
+def _select_fields(
+    data: dict, include: Optional[FrozenSet[str]], exclude: Optional[FrozenSet[str]]
+) -> dict:
+    return {
+        key: value
+        for key, value in data.items()
+        if (include is None or key in include) and (exclude is None or key not in exclude)
+    }
+
+
+def _object_dict(obj: Any) -> dict:
+    try:
+        return obj.__dict__
+    except:
+        return {}
+
+
+def _resolve_model_converter(cls: type) -> Optional[ModelConverter]:
+    if hasattr(cls, "model_dump"):  # Pydantic v2
+        method = "model_dump"
+    elif hasattr(cls, "dict"):  # Pydantic v1
+        method = "dict"
+    elif hasattr(cls, "parse"):  # Raw API response
+        # TODO converting through parse() is causing recursion on nested objects, so use __dict__
+        method = None
+    else:
+        return None
+
+    include, exclude = _schema_for(cls)
+    if method is None:
+        if include is None and exclude is None:
+            return _object_dict
+        return lambda obj: _select_fields(_object_dict(obj), include, exclude)
+
+    kwargs: Dict[str, Any] = {}
+    if include is not None:
+        kwargs["include"] = set(include)
+    if exclude is not None:
+        kwargs["exclude"] = set(exclude)
+    if kwargs:
+        return lambda obj: getattr(obj, method)(**kwargs)
+    return lambda obj: getattr(obj, method)()
+
+
+def _model_converter(obj: Any) -> Optional[ModelConverter]:
+    """Return how ``obj`` is converted to a dict, or None if it is not a model
+
+    The lookup is resolved once per class. Classes answering attribute lookups
+    dynamically through ``__getattr__`` are probed per object instead.
+    """
+    cls = type(obj)
+    try:
+        return _MODEL_CONVERTERS[cls]
+    except KeyError:
+        pass
+
+    converter = _resolve_model_converter(cls)
+    if converter is None and hasattr(cls, "__getattr__"):
+        if hasattr(obj, "model_dump"):
+            return lambda obj: obj.model_dump()
+        if hasattr(obj, "dict"):
+            return lambda obj: obj.dict()
+        if hasattr(obj, "parse"):
+            return _object_dict
+        return None
+    _MODEL_CONVERTERS[cls] = converter
+    return converter
+
+
 def model_to_dict(obj: Any) -> dict:
     """Convert a model object to a dictionary safely.
     
@@ -80,6 +279,9 @@ def model_to_dict(obj: Any) -> dict:
     - Dictionary-like objects
     - API response objects with parse method
     - Objects with __dict__ attribute
+
+    The conversion is looked up once per class and reused, honouring any
+    field selection registered with ``register_model_schema``.
     
     Args:
         obj: The model object to convert to dictionary
@@ -91,19 +293,14 @@ def model_to_dict(obj: Any) -> dict:
         return {}
     if isinstance(obj, dict):
         return obj
-    if hasattr(obj, "model_dump"):  # Pydantic v2
-        return obj.model_dump()
-    elif hasattr(obj, "dict"):  # Pydantic v1
-        return obj.dict()
-    # TODO this is causing recursion on nested objects. 
-    # elif hasattr(obj, "parse"):  # Raw API response
-    #     return model_to_dict(obj.parse())
-    else:
-        # Try to use __dict__ as fallback
-        try:
-            return obj.__dict__
-        except:
-            return {}
+    converter = _model_converter(obj)
+    if converter is not None:
+        return converter(obj)
+    # Try to use __dict__ as fallback
+    include, exclude = _schema_for(type(obj))
+    if include is None and exclude is None:
+        return _object_dict(obj)
+    return _select_fields(_object_dict(obj), include, exclude)
 
 
 def safe_serialize(obj: Any) -> Any:
@@ -127,11 +324,221 @@ def safe_serialize(obj: Any) -> Any:
         return obj
         
     # Convert any model objects to dictionaries
-    if hasattr(obj, "model_dump") or hasattr(obj, "dict") or hasattr(obj, "parse"):
-        obj = model_to_dict(obj)
+    converter = _model_converter(obj)
+    if converter is not None:
+        obj = converter(obj)
     
     try:
-        return json.dumps(obj, cls=AgentOpsJSONEncoder)
+        return _serialize(obj)
     except (TypeError, ValueError) as e:
         logger.warning(f"Failed to serialize object: {e}")
         return str(obj)
+
+
+TRUNCATION_MARKER = "...[truncated]"
+
+DEFAULT_MAX_BYTES = 1_000_000
+DEFAULT_MAX_DEPTH = 32
+DEFAULT_MAX_ITEMS = 1000
+
+_encode_string: Callable[[str], str] = json.encoder.encode_basestring_ascii  # type: ignore
+
+
+class _BudgetedEncoder:
+    """JSON encoder that stops producing output once its character budget is spent.
+
+    Output stays valid JSON: strings are cut short and containers are closed,
+    with ``TRUNCATION_MARKER`` showing where content was left out.
+    """
+
+    def __init__(self, max_bytes: int, max_depth: int, max_items: int):
+        self.parts: List[str] = []
+        self.remaining = max_bytes
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.truncated = False
+
+    def _emit(self, text: str) -> None:
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+    def _emit_string(self, value: str) -> None:
+        # Only encode what can fit; escaping may still expand it, so trim again if needed
+        budget = max(0, self.remaining - 2)
+        cut = len(value) > budget
+        if cut:
+            value = value[:budget]
+        encoded = _encode_string(value)
+        if len(encoded) > self.remaining and value:
+            cut = True
+            value = value[: len(value) * max(0, self.remaining - 2) // len(encoded)]
+            encoded = _encode_string(value)
+        if cut:
+            self.truncated = True
+            encoded = _encode_string(value + TRUNCATION_MARKER)
+        self._emit(encoded)
+
+    def _out_of_budget(self) -> bool:
+        if self.remaining <= 0:
+            self.truncated = True
+        return self.truncated
+
+    def encode(self, obj: Any, depth: int = 0) -> None:
+        if isinstance(obj, str):
+            self._emit_string(obj)
+        elif obj is None:
+            self._emit("null")
+        elif obj is True:
+            self._emit("true")
+        elif obj is False:
+            self._emit("false")
+        elif isinstance(obj, int):
+            self._emit(int.__repr__(obj))
+        elif isinstance(obj, float):
+            self._emit(json.dumps(obj))
+        elif depth >= self.max_depth:
+            self._emit(_encode_string(f"{TRUNCATION_MARKER} max depth"))
+        elif isinstance(obj, dict):
+            self._encode_dict(obj, depth)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            self._encode_sequence(obj, depth)
+        else:
+            try:
+                converted = _default(obj)
+            except Exception:
+                converted = str(obj)
+            self.encode(converted, depth + 1)
+
+    def _encode_sequence(self, items: Any, depth: int) -> None:
+        self._emit("[")
+        for index, item in enumerate(islice(items, self.max_items + 1)):
+            if index:
+                self._emit(", ")
+            if self._out_of_budget():
+                self._emit(_encode_string(TRUNCATION_MARKER))
+                break
+            if index == self.max_items:
+                self._emit(_encode_string(f"{TRUNCATION_MARKER} {len(items) - index} more items"))
+                break
+            self.encode(item, depth + 1)
+        self._emit("]")
+
+    def _encode_dict(self, obj: dict, depth: int) -> None:
+        self._emit("{")
+        for index, (key, value) in enumerate(islice(obj.items(), self.max_items + 1)):
+            if index:
+                self._emit(", ")
+            if self._out_of_budget():
+                self._emit(f"{_encode_string(TRUNCATION_MARKER)}: null")
+                break
+            if index == self.max_items:
+                self._emit(f"{_encode_string(TRUNCATION_MARKER)}: {len(obj) - index}")
+                break
+            if not isinstance(key, str):
+                key = json.dumps(key) if key is None or isinstance(key, (bool, int, float)) else str(key)
+            self._emit(_encode_string(key))
+            self._emit(": ")
+            self.encode(value, depth + 1)
+        self._emit("}")
+
+
+# Characters assumed per number, key or small converted value when estimating the size of a payload
+_ESTIMATED_VALUE_SIZE = 8
+
+_CONTAINER_TYPES = (dict, list, tuple, set, frozenset)
+# Values of these types encode to a few characters
+_SMALL_TYPES = (int, float, bool, type(None), UUID, datetime, Decimal, Enum)
+_SCALAR_EXACT_TYPES = frozenset((int, float, bool, type(None)))
+
+
+def _provably_within_caps(obj: Any, max_bytes: int, max_depth: int, max_items: int) -> bool:
+    """Cheaply tell whether ``obj`` is certain to fit the caps, without encoding it
+
+    Walks the value while charging an estimate of its encoded size against
+    ``max_bytes`` and gives up as soon as the estimate is exceeded, so the walk
+    never visits more than a budget's worth of the value however large it is.
+    Values of unknown types may encode to anything and are never assumed small.
+    """
+    if isinstance(obj, str):
+        return len(obj) + 2 <= max_bytes
+    if isinstance(obj, _SMALL_TYPES):
+        return True
+    if not isinstance(obj, _CONTAINER_TYPES):
+        return False
+    budget = max_bytes
+    pending = [(obj, 0)]
+    while pending:
+        container, depth = pending.pop()
+        if depth >= max_depth or len(container) > max_items:
+            return False
+        budget -= _ESTIMATED_VALUE_SIZE * len(container) + 2
+        if budget < 0:
+            return False
+        values = container.values() if isinstance(container, dict) else container
+        for item in values:
+            # Exact type checks first: they are much cheaper than isinstance on the common types
+            kind = type(item)
+            if kind is str:
+                budget -= len(item)
+            elif kind in _SCALAR_EXACT_TYPES:
+                continue
+            elif isinstance(item, _CONTAINER_TYPES):
+                pending.append((item, depth + 1))
+            elif isinstance(item, str):
+                budget -= len(item)
+            elif not isinstance(item, _SMALL_TYPES):
+                return False
+            if budget < 0:
+                return False
+    return True
+
+
+def safe_serialize_capped(
+    obj: Any,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_items: int = DEFAULT_MAX_ITEMS,
+) -> str:
+    """Serialize an object like ``safe_serialize``, bounding the work by the output size
+
+    Values that a quick walk proves to fit the caps are encoded with the
+    selected JSON backend and kept if the result fits ``max_bytes``. Others go
+    through an encoder that stops as soon as ``max_bytes`` characters have been
+    produced, so a huge argument costs no more than a small one; it also cuts
+    nesting deeper than ``max_depth`` and containers with more than
+    ``max_items`` entries. Wherever content was left out the output contains
+    ``TRUNCATION_MARKER``; the result is still valid JSON (apart from top-level
+    strings, which are returned untouched as in ``safe_serialize``).
+
+    Args:
+        obj: The object to serialize
+        max_bytes: Approximate upper bound on the length of the result
+        max_depth: Maximum nesting depth of containers
+        max_items: Maximum number of entries serialized per list, set or dict
+
+    Returns:
+        The (possibly truncated) serialized representation
+    """
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_bytes else obj[:max_bytes] + TRUNCATION_MARKER
+
+    try:
+        converter = _model_converter(obj)
+        if converter is not None:
+            obj = converter(obj)
+        if _provably_within_caps(obj, max_bytes, max_depth, max_items):
+            # Common case: the selected backend encodes the whole value natively
+            try:
+                text = _serialize(obj)
+            except (TypeError, ValueError, RecursionError):
+                pass
+            else:
+                if len(text) <= max_bytes:
+                    return text
+        encoder = _BudgetedEncoder(max_bytes, max_depth, max_items)
+        encoder.encode(obj)
+        return "".join(encoder.parts)
+    except Exception as e:
+        logger.warning(f"Failed to serialize object: {e}")
+        text = str(obj)
+        return text if len(text) <= max_bytes else text[:max_bytes] + TRUNCATION_MARKER
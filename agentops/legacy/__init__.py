@@ -9,6 +9,7 @@ These integrations use different patterns:
 This module maintains backward compatibility with all these API patterns.
 """
 
+from concurrent.futures import Future
 from typing import Optional, Any, Dict, List, Union
 
 from agentops.logging import logger
@@ -65,12 +66,14 @@ class Session:
         - end_state="Success"
         - end_state_reason="Finished Execution"
         
-        forces a flush to ensure the span is exported immediately.
+        forces a flush to ensure the span is exported immediately. Returns a future
+        resolved once the flush completes.
         """
         if self.span is not None:
             _set_span_attributes(self.span, kwargs)
             self.span.end()
-            _flush_span_processors()
+            return _flush_span_processors()
+        return None
 
 
 def _create_session_span(tags: Union[Dict[str, Any], List[str], None] = None) -> tuple:
@@ -178,19 +181,21 @@ def _set_span_attributes(span: Any, attributes: Dict[str, Any]) -> None:
         span.set_attribute(f"agentops.status.{key}", str(value))
 
 
-def _flush_span_processors() -> None:
+def _flush_span_processors() -> Optional[Future]:
     """
     Helper to force flush all span processors.
+
+    Returns a future resolved once the flush completes; with ``async_flush``
+    enabled the flush runs in the background and the future can be awaited.
     """
     try:
-        from opentelemetry.trace import get_tracer_provider
-        tracer_provider = get_tracer_provider()
-        tracer_provider.force_flush()  # type: ignore
+        return TracingCore.get_instance().flush()
     except Exception as e:
         logger.warning(f"Failed to force flush span processor: {e}")
+        return None
         
 
-def end_session(session_or_status: Any = None, **kwargs) -> None:
+def end_session(session_or_status: Any = None, **kwargs) -> Optional[Future]:
     """
     @deprecated
     End a previously started AgentOps session.
@@ -214,6 +219,10 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
                  
                  When called this way, the function will use the most recently
                  created session via start_session().
+
+    Returns:
+        A future resolved once the session's spans are flushed, or None if nothing
+        was flushed. With ``async_flush`` enabled the flush runs in the background.
     """
     global _current_session
     
@@ -222,7 +231,9 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
     
     if not TracingCore.get_instance().initialized:
         logger.debug("Ignoring end_session call - TracingCore not initialized")
-        return
+        return None
+
+    flushed = None
 
     # Clear client active session reference
     try:
@@ -254,7 +265,7 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
                 if _current_session.span is not None:
                     _set_span_attributes(_current_session.span, kwargs)
                     _finalize_span(_current_session.span, _current_session.token)
-                    _flush_span_processors()
+                    flushed = _flush_span_processors()
                 _current_session = None
             except Exception as e:
                 logger.warning(f"Error ending current session: {e}")
@@ -265,7 +276,7 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
                         _current_session = None
                 except:
                     pass
-        return
+        return flushed
     
     # Handle the standard pattern and CrewAI >= 0.105.0 pattern where a Session object is passed.
     # In both cases, we call _finalize_span with the span and token from the Session.
@@ -277,7 +288,7 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
                 _set_span_attributes(session_or_status.span, kwargs)
             if session_or_status.span is not None:
                 _finalize_span(session_or_status.span, session_or_status.token)
-                _flush_span_processors()
+                flushed = _flush_span_processors()
             
             # Clear the global session reference if this is the current session
             if _current_session is session_or_status:
@@ -293,6 +304,8 @@ def end_session(session_or_status: Any = None, **kwargs) -> None:
             except:
                 pass
 
+    return flushed
+
 
 def end_all_sessions():
     """
@@ -1,15 +1,34 @@
 import builtins
+import contextlib
 import logging
 import os
 import atexit
-from typing import Any
+from typing import Any, ContextManager, Iterator
 from io import StringIO
 
+from agentops.logging.config import logger
+
 _original_print = builtins.print
 
 # Global buffer to store logs
 _log_buffer = StringIO()
 
+# Characters of the buffer read at a time while uploading
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Seconds an upload waits for background authentication before it is deferred
+_AUTH_WAIT_TIMEOUT = 5.0
+
+
+def _clear_log_buffer() -> None:
+    """Forget the output buffered before fork; the parent uploads it"""
+    _log_buffer.seek(0)
+    _log_buffer.truncate()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_log_buffer)
+
 def setup_print_logger() -> None:
     """
     Instruments the built-in print function and configures logging to use a memory buffer.
@@ -72,20 +91,75 @@ def setup_print_logger() -> None:
     atexit.register(cleanup)
 
 
+def _buffer_lock() -> ContextManager:
+    """The lock the buffer handler holds while writing, so reads never see half a record"""
+    for handler in logging.getLogger('agentops_buffer_logger').handlers:
+        if getattr(handler, "stream", None) is _log_buffer and handler.lock is not None:
+            return handler.lock
+    return contextlib.nullcontext()
+
+
+def _read_log_buffer(end: int) -> Iterator[str]:
+    """Yield the buffer content up to ``end`` in chunks without copying all of it at once"""
+    offset = 0
+    while offset < end:
+        with _buffer_lock():
+            # Logging keeps appending at the current position, so restore it after reading
+            position = _log_buffer.tell()
+            _log_buffer.seek(offset)
+            chunk = _log_buffer.read(min(_UPLOAD_CHUNK_SIZE, end - offset))
+            _log_buffer.seek(position)
+        if not chunk:
+            return
+        offset += len(chunk)
+        yield chunk
+
+
+def _write_logfile(directory: str, end: int, trace_id: int) -> None:
+    """Append the buffer content up to ``end`` to the trace's log file in ``directory``"""
+    path = os.path.join(directory, f"agentops-{trace_id:032x}.log")
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for chunk in _read_log_buffer(end):
+            f.write(chunk)
+
+
 def upload_logfile(trace_id: int) -> None:
     """
     Upload the log content from the memory buffer to the API.
+
+    The buffer is streamed to the API in chunks. Output logged while the upload
+    is in progress stays in the buffer for the next upload, as does all of it
+    when background authentication has not finished within a few seconds.
+    When spans are written to ``export_file_dir`` instead of being exported,
+    the log is written next to them, as the API is never contacted.
     """
     from agentops import get_client
 
-    # Get the content from the buffer
-    log_content = _log_buffer.getvalue()
-    if not log_content:
+    with _buffer_lock():
+        end = _log_buffer.tell()
+    if not end:
         return
 
     client = get_client()
-    client.api.v4.upload_logfile(log_content, trace_id)
-
-    # Clear the buffer after upload
-    _log_buffer.seek(0)
-    _log_buffer.truncate()
+    if client.config.export_file_dir:
+        try:
+            _write_logfile(client.config.export_file_dir, end, trace_id)
+        except OSError as e:
+            logger.warning(f"Cannot write the log file to {client.config.export_file_dir}: {e}")
+            return
+    else:
+        # The v4 token is only set once background authentication completes. This runs on
+        # the thread ending the root span, so never block it for long on a slow login.
+        if not client.wait_for_auth(timeout=_AUTH_WAIT_TIMEOUT):
+            logger.debug("Authentication still in progress, deferring the log upload")
+            return
+        client.api.v4.upload_logfile(_read_log_buffer(end), trace_id)
+
+    # Remove the uploaded content from the buffer
+    with _buffer_lock():
+        _log_buffer.seek(end)
+        remaining = _log_buffer.read()
+        _log_buffer.seek(0)
+        _log_buffer.truncate()
+        _log_buffer.write(remaining)
@@ -8,7 +8,7 @@ for different types of operations in AI agent workflows.
 # Import core components
 from agentops.sdk.core import TracingCore
 # Import decorators
-from agentops.sdk.decorators import agent, operation, session, task, workflow
+from agentops.sdk.decorators import agent, operation, session, task, tool, workflow
 # from agentops.sdk.traced import TracedObject  # Merged into TracedObject
 from agentops.sdk.types import TracingConfig
 
@@ -22,4 +22,5 @@ __all__ = [
     "agent",
     "task",
     "workflow",
+    "tool",
 ]
@@ -0,0 +1,282 @@
+"""
+Aggregated recording of high-frequency entity calls.
+
+Functions decorated with ``aggregate=True`` (e.g. ``@tool(aggregate=True)``)
+do not start a span per call. Instead, the calls made under the same parent
+span are summarized by :class:`CallAggregator`, and
+:class:`AggregatingSpanProcessor` emits one summary span per decorated
+function when the parent span ends. The summary carries the call count,
+error count, a latency histogram and a few sampled calls (exemplars) as
+span events, so trace volume follows agent steps rather than inner loops.
+"""
+
+import random
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.trace import NonRecordingSpan, SpanContext, Status, StatusCode
+
+from agentops.helpers.serialization import safe_serialize_capped
+from agentops.logging import logger
+from agentops.semconv.span_attributes import SpanAttributes
+
+# Explicit histogram bucket bounds, as used by OpenTelemetry duration histograms
+DEFAULT_LATENCY_BOUNDS_MILLIS: Tuple[float, ...] = (
+    0, 5, 10, 25, 50, 75, 100, 250, 500, 750, 1000, 2500, 5000, 7500, 10000
+)
+
+EXEMPLAR_EVENT = "agentops.aggregate.exemplar"
+MAX_EXEMPLAR_SIZE = 4096
+
+_SpanKey = Tuple[int, int]
+
+
+class _CallStats:
+    """Summary of the calls of one function under one parent span."""
+
+    __slots__ = (
+        "attributes",
+        "count",
+        "errors",
+        "total_ns",
+        "min_ns",
+        "max_ns",
+        "start_ns",
+        "end_ns",
+        "buckets",
+        "exemplars",
+        "exemplar_calls",
+    )
+
+    def __init__(self, attributes: Dict[str, Any], bucket_count: int):
+        self.attributes = attributes
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.start_ns = 0
+        self.end_ns = 0
+        self.buckets = [0] * bucket_count
+        self.exemplars: List[Tuple[int, Dict[str, Any]]] = []
+        # Number of the call each exemplar slot was last given to
+        self.exemplar_calls: List[int] = []
+
+
+def _exemplar(
+    duration_ns: int, args: tuple, kwargs: Dict[str, Any], result: Any, error: Optional[BaseException]
+) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {
+        SpanAttributes.AGENTOPS_ENTITY_INPUT: safe_serialize_capped(
+            {"args": args, "kwargs": kwargs}, max_bytes=MAX_EXEMPLAR_SIZE
+        ),
+        "duration_ms": duration_ns / 1e6,
+    }
+    if error is not None:
+        attributes["exception.type"] = type(error).__name__
+        attributes["exception.message"] = str(error)
+    else:
+        attributes[SpanAttributes.AGENTOPS_ENTITY_OUTPUT] = safe_serialize_capped(result, max_bytes=MAX_EXEMPLAR_SIZE)
+    return attributes
+
+
+class CallAggregator:
+    """
+    Thread-safe accumulator of call statistics, keyed by parent span and span name.
+
+    Exemplars are picked by reservoir sampling, so each call has the same
+    chance of being kept; only the picked calls are serialized.
+    """
+
+    def __init__(
+        self,
+        latency_bounds_millis: Sequence[float] = DEFAULT_LATENCY_BOUNDS_MILLIS,
+        max_exemplars: int = 3,
+        max_parents: int = 10000,
+    ):
+        """
+        Args:
+            latency_bounds_millis: Upper bounds of the latency histogram buckets
+            max_exemplars: Number of sampled calls kept per summary
+            max_parents: Maximum number of parent spans with pending summaries; the
+                oldest are emitted early beyond that
+        """
+        self.latency_bounds_millis = tuple(latency_bounds_millis)
+        self.max_exemplars = max_exemplars
+        self.max_parents = max_parents
+        # Called with (parent context, summaries) for summaries evicted before their parent ended
+        self.on_evict: Optional[Callable[[SpanContext, Dict[str, _CallStats]], None]] = None
+
+        self._bounds_ns = [int(bound * 1e6) for bound in self.latency_bounds_millis]
+        self._pending: "OrderedDict[_SpanKey, Tuple[SpanContext, Dict[str, _CallStats]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        parent: SpanContext,
+        span_name: str,
+        attributes: Dict[str, Any],
+        start_ns: int,
+        end_ns: int,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Add one call to the summary of ``span_name`` under ``parent``.
+
+        Args:
+            parent: Context of the span the call was made under
+            span_name: Name of the summary span
+            attributes: Base attributes of the summary span
+            start_ns: Call start time in nanoseconds since the epoch
+            end_ns: Call end time in nanoseconds since the epoch
+            args: Positional arguments of the call
+            kwargs: Keyword arguments of the call
+            result: Return value of the call
+            error: Exception raised by the call, if any
+        """
+        duration = end_ns - start_ns
+        evicted = None
+        with self._lock:
+            key = (parent.trace_id, parent.span_id)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = (parent, {})
+                if len(self._pending) > self.max_parents:
+                    evicted = self._pending.popitem(last=False)[1]
+            calls = entry[1]
+            stats = calls.get(span_name)
+            if stats is None:
+                stats = calls[span_name] = _CallStats(attributes, len(self._bounds_ns) + 1)
+                stats.start_ns = start_ns
+                stats.min_ns = duration
+
+            stats.count += 1
+            if error is not None:
+                stats.errors += 1
+            stats.total_ns += duration
+            stats.min_ns = min(stats.min_ns, duration)
+            stats.max_ns = max(stats.max_ns, duration)
+            stats.start_ns = min(stats.start_ns, start_ns)
+            stats.end_ns = max(stats.end_ns, end_ns)
+            stats.buckets[bisect_left(self._bounds_ns, duration)] += 1
+
+            call = stats.count
+            if len(stats.exemplars) < self.max_exemplars:
+                slot: Optional[int] = len(stats.exemplars)
+                stats.exemplars.append((start_ns, {}))
+                stats.exemplar_calls.append(call)
+            else:
+                slot = random.randrange(stats.count)
+                if slot >= self.max_exemplars:
+                    slot = None
+                else:
+                    stats.exemplar_calls[slot] = call
+
+        if slot is not None:
+            # Serialized outside the lock so other threads' calls are not held up;
+            # a later call given the same slot meanwhile takes precedence
+            exemplar = _exemplar(duration, args, kwargs, result, error)
+            with self._lock:
+                if stats.exemplar_calls[slot] == call:
+                    stats.exemplars[slot] = (start_ns, exemplar)
+
+        if evicted is not None and self.on_evict is not None:
+            self.on_evict(*evicted)
+
+    def pop(self, parent: SpanContext) -> Optional[Dict[str, _CallStats]]:
+        """Remove and return the summaries pending under ``parent``, if any"""
+        with self._lock:
+            entry = self._pending.pop((parent.trace_id, parent.span_id), None)
+        return entry[1] if entry is not None else None
+
+    def pop_all(self) -> List[Tuple[SpanContext, Dict[str, _CallStats]]]:
+        """Remove and return every pending summary"""
+        with self._lock:
+            entries = list(self._pending.values())
+            self._pending.clear()
+        return entries
+
+
+entity_call_aggregator = CallAggregator()
+
+
+class AggregatingSpanProcessor(SpanProcessor):
+    """
+    Emits the summary spans of aggregated calls when their parent span ends.
+
+    Add it before the exporting processors so the summaries are exported
+    along with their parent, including at shutdown.
+    """
+
+    def __init__(self, tracer_provider: TracerProvider, aggregator: CallAggregator = entity_call_aggregator):
+        """
+        Args:
+            tracer_provider: Provider used to create the summary spans
+            aggregator: Source of the call summaries
+        """
+        self.aggregator = aggregator
+        self._tracer = tracer_provider.get_tracer("agentops.aggregation")
+        aggregator.on_evict = self._emit
+
+    def on_start(self, span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not len(self.aggregator) or span.context is None:
+            return
+        calls = self.aggregator.pop(span.context)
+        if calls:
+            self._emit(span.context, calls)
+
+    def _emit(self, parent: SpanContext, calls: Dict[str, _CallStats]) -> None:
+        context = trace.set_span_in_context(NonRecordingSpan(parent))
+        for span_name, stats in calls.items():
+            try:
+                self._emit_summary(context, span_name, stats)
+            except Exception as e:
+                logger.warning(f"Failed to emit aggregated span {span_name}: {e}")
+
+    def _emit_summary(self, context: Context, span_name: str, stats: _CallStats) -> None:
+        attributes = dict(stats.attributes)
+        attributes.update(
+            {
+                SpanAttributes.AGENTOPS_AGGREGATE_CALL_COUNT: stats.count,
+                SpanAttributes.AGENTOPS_AGGREGATE_ERROR_COUNT: stats.errors,
+                SpanAttributes.AGENTOPS_AGGREGATE_DURATION_TOTAL: stats.total_ns / 1e6,
+                SpanAttributes.AGENTOPS_AGGREGATE_DURATION_MIN: stats.min_ns / 1e6,
+                SpanAttributes.AGENTOPS_AGGREGATE_DURATION_MAX: stats.max_ns / 1e6,
+                SpanAttributes.AGENTOPS_AGGREGATE_LATENCY_BOUNDS: [
+                    float(bound) for bound in self.aggregator.latency_bounds_millis
+                ],
+                SpanAttributes.AGENTOPS_AGGREGATE_LATENCY_COUNTS: list(stats.buckets),
+            }
+        )
+        span = self._tracer.start_span(span_name, context=context, attributes=attributes, start_time=stats.start_ns)
+        for timestamp, exemplar in stats.exemplars:
+            if not exemplar:
+                continue  # Still being serialized when the parent ended
+            span.add_event(EXEMPLAR_EVENT, exemplar, timestamp=timestamp)
+        if stats.errors:
+            span.set_status(Status(StatusCode.ERROR, f"{stats.errors} of {stats.count} calls failed"))
+        span.end(end_time=stats.end_ns)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        # Summaries are emitted with their parent; parents still running keep theirs
+        return True
+
+    def shutdown(self) -> None:
+        for parent, calls in self.aggregator.pop_all():
+            self._emit(parent, calls)
+        if self.aggregator.on_evict == self._emit:
+            self.aggregator.on_evict = None
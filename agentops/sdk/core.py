@@ -2,27 +2,38 @@ from __future__ import annotations
 
 import atexit
 import threading
+from concurrent.futures import Future
 import platform
 import sys
 import os
 import psutil
-from typing import List, Optional
+from typing import Callable, Dict, Optional
 
 from opentelemetry import metrics, trace
 from opentelemetry.exporter.otlp.proto.http.metric_exporter import \
     OTLPMetricExporter
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import \
-    OTLPSpanExporter
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
 from opentelemetry import context as context_api
 
 from agentops.exceptions import AgentOpsClientNotInitializedException
+from agentops.helpers.fork import register_at_fork_reinit
 from agentops.logging import logger, setup_print_logger
-from agentops.sdk.processors import InternalSpanProcessor
+from agentops.sdk.aggregation import AggregatingSpanProcessor
+from agentops.sdk.deferred import DeferredSerializingExporter
+from agentops.sdk.exporters import AuthenticatedOTLPExporter, FileSpanExporter
+from agentops.sdk.processors import (
+    AdaptiveBatchSpanProcessor,
+    InternalSpanProcessor,
+    ParallelSpanProcessor,
+    SpillingBatchSpanProcessor,
+)
+from agentops.sdk.sampling import AgentOpsSampler, TailSamplingSpanProcessor
+from agentops.sdk.scheduling import AdaptiveExportScheduler
+from agentops.sdk.spill import SpanSpiller, SpillJournal, claim_spill_directory, default_spill_root
 from agentops.sdk.types import TracingConfig
 from agentops.semconv import ResourceAttributes
 
@@ -105,6 +116,21 @@ def setup_telemetry(
     max_wait_time: int = 5000,
     export_flush_interval: int = 1000,
     jwt: Optional[str] = None,
+    spill_to_disk: bool = False,
+    spill_dir: Optional[str] = None,
+    spill_max_bytes: int = 256 * 1024 * 1024,
+    export_compression: str = "gzip",
+    export_compression_level: Optional[int] = None,
+    adaptive_export: bool = False,
+    export_workers: int = 1,
+    export_file_dir: Optional[str] = None,
+    tail_sample_rate: Optional[float] = None,
+    tail_sample_latency_threshold: int = 30000,
+    tail_sample_token_threshold: int = 20000,
+    sample_rate: float = 1.0,
+    span_rate_limits: Optional[Dict[str, float]] = None,
+    lazy_serialization: bool = False,
+    background_auth: bool = False,
 ) -> tuple[TracerProvider, MeterProvider]:
     """
     Setup the telemetry system.
@@ -118,6 +144,22 @@ def setup_telemetry(
         max_wait_time: Maximum time in milliseconds to wait before flushing
         export_flush_interval: Time interval in milliseconds between automatic exports of telemetry data
         jwt: JWT token for authentication
+        spill_to_disk: Spill overflowed or undeliverable spans to a disk journal instead of dropping them
+        spill_dir: Directory for the spill journal; by default each process claims one under a shared temporary
+            directory, taking over journals left by exited processes
+        spill_max_bytes: Maximum disk usage in bytes of the spill journal
+        export_compression: Compression for exported spans; one of gzip, deflate, zstd or none
+        export_compression_level: Compression level, or None for the codec default
+        adaptive_export: Adapt batch size and flush delay to load; max_queue_size and export_flush_interval become upper bounds
+        export_workers: Number of concurrent export workers; spans are routed to a worker by trace id
+        export_file_dir: Write spans to rotating local files in this directory instead of the exporter endpoint
+        tail_sample_rate: Fraction of uneventful sessions kept by tail sampling; None exports every span
+        tail_sample_latency_threshold: Sessions lasting at least this many milliseconds are always kept by tail sampling
+        tail_sample_token_threshold: Sessions using at least this many LLM tokens are always kept by tail sampling
+        sample_rate: Fraction of new traces sampled when they start; children follow their parent
+        span_rate_limits: Maximum spans per second keyed by span kind or span name prefix; session spans are never limited
+        lazy_serialization: Serialize decorator inputs and outputs on the export thread, only for exported spans
+        background_auth: Create the exporter without a JWT and buffer its batches until TracingCore.authenticate provides one
 
     Returns:
         Tuple of (TracerProvider, MeterProvider)
@@ -140,23 +182,84 @@ def setup_telemetry(
     resource_attrs[ResourceAttributes.IMPORTED_LIBRARIES] = imported_libraries
 
     resource = Resource(resource_attrs)
-    provider = TracerProvider(resource=resource)
+    provider = TracerProvider(
+        resource=resource,
+        sampler=AgentOpsSampler(sample_rate, span_rate_limits),
+    )
 
     # Set as global provider
     trace.set_tracer_provider(provider)
 
-    # Create exporter with authentication
-    exporter = OTLPSpanExporter(
-        endpoint=exporter_endpoint,
-        headers={"Authorization": f"Bearer {jwt}"} if jwt else {}
-    )
+    # Summaries of aggregated calls are emitted when their parent ends; adding this
+    # processor first lets them reach the exporting processors along with the parent
+    provider.add_span_processor(AggregatingSpanProcessor(provider))
+
+    # Create exporter with authentication, or write to local files for offline runs
+    exporter: SpanExporter
+    if export_file_dir:
+        exporter = FileSpanExporter(export_file_dir)
+        logger.debug(f"Writing spans to {export_file_dir}")
+    else:
+        exporter = AuthenticatedOTLPExporter(
+            endpoint=exporter_endpoint,
+            jwt=jwt,
+            compression=export_compression,
+            compression_level=export_compression_level,
+            await_jwt=background_auth,
+        )
+    if lazy_serialization:
+        exporter = DeferredSerializingExporter(exporter)
 
     # Regular processor for normal spans and immediate export
-    processor = BatchSpanProcessor(
-        exporter,
-        max_export_batch_size=max_queue_size,
-        schedule_delay_millis=export_flush_interval,
-    )
+    spill_root: Optional[str] = None
+    if spill_to_disk:
+        spill_root = spill_dir or claim_spill_directory(default_spill_root())
+        logger.debug(f"Spilling overflowed spans to {spill_root}")
+
+    def create_processor(span_exporter: SpanExporter, worker: int = 0) -> SpanProcessor:
+        journal: Optional[SpillJournal] = None
+        if spill_root is not None:
+            # Workers spill to separate journals that share the disk budget
+            path = spill_root if export_workers <= 1 else os.path.join(spill_root, f"worker-{worker}")
+            journal = SpillJournal(path, max_bytes=spill_max_bytes // max(1, export_workers))
+
+        if adaptive_export:
+            return AdaptiveBatchSpanProcessor(
+                span_exporter,
+                AdaptiveExportScheduler(
+                    max_batch_size=max_queue_size,
+                    max_delay_millis=export_flush_interval,
+                    max_backoff_millis=max_wait_time,
+                ),
+                max_queue_size=max_queue_size * 4,
+                spiller=SpanSpiller(journal, span_exporter) if journal is not None else None,
+                worker=worker,
+            )
+        if journal is not None:
+            return SpillingBatchSpanProcessor(
+                span_exporter,
+                journal,
+                max_export_batch_size=max_queue_size,
+                schedule_delay_millis=export_flush_interval,
+            )
+        return BatchSpanProcessor(
+            span_exporter,
+            max_export_batch_size=max_queue_size,
+            schedule_delay_millis=export_flush_interval,
+        )
+
+    processor: SpanProcessor
+    if export_workers > 1:
+        processor = ParallelSpanProcessor(exporter, create_processor, workers=export_workers)
+    else:
+        processor = create_processor(exporter)
+    if tail_sample_rate is not None:
+        processor = TailSamplingSpanProcessor(
+            processor,
+            sample_rate=tail_sample_rate,
+            latency_threshold_millis=tail_sample_latency_threshold,
+            token_threshold=tail_sample_token_threshold,
+        )
     provider.add_span_processor(processor)
     provider.add_span_processor(InternalSpanProcessor())  # Catches spans for AgentOps on-terminal printing
 
@@ -181,6 +284,46 @@ def setup_telemetry(
     return provider, meter_provider
 
 
+class _FlushWorker:
+    """
+    Background thread that runs tracer provider flushes off the caller's thread.
+
+    Flush requests that arrive while one is already pending are coalesced into
+    it, so a burst of session endings results in a single flush.
+    """
+
+    def __init__(self, flush: Callable[[], bool]):
+        self._flush = flush
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Optional[Future] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self) -> Future:
+        """Request a flush and return a future resolved with its result."""
+        with self._lock:
+            if self._pending is None:
+                self._pending = Future()
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="agentops-flush", daemon=True)
+                    self._thread.start()
+                self._wakeup.set()
+            return self._pending
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                future, self._pending = self._pending, None
+            if future is None or not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._flush())
+            except Exception as e:
+                future.set_exception(e)
+
+
 class TracingCore:
     """
     Central component for tracing in AgentOps.
@@ -206,9 +349,25 @@ class TracingCore:
         self._provider = None
         self._initialized = False
         self._config = None
+        self._flush_worker = _FlushWorker(self._force_flush)
 
         # Register shutdown handler
         atexit.register(self.shutdown)
+        # Pre-fork servers (gunicorn, celery) may initialize before forking workers
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """
+        Make the inherited tracing setup usable in a forked child.
+
+        The provider, configuration and JWT are kept, so spans started before
+        the fork stay valid. Export threads, connection pools and locks are
+        recreated by the components that own them; this resets the core's own.
+        """
+        TracingCore._lock = threading.Lock()
+        self._flush_worker = _FlushWorker(self._force_flush)
+        if self._initialized:
+            logger.debug(f"Tracing core reinitialized in forked process {os.getpid()}")
 
     def initialize(self, jwt: Optional[str] = None, **kwargs) -> None:
         """
@@ -225,6 +384,22 @@ class TracingCore:
                 max_wait_time: Maximum time in milliseconds to wait before flushing
                 api_key: API key for authentication (required for authenticated exporter)
                 project_id: Project ID to include in resource attributes
+                spill_to_disk: Spill overflowed or undeliverable spans to a disk journal
+                spill_dir: Directory for the spill journal
+                spill_max_bytes: Maximum disk usage of the spill journal
+                async_flush: Flush on a background thread instead of blocking the caller when sessions end
+                export_compression: Compression for exported spans (gzip, deflate, zstd or none)
+                export_compression_level: Compression level for exported spans
+                adaptive_export: Adapt export batch size and flush delay to load and exporter health
+                export_workers: Number of concurrent span export workers
+                export_file_dir: Write spans to local files in this directory instead of the exporter endpoint
+                tail_sample_rate: Fraction of uneventful sessions kept by tail sampling; None disables it
+                tail_sample_latency_threshold: Sessions lasting at least this many milliseconds are always kept by tail sampling
+                tail_sample_token_threshold: Sessions using at least this many LLM tokens are always kept by tail sampling
+                sample_rate: Fraction of traces sampled when they start
+                span_rate_limits: Maximum spans per second keyed by span kind or span name prefix
+                lazy_serialization: Serialize decorator inputs and outputs on the export thread
+                background_auth: Buffer exported spans until the JWT is provided with authenticate()
         """
         if self._initialized:
             return
@@ -240,6 +415,18 @@ class TracingCore:
             kwargs.setdefault("max_queue_size", 512)
             kwargs.setdefault("max_wait_time", 5000)
             kwargs.setdefault("export_flush_interval", 1000)
+            kwargs.setdefault("spill_to_disk", False)
+            kwargs.setdefault("spill_max_bytes", 256 * 1024 * 1024)
+            kwargs.setdefault("async_flush", False)
+            kwargs.setdefault("export_compression", "gzip")
+            kwargs.setdefault("adaptive_export", False)
+            kwargs.setdefault("export_workers", 1)
+            kwargs.setdefault("tail_sample_latency_threshold", 30000)
+            kwargs.setdefault("tail_sample_token_threshold", 20000)
+            kwargs.setdefault("sample_rate", 1.0)
+            kwargs.setdefault("span_rate_limits", {})
+            kwargs.setdefault("lazy_serialization", False)
+            kwargs.setdefault("background_auth", False)
 
             # Create a TracingConfig from kwargs with proper defaults
             config: TracingConfig = {
@@ -251,6 +438,22 @@ class TracingCore:
                 "export_flush_interval": kwargs["export_flush_interval"],
                 "api_key": kwargs.get("api_key"),
                 "project_id": kwargs.get("project_id"),
+                "spill_to_disk": kwargs["spill_to_disk"],
+                "spill_dir": kwargs.get("spill_dir"),
+                "spill_max_bytes": kwargs["spill_max_bytes"],
+                "async_flush": kwargs["async_flush"],
+                "export_compression": kwargs["export_compression"],
+                "export_compression_level": kwargs.get("export_compression_level"),
+                "adaptive_export": kwargs["adaptive_export"],
+                "export_workers": kwargs["export_workers"],
+                "export_file_dir": kwargs.get("export_file_dir"),
+                "tail_sample_rate": kwargs.get("tail_sample_rate"),
+                "tail_sample_latency_threshold": kwargs["tail_sample_latency_threshold"],
+                "tail_sample_token_threshold": kwargs["tail_sample_token_threshold"],
+                "sample_rate": kwargs["sample_rate"],
+                "span_rate_limits": kwargs["span_rate_limits"],
+                "lazy_serialization": kwargs["lazy_serialization"],
+                "background_auth": kwargs["background_auth"],
             }
 
             self._config = config
@@ -265,6 +468,21 @@ class TracingCore:
                 max_wait_time=config["max_wait_time"],
                 export_flush_interval=config["export_flush_interval"],
                 jwt=jwt,
+                spill_to_disk=config["spill_to_disk"],
+                spill_dir=config.get("spill_dir"),
+                spill_max_bytes=config["spill_max_bytes"],
+                export_compression=config["export_compression"],
+                export_compression_level=config.get("export_compression_level"),
+                adaptive_export=config["adaptive_export"],
+                export_workers=config["export_workers"],
+                export_file_dir=config.get("export_file_dir"),
+                tail_sample_rate=config.get("tail_sample_rate"),
+                tail_sample_latency_threshold=config["tail_sample_latency_threshold"],
+                tail_sample_token_threshold=config["tail_sample_token_threshold"],
+                sample_rate=config["sample_rate"],
+                span_rate_limits=config["span_rate_limits"],
+                lazy_serialization=config["lazy_serialization"],
+                background_auth=config["background_auth"],
             )
 
             self._initialized = True
@@ -298,6 +516,61 @@ class TracingCore:
 
             self._initialized = False
 
+    def authenticate(self, jwt: str, project_id: Optional[str] = None) -> None:
+        """
+        Provide a new or refreshed JWT to the exporters, sending the spans buffered by those created with ``background_auth``.
+
+        Args:
+            jwt: JWT token for authentication
+            project_id: Project ID added to the resource attributes of exported spans
+                when it was not known at initialization
+        """
+        resource_attributes = None
+        if self._config is not None and project_id and not self._config.get("project_id"):
+            self._config["project_id"] = project_id
+            resource_attributes = {ResourceAttributes.PROJECT_ID: project_id}
+        AuthenticatedOTLPExporter.authenticate_all(jwt, resource_attributes)
+
+    def abandon_authentication(self) -> None:
+        """Drop the spans buffered by exporters waiting for a JWT that will not come."""
+        AuthenticatedOTLPExporter.discard_awaiting()
+
+    def _force_flush(self) -> bool:
+        # Fall back to the global provider so spans created outside of TracingCore are flushed too
+        provider = self._provider if self._initialized else trace.get_tracer_provider()
+        force_flush = getattr(provider, "force_flush", None)
+        if force_flush is None:
+            return True
+        return force_flush()
+
+    def flush(self, blocking: Optional[bool] = None) -> Future:
+        """
+        Flush all span processors.
+
+        In async mode the flush is handed to a background worker and this method
+        returns immediately; callers that need confirmation can wait on the
+        returned future (or ``await asyncio.wrap_future(...)`` it).
+
+        Args:
+            blocking: Whether to flush on the caller's thread. Defaults to the
+                inverse of the ``async_flush`` configuration.
+
+        Returns:
+            A future resolved with the flush result
+        """
+        if blocking is None:
+            blocking = not (self._config or {}).get("async_flush", False)
+
+        if not blocking:
+            return self._flush_worker.submit()
+
+        future: Future = Future()
+        try:
+            future.set_result(self._force_flush())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
     def get_tracer(self, name: str = "agentops") -> trace.Tracer:
         """
         Get a tracer with the given name.
@@ -345,6 +618,22 @@ class TracingCore:
                     "api_key": getattr(config, "api_key", None),
                     "project_id": getattr(config, "project_id", None),
                     "endpoint": getattr(config, "endpoint", None),
+                    "spill_to_disk": getattr(config, "spill_to_disk", False),
+                    "spill_dir": getattr(config, "spill_dir", None),
+                    "spill_max_bytes": getattr(config, "spill_max_bytes", 256 * 1024 * 1024),
+                    "async_flush": getattr(config, "async_flush", False),
+                    "export_compression": getattr(config, "export_compression", "gzip"),
+                    "export_compression_level": getattr(config, "export_compression_level", None),
+                    "adaptive_export": getattr(config, "adaptive_export", False),
+                    "export_workers": getattr(config, "export_workers", 1),
+                    "export_file_dir": getattr(config, "export_file_dir", None),
+                    "tail_sample_rate": getattr(config, "tail_sample_rate", None),
+                    "tail_sample_latency_threshold": getattr(config, "tail_sample_latency_threshold", 30000),
+                    "tail_sample_token_threshold": getattr(config, "tail_sample_token_threshold", 20000),
+                    "sample_rate": getattr(config, "sample_rate", 1.0),
+                    "span_rate_limits": getattr(config, "span_rate_limits", {}),
+                    "lazy_serialization": getattr(config, "lazy_serialization", False),
+                    "background_auth": getattr(config, "background_auth", False),
                 }.items()
                 if v is not None
             }
@@ -14,6 +14,7 @@ task = create_entity_decorator(SpanKind.TASK)
 operation = create_entity_decorator(SpanKind.OPERATION)
 workflow = create_entity_decorator(SpanKind.WORKFLOW)
 session = create_entity_decorator(SpanKind.SESSION)
+tool = create_entity_decorator(SpanKind.TOOL)
 operation = task
 
 __all__ = [
@@ -21,7 +22,8 @@ __all__ = [
     'task',
     'workflow',
     'session',
-    'operation'
+    'operation',
+    'tool'
 ]
 
 # Create decorators task, workflow, session, agent
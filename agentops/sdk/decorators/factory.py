@@ -1,16 +1,118 @@
 import inspect
+import sys
 import types
 import functools
 import asyncio
+import time
+import weakref
+from typing import Any, Dict, Optional
 
 import wrapt  # type: ignore
+from opentelemetry import context as context_api
+from opentelemetry import trace
 
+from agentops.helpers.env import get_env_bool
 from agentops.logging import logger
+from agentops.sdk.aggregation import entity_call_aggregator
 from agentops.sdk.core import TracingCore
 
-from .utility import (_create_as_current_span, _finalize_span, _make_span,
-                     _process_async_generator, _process_sync_generator,
-                     _record_entity_input, _record_entity_output)
+from .utility import (
+    _end_span,
+    _entity_attributes,
+    _instance_context,
+    _process_async_generator,
+    _process_sync_generator,
+    _record_entity_input,
+    _record_entity_output,
+    _start_as_current_span,
+    _start_span,
+)
+
+
+# When set, decorators return the function or class unchanged. Read from the
+# environment at import so code decorated at import time is never wrapped.
+_disabled = get_env_bool("AGENTOPS_DISABLED", False)
+
+
+def set_decorators_disabled(disabled: bool) -> None:
+    """
+    Turn instrumentation by the entity decorators off or on.
+
+    Only affects decorators applied afterwards; functions decorated earlier
+    keep their wrapper, which calls straight through while tracing is not
+    initialized.
+
+    Args:
+        disabled: Whether decorators should return their target unchanged
+    """
+    global _disabled
+    _disabled = disabled
+
+
+def _aggregated_parent(instance) -> Optional[trace.Span]:
+    """Return the span calls are summarized under, or None to trace the call as usual"""
+    parent = trace.get_current_span(_instance_context(instance))
+    if not parent.get_span_context().is_valid:
+        return None
+    return parent
+
+
+def _aggregating_wrapper(traced, span_name: str, attributes: Dict[str, Any]):
+    """Wrap a sync wrapper so calls are summarized under their parent span instead of traced"""
+    def wrapper(wrapped, instance, args, kwargs):
+        if not TracingCore.get_instance()._initialized:
+            return wrapped(*args, **kwargs)
+        parent = _aggregated_parent(instance)
+        if parent is None:
+            # Nothing to summarize under: record an ordinary span
+            return traced(wrapped, instance, args, kwargs)
+        if not parent.is_recording():
+            return wrapped(*args, **kwargs)
+
+        start = time.time_ns()
+        try:
+            result = wrapped(*args, **kwargs)
+        except Exception as e:
+            entity_call_aggregator.record(
+                parent.get_span_context(), span_name, attributes, start, time.time_ns(), args, kwargs, error=e
+            )
+            raise
+        entity_call_aggregator.record(
+            parent.get_span_context(), span_name, attributes, start, time.time_ns(), args, kwargs, result=result
+        )
+        return result
+
+    return wrapper
+
+
+def _aggregating_async_wrapper(traced, span_name: str, attributes: Dict[str, Any]):
+    """Async counterpart of _aggregating_wrapper"""
+    def wrapper(wrapped, instance, args, kwargs):
+        if not TracingCore.get_instance()._initialized:
+            return wrapped(*args, **kwargs)
+        parent = _aggregated_parent(instance)
+        if parent is None:
+            return traced(wrapped, instance, args, kwargs)
+        if not parent.is_recording():
+            return wrapped(*args, **kwargs)
+
+        async def _wrapped_async():
+            start = time.time_ns()
+            try:
+                result = await wrapped(*args, **kwargs)
+            except Exception as e:
+                entity_call_aggregator.record(
+                    parent.get_span_context(), span_name, attributes, start, time.time_ns(), args, kwargs, error=e
+                )
+                raise
+            entity_call_aggregator.record(
+                parent.get_span_context(), span_name, attributes, start, time.time_ns(), args, kwargs, result=result
+            )
+            return result
+
+        return _wrapped_async()
+
+    return wrapper
 
 
 def create_entity_decorator(entity_kind: str):
@@ -21,40 +123,104 @@ def create_entity_decorator(entity_kind: str):
         entity_kind: The type of operation being performed (SpanKind.*)
         
     Returns:
-        A decorator with optional arguments for name and version
+        A decorator with optional arguments for name and version, and
+        ``aggregate``: when True, calls of a function or coroutine function
+        made under the same parent span are summarized into a single span
+        emitted when the parent ends (see agentops.sdk.aggregation)
     """
-    def decorator(wrapped=None, *, name=None, version=None):
+    def decorator(wrapped=None, *, name=None, version=None, aggregate=False):
         # Handle case where decorator is called with parameters
         if wrapped is None:
-            return functools.partial(decorator, name=name, version=version)
+            return functools.partial(decorator, name=name, version=version, aggregate=aggregate)
+
+        # Disabled deployments get the original object back and pay nothing per call
+        if _disabled:
+            return wrapped
         
         # Handle class decoration
         if inspect.isclass(wrapped):
-            # Create a proxy class that wraps the original class
+            class_operation_name = name or wrapped.__name__
+            class_span_name = f"{class_operation_name}.{entity_kind}"
+            class_attributes = _entity_attributes(class_operation_name, entity_kind, version)
+
+            # Create a proxy class that wraps the original class. Each instance
+            # owns a span from construction until close(), the end of a `with`
+            # block, or garbage collection, whichever comes first.
             class WrappedClass(wrapped):
+                _agentops_entity_class = True
+
                 def __init__(self, *args, **kwargs):
                     # Start span when instance is created
-                    operation_name = name or wrapped.__name__
-                    self._agentops_span_context_manager = _create_as_current_span(operation_name, entity_kind, version)
-                    self._agentops_active_span = self._agentops_span_context_manager.__enter__()
-                    
+                    tracer = TracingCore.get_instance().get_tracer()
+                    span = tracer.start_span(class_span_name, attributes=class_attributes)
+                    self._agentops_active_span = span
+                    self._agentops_context_tokens = []
+                    # Ends the span if the instance is collected without being closed;
+                    # it must not reference the instance itself
+                    self._agentops_finalizer = weakref.finalize(self, _end_span, span)
+
                     try:
-                        _record_entity_input(self._agentops_active_span, args, kwargs)
+                        _record_entity_input(span, args, kwargs)
                     except Exception as e:
                         logger.warning(f"Failed to record entity input: {e}")
-                    
-                    # Call the original __init__
-                    super().__init__(*args, **kwargs)
-                
-                def __del__(self):
-                    # End span when instance is destroyed
-                    if hasattr(self, '_agentops_active_span') and hasattr(self, '_agentops_span_context_manager'):
-                        try:
-                            _record_entity_output(self._agentops_active_span, self)
-                        except Exception as e:
-                            logger.warning(f"Failed to record entity output: {e}")
-                        
-                        self._agentops_span_context_manager.__exit__(None, None, None)
+
+                    # Spans started by the original __init__ nest under the instance
+                    token = context_api.attach(_instance_context(self))
+                    try:
+                        super().__init__(*args, **kwargs)
+                    except Exception as e:
+                        span.record_exception(e)
+                        self._agentops_finalizer()
+                        raise
+                    finally:
+                        context_api.detach(token)
+
+                def _agentops_end_span(self):
+                    span = self.__dict__.pop("_agentops_active_span", None)
+                    if span is None:
+                        return
+                    try:
+                        _record_entity_output(span, self)
+                    except Exception as e:
+                        logger.warning(f"Failed to record entity output: {e}")
+                    self._agentops_finalizer()
+
+                def close(self):
+                    """End the instance's span, after the original close() if there is one"""
+                    parent_close = getattr(super(), "close", None)
+                    try:
+                        if parent_close is not None:
+                            return parent_close()
+                    finally:
+                        self._agentops_end_span()
+
+                def __enter__(self):
+                    # Spans started inside the `with` block nest under the instance
+                    context = _instance_context(self)
+                    token = context_api.attach(context) if context is not None else None
+                    self._agentops_context_tokens.append(token)
+                    parent_enter = getattr(super(), "__enter__", None)
+                    if parent_enter is None:
+                        return self
+                    try:
+                        return parent_enter()
+                    except BaseException:
+                        self.__exit__(*sys.exc_info())
+                        raise
+
+                def __exit__(self, exc_type, exc_value, traceback):
+                    span = self.__dict__.get("_agentops_active_span")
+                    if exc_value is not None and span is not None:
+                        span.record_exception(exc_value)
+                    parent_exit = getattr(super(), "__exit__", None)
+                    try:
+                        if parent_exit is not None:
+                            return parent_exit(exc_type, exc_value, traceback)
+                    finally:
+                        token = self._agentops_context_tokens.pop() if self._agentops_context_tokens else None
+                        if token is not None:
+                            context_api.detach(token)
+                        self._agentops_end_span()
             
             # Preserve metadata of the original class
             WrappedClass.__name__ = wrapped.__name__
@@ -64,49 +230,56 @@ def create_entity_decorator(entity_kind: str):
             
             return WrappedClass
             
-        # Create the actual decorator wrapper function for functions
-        @wrapt.decorator
-        def wrapper(wrapped, instance, args, kwargs):
-            # Skip instrumentation if tracer not initialized
-            if not TracingCore.get_instance()._initialized:
-                return wrapped(*args, **kwargs)
-
-            # Use provided name or function name
-            operation_name = name or wrapped.__name__
-
-            # Handle different types of functions (sync, async, generators)
-            is_async = asyncio.iscoroutinefunction(wrapped) or inspect.iscoroutinefunction(wrapped)
-            is_generator = inspect.isgeneratorfunction(wrapped)
-            is_async_generator = inspect.isasyncgenfunction(wrapped)
-
-            # Handle generator functions
-            if is_generator:
-                # Use the old approach for generators
-                span, ctx, token = _make_span(operation_name, entity_kind, version)
+        # Classify the callable and build the span name and attributes once, at
+        # decoration time, so each call only starts the span and runs the function
+        operation_name = name or wrapped.__name__
+        span_name = f"{operation_name}.{entity_kind}"
+        attributes = _entity_attributes(operation_name, entity_kind, version)
+
+        def _generator_span_starter(instance, args, kwargs):
+            # Parent the span to the context of the call, not of the first iteration
+            parent = _instance_context(instance)
+            if parent is None:
+                parent = context_api.get_current()
+
+            def start_span():
+                span, _, _ = _start_span(span_name, entity_kind, attributes, parent, attach=False)
                 try:
                     _record_entity_input(span, args, kwargs)
                 except Exception as e:
                     logger.warning(f"Failed to record entity input: {e}")
-                
+                return span
+
+            return start_span
+
+        # Handle generator functions
+        if inspect.isgeneratorfunction(wrapped):
+            def wrapper(wrapped, instance, args, kwargs):
+                # Skip instrumentation if tracer not initialized
+                if not TracingCore.get_instance()._initialized:
+                    return wrapped(*args, **kwargs)
+
+                # The span starts on the first next() and is current only while the generator body runs
                 result = wrapped(*args, **kwargs)
-                return _process_sync_generator(span, result)
+                return _process_sync_generator(_generator_span_starter(instance, args, kwargs), result)
             
-            # Handle async generator functions
-            elif is_async_generator:
-                # Use the old approach for async generators
-                span, ctx, token = _make_span(operation_name, entity_kind, version)
-                try:
-                    _record_entity_input(span, args, kwargs)
-                except Exception as e:
-                    logger.warning(f"Failed to record entity input: {e}")
-                
+        # Handle async generator functions
+        elif inspect.isasyncgenfunction(wrapped):
+            def wrapper(wrapped, instance, args, kwargs):
+                if not TracingCore.get_instance()._initialized:
+                    return wrapped(*args, **kwargs)
+
                 result = wrapped(*args, **kwargs)
-                return _process_async_generator(span, token, result)
+                return _process_async_generator(_generator_span_starter(instance, args, kwargs), result)
             
-            # Handle async functions
-            elif is_async:
+        # Handle async functions
+        elif asyncio.iscoroutinefunction(wrapped) or inspect.iscoroutinefunction(wrapped):
+            def wrapper(wrapped, instance, args, kwargs):
+                if not TracingCore.get_instance()._initialized:
+                    return wrapped(*args, **kwargs)
+
                 async def _wrapped_async():
-                    with _create_as_current_span(operation_name, entity_kind, version) as span:
+                    with _start_as_current_span(span_name, attributes, _instance_context(instance)) as span:
                         try:
                             _record_entity_input(span, args, kwargs)
                         except Exception as e:
@@ -124,10 +297,17 @@ def create_entity_decorator(entity_kind: str):
                             raise
                 
                 return _wrapped_async()
+
+            if aggregate:
+                wrapper = _aggregating_async_wrapper(wrapper, span_name, attributes)
             
-            # Handle sync functions
-            else:
-                with _create_as_current_span(operation_name, entity_kind, version) as span:
+        # Handle sync functions
+        else:
+            def wrapper(wrapped, instance, args, kwargs):
+                if not TracingCore.get_instance()._initialized:
+                    return wrapped(*args, **kwargs)
+
+                with _start_as_current_span(span_name, attributes, _instance_context(instance)) as span:
                     try:
                         _record_entity_input(span, args, kwargs)
                     except Exception as e:
@@ -144,8 +324,11 @@ def create_entity_decorator(entity_kind: str):
                         span.record_exception(e)
                         raise
 
+            if aggregate:
+                wrapper = _aggregating_wrapper(wrapper, span_name, attributes)
+
         # Return the wrapper for functions, we already returned WrappedClass for classes
-        return wrapper(wrapped) # type: ignore
+        return wrapt.decorator(wrapper)(wrapped) # type: ignore
     
     return decorator
 
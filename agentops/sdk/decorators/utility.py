@@ -1,7 +1,9 @@
 import inspect
+import logging
 import os
 import types
 import warnings
+from concurrent.futures import Future
 from contextlib import contextmanager
 from functools import wraps
 from typing import Any, Callable, ContextManager, Dict, Generator, Optional
@@ -11,9 +13,10 @@ from opentelemetry import trace
 from opentelemetry.context import attach, set_value
 from opentelemetry.trace import Span, SpanContext
 
-from agentops.helpers.serialization import safe_serialize
+from agentops.helpers.serialization import safe_serialize_capped
 from agentops.logging import logger
 from agentops.sdk.core import TracingCore
+from agentops.sdk.deferred import deferred_attributes
 from agentops.semconv import SpanKind
 from agentops.semconv.span_attributes import SpanAttributes
 
@@ -34,34 +37,92 @@ def set_entity_path(entity_path: str) -> None:
 # Helper functions for content management
 
 
-def _check_content_size(content_json: str) -> bool:
-    """Verify that a JSON string is within acceptable size limits (1MB)"""
-    return len(content_json) < 1_000_000
+MAX_CONTENT_SIZE = 1_000_000  # 1MB
 
 
-def _process_sync_generator(span: trace.Span, generator: types.GeneratorType):
-    """Process a synchronous generator and manage its span lifecycle"""
-    # Ensure span context is attached to the generator context
-    context_api.attach(trace.set_span_in_context(span))
-
-    # Yield from the generator while maintaining span context
-    yield from generator
+def _process_sync_generator(start_span: Callable[[], trace.Span], generator: types.GeneratorType):
+    """
+    Drive a synchronous generator under a span and manage the span's lifecycle.
+
+    The span is started by ``start_span`` on the first ``next()``, so a
+    generator that is never iterated never opens a span that could not be
+    ended. The span's context is attached only while the generator body runs
+    (each ``next()``, ``send()``, ``throw()`` and ``close()``) and detached
+    before control returns to the consumer, so the consumer's context is never
+    changed. The span ends when the generator is exhausted, raises, or is
+    closed (explicitly or by garbage collection).
+    """
+    span = start_span()
+    context = trace.set_span_in_context(span)
+    method, value = generator.send, None
+    try:
+        while True:
+            token = context_api.attach(context)
+            try:
+                item = method(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                context_api.detach(token)
+
+            try:
+                value = yield item
+                method = generator.send
+            except GeneratorExit:
+                token = context_api.attach(context)
+                try:
+                    generator.close()
+                finally:
+                    context_api.detach(token)
+                raise
+            except BaseException as e:
+                # Thrown in by the consumer: deliver it to the wrapped generator
+                method, value = generator.throw, e
+    except Exception as e:
+        span.record_exception(e)
+        raise
+    finally:
+        span.end()
 
-    # End the span when generator is exhausted
-    span.end()
-    # No detach because of OpenTelemetry issue #2606
-    # Context will be detached during garbage collection
 
+async def _process_async_generator(start_span: Callable[[], trace.Span], generator: types.AsyncGeneratorType):
+    """
+    Drive an asynchronous generator under a span and manage the span's lifecycle.
 
-async def _process_async_generator(span: trace.Span, context_token: Any, generator: types.AsyncGeneratorType):
-    """Process an asynchronous generator and manage its span lifecycle"""
+    Like ``_process_sync_generator``, with the span started on the first
+    ``asend()`` and its context attached around each ``asend()``, ``athrow()``
+    and ``aclose()`` of the wrapped generator.
+    """
+    span = start_span()
+    context = trace.set_span_in_context(span)
+    method, value = generator.asend, None
     try:
-        async for item in generator:
-            yield item
+        while True:
+            token = context_api.attach(context)
+            try:
+                item = await method(value)
+            except StopAsyncIteration:
+                return
+            finally:
+                context_api.detach(token)
+
+            try:
+                value = yield item
+                method = generator.asend
+            except GeneratorExit:
+                token = context_api.attach(context)
+                try:
+                    await generator.aclose()
+                finally:
+                    context_api.detach(token)
+                raise
+            except BaseException as e:
+                method, value = generator.athrow, e
+    except Exception as e:
+        span.record_exception(e)
+        raise
     finally:
-        # Always ensure span is ended and context detached
         span.end()
-        context_api.detach(context_token)
 
 
 def _get_current_span_info():
@@ -78,13 +139,134 @@ def _get_current_span_info():
     return {"name": "No current span"}
 
 
+def _entity_attributes(
+    operation_name: str,
+    span_kind: str,
+    version: Optional[int] = None,
+    attributes: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the attributes of an entity span.
+
+    Args:
+        operation_name: Name of the operation being traced
+        span_kind: Type of operation (from SpanKind)
+        version: Optional version identifier for the operation
+        attributes: Optional dictionary of attributes to extend
+
+    Returns:
+        The attributes, including the span kind, operation name and version
+    """
+    # Prepare attributes
+    if attributes is None:
+        attributes = {}
+
+    # Add span kind to attributes
+    attributes[SpanAttributes.AGENTOPS_SPAN_KIND] = span_kind
+
+    # Add standard attributes
+    attributes[SpanAttributes.OPERATION_NAME] = operation_name
+    if version is not None:
+        attributes[SpanAttributes.OPERATION_VERSION] = version
+    return attributes
+
+
+# Span ids of the decorated-class instances whose span the current context descends from
+_INSTANCE_SPANS_KEY = context_api.create_key("agentops-instance-spans")
+
+
+def _instance_context(instance: Any) -> Optional[context_api.Context]:
+    """
+    Return the context that nests a method call under its instance's span.
+
+    Instances of decorated classes own a span for their lifetime. Calls to
+    their decorated methods, and code run while constructing or inside a
+    ``with`` block of the instance, are parented to that span. Returns None
+    when ``instance`` has no open span or the current context already
+    descends from it.
+
+    Args:
+        instance: The object a decorated method was called on, if any
+
+    Returns:
+        The context to start the method's span in, or None to use the current one
+    """
+    if instance is None or not getattr(type(instance), "_agentops_entity_class", False):
+        return None
+    span = getattr(instance, "_agentops_active_span", None)
+    if span is None:
+        return None
+
+    current = context_api.get_current()
+    span_id = span.get_span_context().span_id
+    entered = context_api.get_value(_INSTANCE_SPANS_KEY, current) or ()
+    if span_id in entered:
+        return None
+    return context_api.set_value(_INSTANCE_SPANS_KEY, entered + (span_id,), trace.set_span_in_context(span, current))
+
+
+def _end_span(span: trace.Span) -> None:
+    """End ``span``, logging instead of raising on failure"""
+    try:
+        span.end()
+    except Exception as e:
+        logger.warning(f"Error ending span: {e}")
+
+
 @contextmanager
+def _start_as_current_span(
+    span_name: str, attributes: Dict[str, Any], context: Optional[context_api.Context] = None
+) -> Generator[Span, None, None]:
+    """
+    Create and yield a span with a precomputed name and attributes as the current span.
+
+    Decorators compute the name and attributes once when they are applied and
+    call this directly on every invocation. ``attributes`` is not modified.
+
+    Args:
+        span_name: Full span name (``<operation>.<span kind>``)
+        attributes: Attributes to set on the span
+        context: Parent context; defaults to the current context
+
+    Yields:
+        A span with proper context that will be automatically closed when exiting the context
+    """
+    # Context introspection and message formatting are skipped entirely unless
+    # DEBUG is enabled; the logging module caches the level check
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        before_span = _get_current_span_info()
+        logger.debug(f"[DEBUG] BEFORE {span_name} - Current context: {before_span}")
+
+    # Get tracer
+    tracer = TracingCore.get_instance().get_tracer()
+
+    # The span becomes current on top of the parent context, so values set in
+    # it (such as the entered instance spans) carry over to the children
+    token = context_api.attach(context) if context is not None else None
+    try:
+        # Use OpenTelemetry's context manager to properly handle span lifecycle
+        with tracer.start_as_current_span(span_name, attributes=attributes) as span:
+            if debug:
+                span_ctx = span.get_span_context()
+                logger.debug(f"[DEBUG] CREATED {span_name} - span_id: {span_ctx.span_id:x}, parent: {before_span.get('span_id', 'None')}")
+
+            yield span
+    finally:
+        if token is not None:
+            context_api.detach(token)
+    
+    if debug:
+        after_span = _get_current_span_info()
+        logger.debug(f"[DEBUG] AFTER {span_name} - Returned to context: {after_span}")
+
+
 def _create_as_current_span(
     operation_name: str,
     span_kind: str,
     version: Optional[int] = None,
     attributes: Optional[Dict[str, Any]] = None
-) -> Generator[Span, None, None]:
+) -> ContextManager[Span]:
     """
     Create and yield an instrumentation span as the current span using proper context management.
 
@@ -98,46 +280,52 @@ def _create_as_current_span(
         version: Optional version identifier for the operation
         attributes: Optional dictionary of attributes to set on the span
 
-    Yields:
-        A span with proper context that will be automatically closed when exiting the context
+    Returns:
+        A context manager yielding the span and closing it on exit
     """
-    # Log before we do anything
-    before_span = _get_current_span_info()
-    logger.debug(f"[DEBUG] BEFORE {operation_name}.{span_kind} - Current context: {before_span}")
-    
     # Create span with proper naming convention
     span_name = f"{operation_name}.{span_kind}"
+    return _start_as_current_span(span_name, _entity_attributes(operation_name, span_kind, version, attributes))
 
-    # Get tracer
-    tracer = TracingCore.get_instance().get_tracer()
 
-    # Prepare attributes
-    if attributes is None:
-        attributes = {}
+def _start_span(
+    span_name: str,
+    span_kind: str,
+    attributes: Dict[str, Any],
+    context: Optional[context_api.Context] = None,
+    attach: bool = True,
+) -> tuple:
+    """
+    Start a span with a precomputed name and attributes and make it current.
 
-    # Add span kind to attributes
-    attributes[SpanAttributes.AGENTOPS_SPAN_KIND] = span_kind
+    Args:
+        span_name: Full span name (``<operation>.<span kind>``)
+        span_kind: Type of operation (from SpanKind); session spans start a new trace
+        attributes: Attributes to set on the span
+        context: Parent context; defaults to the current context
+        attach: Whether to make the span current; if False the returned token is None
 
-    # Add standard attributes
-    attributes[SpanAttributes.OPERATION_NAME] = operation_name
-    if version is not None:
-        attributes[SpanAttributes.OPERATION_VERSION] = version
+    Returns:
+        A tuple of (span, context, token), see _make_span
+    """
+    # Get tracer
+    tracer = TracingCore.get_instance().get_tracer()
 
-    # Get current context explicitly to debug it
-    current_context = context_api.get_current()
-    
-    # Use OpenTelemetry's context manager to properly handle span lifecycle
-    with tracer.start_as_current_span(span_name, attributes=attributes, context=current_context) as span:
-        # Log after span creation
-        if hasattr(span, "get_span_context"):
-            span_ctx = span.get_span_context()
-            logger.debug(f"[DEBUG] CREATED {span_name} - span_id: {span_ctx.span_id:x}, parent: {before_span.get('span_id', 'None')}")
-        
-        yield span
+    # Create the span with proper context management
+    if span_kind == SpanKind.SESSION:
+        # For session spans, create as a root span
+        span = tracer.start_span(span_name, attributes=attributes)
+    else:
+        # For other spans, use the current context
+        if context is None:
+            context = context_api.get_current()
+        span = tracer.start_span(span_name, context=context, attributes=attributes)
     
-    # Log after we're done
-    after_span = _get_current_span_info()
-    logger.debug(f"[DEBUG] AFTER {operation_name}.{span_kind} - Returned to context: {after_span}")
+    # Set as current context and get token for detachment
+    ctx = trace.set_span_in_context(span, context)
+    token = context_api.attach(ctx) if attach else None
+
+    return span, ctx, token
 
 
 def _make_span(
@@ -166,74 +354,62 @@ def _make_span(
     """
     # Create span with proper naming convention
     span_name = f"{operation_name}.{span_kind}"
+    return _start_span(span_name, span_kind, _entity_attributes(operation_name, span_kind, version, attributes))
 
-    # Get tracer
-    tracer = TracingCore.get_instance().get_tracer()
 
-    # Prepare attributes
-    if attributes is None:
-        attributes = {}
+def _serialize_entity(value: Any) -> str:
+    """Serialize an entity input/output, truncating it at MAX_CONTENT_SIZE"""
+    # Encoding stops at the size limit, so oversized values are never fully serialized
+    return safe_serialize_capped(value, max_bytes=MAX_CONTENT_SIZE)
 
-    # Add span kind to attributes
-    attributes[SpanAttributes.AGENTOPS_SPAN_KIND] = span_kind
 
-    # Add standard attributes
-    attributes[SpanAttributes.OPERATION_NAME] = operation_name
-    if version is not None:
-        attributes[SpanAttributes.OPERATION_VERSION] = version
+# Spans that stay open for a whole session or object lifetime; their input is
+# serialized right away rather than held until they end
+_LONG_LIVED_KINDS = frozenset((SpanKind.SESSION, SpanKind.AGENT, SpanKind.WORKFLOW))
 
-    current_context = context_api.get_current()
-    
-    # Create the span with proper context management
-    if span_kind == SpanKind.SESSION:
-        # For session spans, create as a root span
-        span = tracer.start_span(span_name, attributes=attributes)
-    else:
-        # For other spans, use the current context
-        span = tracer.start_span(span_name, context=current_context, attributes=attributes)
-    
-    # Set as current context and get token for detachment
-    ctx = trace.set_span_in_context(span)
-    token = context_api.attach(ctx)
 
-    return span, ctx, token
+def _span_kind(span: trace.Span) -> Optional[str]:
+    attributes = getattr(span, "attributes", None)
+    return attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) if attributes else None
 
 
 def _record_entity_input(span: trace.Span, args: tuple, kwargs: Dict[str, Any]) -> None:
     """Record operation input parameters to span if content tracing is enabled"""
+    if not span.is_recording():
+        # Sampled out: skip serializing values that would be discarded anyway
+        return
+    input_data = {"args": args, "kwargs": kwargs}
+    if deferred_attributes.enabled and _span_kind(span) not in _LONG_LIVED_KINDS:
+        # Serialized on the export worker, only if the span is exported
+        deferred_attributes.defer(span, SpanAttributes.AGENTOPS_ENTITY_INPUT, input_data, _serialize_entity)
+        return
     try:
-        input_data = {"args": args, "kwargs": kwargs}
-        json_data = safe_serialize(input_data)
-
-        if _check_content_size(json_data):
-            span.set_attribute(SpanAttributes.AGENTOPS_ENTITY_INPUT, json_data)
-        else:
-            logger.debug("Operation input exceeds size limit, not recording")
+        span.set_attribute(SpanAttributes.AGENTOPS_ENTITY_INPUT, _serialize_entity(input_data))
     except Exception as err:
         logger.warning(f"Failed to serialize operation input: {err}")
 
 
 def _record_entity_output(span: trace.Span, result: Any) -> None:
     """Record operation output value to span if content tracing is enabled"""
+    if not span.is_recording():
+        return
+    if deferred_attributes.enabled:
+        deferred_attributes.defer(span, SpanAttributes.AGENTOPS_ENTITY_OUTPUT, result, _serialize_entity)
+        return
     try:
-        json_data = safe_serialize(result)
-
-        if _check_content_size(json_data):
-            span.set_attribute(SpanAttributes.AGENTOPS_ENTITY_OUTPUT, json_data)
-        else:
-            logger.debug("Operation output exceeds size limit, not recording")
+        span.set_attribute(SpanAttributes.AGENTOPS_ENTITY_OUTPUT, _serialize_entity(result))
     except Exception as err:
         logger.warning(f"Failed to serialize operation output: {err}")
 
 
-def _finalize_span(span: trace.Span, token: Any) -> None:
+def _finalize_span(span: trace.Span, token: Any) -> Optional[Future]:
     """
     Finalizes a span and cleans up its context.
     
     This function performs three critical tasks needed for proper span lifecycle management:
     1. Ends the span to mark it complete and calculate its duration
     2. Detaches the context token to prevent memory leaks and maintain proper context hierarchy
-    3. Forces immediate span export rather than waiting for batch processing
+    3. Requests immediate span export rather than waiting for batch processing
     
     Use cases:
     - Session span termination: Ensures root spans are properly ended and exported
@@ -242,10 +418,16 @@ def _finalize_span(span: trace.Span, token: Any) -> None:
     
     Without proper finalization, spans may not trigger on_end events in processors,
     potentially resulting in missing or incomplete telemetry data.
+
+    When ``async_flush`` is enabled the export is handed to a background worker
+    and this function returns without waiting for the OTLP round-trip.
     
     Args:
         span: The span to finalize
         token: The context token to detach
+
+    Returns:
+        A future resolved once the flush completes, or None if flushing failed
     """
     # End the span
     if span:
@@ -267,9 +449,7 @@ def _finalize_span(span: trace.Span, token: Any) -> None:
     # We use try/except to gracefully handle these cases while ensuring spans are 
     # flushed when possible, which is especially critical for session spans.
     try:
-        from opentelemetry.trace import get_tracer_provider
-        tracer_provider = get_tracer_provider()
-        tracer_provider.force_flush()
-    except (AttributeError, Exception):
+        return TracingCore.get_instance().flush()
+    except Exception:
         # Either force_flush doesn't exist or there was an error calling it
-        pass
+        return None
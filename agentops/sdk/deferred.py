@@ -0,0 +1,261 @@
+"""
+Deferred span attributes for AgentOps SDK.
+
+With lazy serialization enabled, decorators store references to their inputs
+and outputs here instead of encoding them on the caller's thread. The values
+are serialized by :class:`DeferredSerializingExporter` on the export worker,
+and only for spans that actually reach the exporter; spans dropped by
+sampling never pay for serialization at all.
+
+References are not copied, so an argument mutated after the decorated call
+returns is recorded in its mutated state. Inputs of session, agent and
+workflow spans, which stay open for long, are serialized right away instead.
+"""
+
+import sys
+from collections import OrderedDict
+from itertools import islice
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Span
+
+from agentops.logging import logger
+
+# Serializes a captured value into an attribute value, or None to leave it out
+Serializer = Callable[[Any], Optional[str]]
+
+_SpanKey = Tuple[int, int]
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+# Container entries sampled, per level, when estimating the size of a value
+_SIZE_SAMPLE = 16
+_SIZE_DEPTH = 3
+
+
+def _estimate_size(value: Any, depth: int = _SIZE_DEPTH) -> int:
+    """Roughly estimate the memory held by ``value`` from a bounded sample of its contents"""
+    size = sys.getsizeof(value, 64)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        items: Iterable[Any] = value.values()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    else:
+        return size
+    count = len(value)
+    if not count:
+        return size
+    sample = [_estimate_size(item, depth - 1) for item in islice(items, _SIZE_SAMPLE)]
+    return size + sum(sample) * count // len(sample)
+
+
+def _serialized(text: Optional[str]) -> Optional[str]:
+    """Serializer of entries that were already serialized"""
+    return text
+
+
+class DeferredAttributeStore:
+    """
+    Registry of attribute values waiting to be serialized, keyed by span.
+
+    Memory is bounded by the estimated size of the held values. Over
+    ``max_bytes``, the oldest values are serialized in place, which releases
+    the references to them while keeping the attribute; only if the serialized
+    values alone exceed the bound are the oldest spans evicted. Processors
+    that drop spans call ``discard`` so their values are released right away.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Approximate upper bound on the memory held by pending values
+        """
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self.evicted_spans = 0
+        # Entry per attribute: [value, serializer, estimated size]
+        self._pending: "OrderedDict[_SpanKey, Dict[str, List[Any]]]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def size(self) -> int:
+        """Estimated memory held by the pending values, in bytes."""
+        return self._size
+
+    def defer(self, span: Span, key: str, value: Any, serializer: Serializer) -> None:
+        """
+        Record ``value`` to be serialized into attribute ``key`` at export time.
+
+        Args:
+            span: The span the attribute belongs to
+            key: Attribute name
+            value: The value to serialize later
+            serializer: Turns the value into the attribute value
+        """
+        context = span.get_span_context()
+        span_key = (context.trace_id, context.span_id)
+        size = _estimate_size(value)
+        with self._lock:
+            attributes = self._pending.setdefault(span_key, {})
+            previous = attributes.get(key)
+            if previous is not None:
+                self._size -= previous[2]
+            attributes[key] = [value, serializer, size]
+            self._size += size
+            oversized = self._take_unserialized() if self._size > self.max_bytes else []
+
+        if oversized:
+            self._serialize_in_place(oversized)
+
+    def _take_unserialized(self) -> List[Tuple[_SpanKey, str, List[Any]]]:
+        # Caller must hold self._lock. Picks the oldest values whose serialization brings the store under its bound.
+        excess = self._size - self.max_bytes
+        entries = []
+        for span_key, attributes in self._pending.items():
+            for key, entry in attributes.items():
+                if entry[1] is not _serialized:
+                    entries.append((span_key, key, entry))
+                    excess -= entry[2]
+                    if excess <= 0:
+                        return entries
+        return entries
+
+    def _serialize_in_place(self, entries: List[Tuple[_SpanKey, str, List[Any]]]) -> None:
+        # Serialized without holding the lock, so other threads can keep deferring
+        for span_key, key, entry in entries:
+            value, serializer, _ = entry
+            try:
+                text = serializer(value)
+            except Exception as e:
+                logger.warning(f"Failed to serialize deferred attribute {key}: {e}")
+                text = None
+            size = len(text) if text is not None else 0
+            with self._lock:
+                attributes = self._pending.get(span_key)
+                # Skip entries resolved or replaced in the meantime
+                if attributes is not None and attributes.get(key) is entry:
+                    attributes[key] = [text, _serialized, size]
+                    self._size += size - entry[2]
+
+        with self._lock:
+            # Serialized values are capped in size, but may still add up beyond the bound
+            while self._size > self.max_bytes and len(self._pending) > 1:
+                _, attributes = self._pending.popitem(last=False)
+                self._size -= sum(entry[2] for entry in attributes.values())
+                self.evicted_spans += 1
+                logger.warning("Deferred attributes exceed their memory bound, dropping those of the oldest span")
+
+    def _pop(self, span_key: _SpanKey) -> Optional[Dict[str, List[Any]]]:
+        with self._lock:
+            attributes = self._pending.pop(span_key, None)
+            if attributes is not None:
+                self._size -= sum(entry[2] for entry in attributes.values())
+        return attributes
+
+    def discard(self, spans: Iterable[ReadableSpan]) -> None:
+        """
+        Release the pending attributes of spans that will never be exported.
+
+        Args:
+            spans: Ended spans dropped by a sampler or an overflowing queue
+        """
+        if not self._pending:
+            return
+        for span in spans:
+            if span.context is not None:
+                self._pop((span.context.trace_id, span.context.span_id))
+
+    def resolve(self, spans: Sequence[ReadableSpan]) -> List[ReadableSpan]:
+        """
+        Serialize the pending attributes of ``spans`` and return spans carrying them.
+
+        Spans without pending attributes are returned unchanged.
+
+        Args:
+            spans: Ended spans about to be exported
+
+        Returns:
+            The spans, with deferred attributes applied
+        """
+        if not self._pending:
+            return list(spans)
+
+        resolved = []
+        for span in spans:
+            pending = None
+            if span.context is not None:
+                pending = self._pop((span.context.trace_id, span.context.span_id))
+            resolved.append(_with_attributes(span, pending) if pending else span)
+        return resolved
+
+
+def _with_attributes(span: ReadableSpan, pending: Dict[str, List[Any]]) -> ReadableSpan:
+    attributes = dict(span.attributes or {})
+    for key, (value, serializer, _) in pending.items():
+        try:
+            serialized = serializer(value)
+        except Exception as e:
+            logger.warning(f"Failed to serialize deferred attribute {key}: {e}")
+            continue
+        if serialized is not None:
+            attributes[key] = serialized
+
+    return ReadableSpan(
+        name=span.name,
+        context=span.context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes=attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+deferred_attributes = DeferredAttributeStore()
+
+
+class DeferredSerializingExporter(SpanExporter):
+    """
+    Exporter wrapper that serializes deferred attributes on the export thread.
+
+    Creating one turns on lazy serialization for the decorators; shutting it
+    down turns it off again.
+    """
+
+    def __init__(self, span_exporter: SpanExporter, store: DeferredAttributeStore = deferred_attributes):
+        """
+        Args:
+            span_exporter: The exporter receiving the resolved spans
+            store: Registry the decorators defer attributes to
+        """
+        self.span_exporter = span_exporter
+        self.store = store
+        store.enabled = True
+
+    def __getattr__(self, name: str):
+        # Expose optional extensions such as ``export_serialized``
+        return getattr(self.span_exporter, name)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return self.span_exporter.export(self.store.resolve(spans))
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self.store.enabled = False
+        self.span_exporter.shutdown()
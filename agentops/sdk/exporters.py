@@ -1,56 +1,239 @@
 # Define a separate class for the authenticated OTLP exporter
 # This is imported conditionally to avoid dependency issues
-from typing import Dict, Optional, Sequence
+import os
+import struct
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, Optional, Sequence, Union
 
 import requests
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
 from opentelemetry.exporter.otlp.proto.http import Compression
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.sdk.environment_variables import (
+    OTEL_EXPORTER_OTLP_CERTIFICATE,
+    OTEL_EXPORTER_OTLP_CLIENT_CERTIFICATE,
+    OTEL_EXPORTER_OTLP_CLIENT_KEY,
+    OTEL_EXPORTER_OTLP_HEADERS,
+    OTEL_EXPORTER_OTLP_TIMEOUT,
+    OTEL_EXPORTER_OTLP_TRACES_CERTIFICATE,
+    OTEL_EXPORTER_OTLP_TRACES_CLIENT_CERTIFICATE,
+    OTEL_EXPORTER_OTLP_TRACES_CLIENT_KEY,
+    OTEL_EXPORTER_OTLP_TRACES_HEADERS,
+    OTEL_EXPORTER_OTLP_TRACES_TIMEOUT,
+)
 from opentelemetry.sdk.trace import ReadableSpan
-from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.util.re import parse_env_headers
 
 from agentops.exceptions import AgentOpsApiJwtExpiredException, ApiServerException
+from agentops.helpers.fork import register_at_fork_reinit
 from agentops.logging import logger
 
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
 
-class AuthenticatedOTLPExporter(OTLPSpanExporter):
+GZIP = "gzip"
+DEFLATE = "deflate"
+ZSTD = "zstd"
+NO_COMPRESSION = "none"
+
+_RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+_MAX_ATTEMPTS = 3
+
+
+def is_rejection_status(status_code: int) -> bool:
+    """Whether an export response means the batch itself is refused, so sending it again cannot succeed."""
+    # Authentication failures are fixed by refreshing the JWT; 408 and 429 are transient
+    return 400 <= status_code < 500 and status_code not in (401, 403, 408, 429)
+
+# Upper bound of the batches buffered while an exporter waits for its JWT
+DEFAULT_MAX_PENDING_BYTES = 16 * 1024 * 1024
+
+# Local span files: magic followed by records of a little-endian u32 length and an
+# OTLP ExportTraceServiceRequest protobuf payload
+SPAN_FILE_MAGIC = b"AOTL"
+SPAN_FILE_SUFFIX = ".otlp"
+PARTIAL_SUFFIX = ".part"
+_LENGTH = struct.Struct("<I")
+
+
+def _normalize_compression(compression: Union[Compression, str, None]) -> str:
+    """Map a Compression enum or name to one of the supported encodings."""
+    if compression is None:
+        return NO_COMPRESSION
+    value = compression.value if isinstance(compression, Compression) else str(compression).lower()
+    if value not in (GZIP, DEFLATE, ZSTD, NO_COMPRESSION):
+        logger.warning(f"Unsupported export compression {value!r}, falling back to {GZIP}")
+        return GZIP
+    if value == ZSTD and zstandard is None:
+        logger.debug("zstandard is not installed, falling back to gzip compression")
+        return GZIP
+    return value
+
+
+def _otlp_env(traces_name: str, name: str) -> Optional[str]:
+    """The traces-specific OTLP exporter variable, or the generic one"""
+    return os.environ.get(traces_name, os.environ.get(name))
+
+
+def _add_resource_attributes(payload: bytes, attributes: Dict[str, str]) -> bytes:
+    """Add string attributes missing from the resources of a serialized ExportTraceServiceRequest."""
+    request = ExportTraceServiceRequest.FromString(payload)
+    for resource_spans in request.resource_spans:
+        resource_attributes = resource_spans.resource.attributes
+        existing = {attribute.key for attribute in resource_attributes}
+        for key, value in attributes.items():
+            if key not in existing:
+                resource_attributes.append(KeyValue(key=key, value=AnyValue(string_value=value)))
+    return request.SerializePartialToString()
+
+
+class AuthenticatedOTLPExporter(SpanExporter):
     """
-    OTLP exporter with JWT authentication support.
+    OTLP/HTTP exporter with JWT authentication support.
 
-    This exporter automatically handles JWT authentication and token refresh
-    for telemetry data sent to the AgentOps API using a dedicated HTTP session
-    with authentication retry logic built in.
+    Spans are encoded and posted to the AgentOps API by the exporter itself,
+    using a dedicated HTTP session with retries for transient failures. The JWT
+    is replaced with ``set_jwt`` (or ``authenticate_all``) when it is refreshed;
+    when the API rejects it, ``on_jwt_rejected`` is called so a refresh can start.
+
+    Payloads are gzip-compressed by default; zstd is used when requested and the
+    optional ``zstandard`` package is installed. Compressors are created once per
+    export thread and reused across batches.
+
+    With ``await_jwt`` the exporter can be created before authentication has
+    completed: batches are kept in memory, up to ``max_pending_bytes`` (oldest
+    dropped first), and sent once ``set_jwt`` provides the token.
+
+    Like the stock OTLP exporter, it honours the ``OTEL_EXPORTER_OTLP_HEADERS``,
+    ``_CERTIFICATE``, ``_CLIENT_CERTIFICATE``, ``_CLIENT_KEY`` and ``_TIMEOUT``
+    variables and their ``OTEL_EXPORTER_OTLP_TRACES_`` variants.
     """
 
+    # Live exporters, so a new or refreshed JWT reaches all of them
+    _instances: "weakref.WeakSet[AuthenticatedOTLPExporter]" = weakref.WeakSet()
+
+    # Called with the JWT the API rejected, e.g. to refresh it (see TokenManager.token_rejected)
+    on_jwt_rejected: Optional[Callable[[str], None]] = None
+
+    @classmethod
+    def authenticate_all(cls, jwt: str, resource_attributes: Optional[Dict[str, str]] = None) -> None:
+        """Call ``set_jwt`` on every live exporter."""
+        for exporter in list(cls._instances):
+            exporter.set_jwt(jwt, resource_attributes)
+
+    @classmethod
+    def discard_awaiting(cls) -> None:
+        """Call ``discard_pending`` on every exporter still waiting for its JWT."""
+        for exporter in list(cls._instances):
+            if exporter._pending is not None:
+                exporter.discard_pending()
+
     def __init__(
         self,
         endpoint: str,
-        jwt: str,
+        jwt: Optional[str],
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[int] = None,
-        compression: Optional[Compression] = None,
+        compression: Union[Compression, str, None] = GZIP,
+        compression_level: Optional[int] = None,
+        await_jwt: bool = False,
+        max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES,
         **kwargs,
     ):
-        # TODO: Implement re-authentication
-        # FIXME: endpoint here is not "endpoint" from config
-        # self._session = HttpClient.get_authenticated_session(endpoint, api_key)
-
-        # Initialize the parent class
-        super().__init__(
-            endpoint=endpoint,
-            headers={
-                "Authorization": f"Bearer {jwt}",
-            },  # Base headers
-            timeout=timeout,
-            compression=compression,
-            # session=self._session,  # Use our authenticated session
+        """
+        Args:
+            endpoint: OTLP/HTTP traces endpoint
+            jwt: JWT token sent as a bearer token with every request
+            headers: Additional headers to send with every request
+            timeout: Timeout in seconds for each export request
+            compression: One of "gzip", "deflate", "zstd" or "none" (or a Compression enum)
+            compression_level: Compression level; defaults to the codec's own default
+            await_jwt: Buffer batches until ``set_jwt`` is called instead of sending them
+            max_pending_bytes: Maximum size of the batches buffered while awaiting the JWT
+        """
+        self.endpoint = endpoint
+        self.compression = _normalize_compression(compression)
+        self.compression_level = compression_level
+        self._request_timeout = timeout or float(
+            _otlp_env(OTEL_EXPORTER_OTLP_TRACES_TIMEOUT, OTEL_EXPORTER_OTLP_TIMEOUT) or 10
+        )
+        env_headers = parse_env_headers(
+            _otlp_env(OTEL_EXPORTER_OTLP_TRACES_HEADERS, OTEL_EXPORTER_OTLP_HEADERS) or "", liberal=True
+        )
+        self._request_headers = {
+            **env_headers,
+            **(headers or {}),
+            "Content-Type": "application/x-protobuf",
+        }
+        # CA bundle verifying the endpoint (True: the system's) and client certificate, if any
+        self._verify: Union[str, bool] = (
+            _otlp_env(OTEL_EXPORTER_OTLP_TRACES_CERTIFICATE, OTEL_EXPORTER_OTLP_CERTIFICATE) or True
         )
+        client_certificate = _otlp_env(OTEL_EXPORTER_OTLP_TRACES_CLIENT_CERTIFICATE, OTEL_EXPORTER_OTLP_CLIENT_CERTIFICATE)
+        client_key = _otlp_env(OTEL_EXPORTER_OTLP_TRACES_CLIENT_KEY, OTEL_EXPORTER_OTLP_CLIENT_KEY)
+        self._client_cert = (client_certificate, client_key) if client_certificate and client_key else client_certificate
+        self._jwt = jwt
+        if jwt:
+            self._request_headers["Authorization"] = f"Bearer {jwt}"
+        if self.compression != NO_COMPRESSION:
+            self._request_headers["Content-Encoding"] = self.compression
+
+        self._http = requests.Session()
+        self._local = threading.local()
+        self._stopped = False
+
+        # Batches waiting for the JWT; None once the exporter may send
+        self._pending: Optional[Deque[bytes]] = deque() if await_jwt else None
+        self._pending_bytes = 0
+        self._pending_dropped = 0
+        self.max_pending_bytes = max_pending_bytes
+        self._pending_lock = threading.Lock()
+        self._unauthenticated = False
+        # Resource attributes only known after the spans were created, such as the project id
+        self._resource_attributes: Dict[str, str] = {}
+        self._instances.add(self)
+        register_at_fork_reinit(self._at_fork_reinit)
+
+        if self.compression in (GZIP, DEFLATE):
+            # Pristine compressor state that is cheaply copied for every batch
+            wbits = 31 if self.compression == GZIP else 15
+            level = zlib.Z_DEFAULT_COMPRESSION if compression_level is None else compression_level
+            self._zlib_template = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    def _at_fork_reinit(self) -> None:
+        # Pooled connections belong to the parent; batches it buffered are its own to send
+        self._http = requests.Session()
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        if self._pending is not None:
+            self._pending = deque()
+            self._pending_bytes = 0
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.compression in (GZIP, DEFLATE):
+            compressor = self._zlib_template.copy()
+            return compressor.compress(payload) + compressor.flush()
+        if self.compression == ZSTD:
+            compressor = getattr(self._local, "zstd", None)
+            if compressor is None:
+                level = 3 if self.compression_level is None else self.compression_level
+                compressor = self._local.zstd = zstandard.ZstdCompressor(level=level)
+            return compressor.compress(payload)
+        return payload
 
     def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
         """
         Export spans with automatic authentication handling
 
-        The authentication and retry logic is now handled by the underlying
-        HTTP session adapter, so we just need to call the parent export method.
+        Spans are encoded as OTLP protobuf, compressed and posted to the endpoint.
 
         Args:
             spans: The list of spans to export
@@ -59,10 +242,87 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
             The result of the export
         """
         try:
-            return super().export(spans)
+            payload = encode_spans(spans).SerializePartialToString()
+        except Exception as e:
+            logger.error(f"Failed to encode spans for export: {e}")
+            return SpanExportResult.FAILURE
+        return self.export_serialized(payload)
+
+    def export_serialized(self, payload: bytes) -> SpanExportResult:
+        """
+        Export an already serialized OTLP ``ExportTraceServiceRequest``.
+
+        Args:
+            payload: The uncompressed protobuf payload
+
+        Returns:
+            The result of the export
+        """
+        if self._stopped:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+
+        self._local.rejected = False
+        if self._pending is not None and self._buffer(payload):
+            return SpanExportResult.SUCCESS
+        if self._unauthenticated:
+            return SpanExportResult.FAILURE
+        return self._send(payload)
+
+    def _buffer(self, payload: bytes) -> bool:
+        """Keep a batch until the JWT arrives; returns False if the exporter is already authenticated."""
+        with self._pending_lock:
+            pending = self._pending
+            if pending is None:
+                return False
+            pending.append(payload)
+            self._pending_bytes += len(payload)
+            while self._pending_bytes > self.max_pending_bytes and pending:
+                self._pending_bytes -= len(pending.popleft())
+                self._pending_dropped += 1
+        return True
+
+    def set_jwt(self, jwt: str, resource_attributes: Optional[Dict[str, str]] = None) -> None:
+        """
+        Provide the JWT to authenticate exports with and send any buffered batches.
+
+        Args:
+            jwt: JWT token sent as a bearer token with every request
+            resource_attributes: Attributes added to the resource of every exported
+                batch that does not carry them yet (e.g. the project id)
+        """
+        self._jwt = jwt
+        self._request_headers["Authorization"] = f"Bearer {jwt}"
+        if resource_attributes:
+            self._resource_attributes = dict(resource_attributes)
+
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+            dropped, self._pending_dropped = self._pending_dropped, 0
+            self._pending_bytes = 0
+        if dropped:
+            logger.warning(f"Dropped {dropped} span batches buffered while waiting for authentication")
+        for payload in pending or ():
+            self._send(payload)
+
+    def discard_pending(self) -> None:
+        """Drop the buffered batches and every later one, e.g. after authentication failed."""
+        with self._pending_lock:
+            self._pending = None
+            self._pending_bytes = 0
+            self._unauthenticated = True
+
+    def _send(self, payload: bytes) -> SpanExportResult:
+        try:
+            if self._resource_attributes:
+                payload = _add_resource_attributes(payload, self._resource_attributes)
+            return self._post(self._compress(payload))
         except AgentOpsApiJwtExpiredException as e:
             # Authentication token expired or invalid
             logger.warning(f"Authentication error during span export: {e}")
+            on_jwt_rejected = type(self).on_jwt_rejected
+            if on_jwt_rejected is not None and self._jwt:
+                on_jwt_rejected(self._jwt)
             return SpanExportResult.FAILURE
         except ApiServerException as e:
             # Server-side error
@@ -77,6 +337,43 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
             logger.error(f"Unexpected error during span export: {e}")
             return SpanExportResult.FAILURE
 
+    def _post(self, body: bytes) -> SpanExportResult:
+        for attempt in range(_MAX_ATTEMPTS):
+            response = self._http.post(
+                self.endpoint,
+                data=body,
+                headers=self._request_headers,
+                timeout=self._request_timeout,
+                verify=self._verify,
+                cert=self._client_cert,
+            )
+            if response.ok:
+                return SpanExportResult.SUCCESS
+            if response.status_code in (401, 403):
+                raise AgentOpsApiJwtExpiredException(f"Export rejected with status {response.status_code}")
+            if is_rejection_status(response.status_code):
+                self._local.rejected = True
+            if response.status_code not in _RETRYABLE_STATUS_CODES or attempt == _MAX_ATTEMPTS - 1:
+                raise ApiServerException(f"Export failed with status {response.status_code}: {response.text}")
+            time.sleep(0.5 * 2**attempt)
+        return SpanExportResult.FAILURE
+
+    def last_export_rejected(self) -> bool:
+        """Whether the last export on this thread failed because the API refused the batch itself.
+
+        Such batches fail the same way every time, so they are not worth keeping for a retry.
+        """
+        return getattr(self._local, "rejected", False)
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        if self._pending:
+            logger.debug(f"Discarding {len(self._pending)} span batches still waiting for authentication")
+        self._http.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
     def clear(self):
         """
         Clear any stored spans.
@@ -85,3 +382,153 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
         The OTLP exporter doesn't store spans, so this is a no-op.
         """
         pass
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Writes span batches to rotating local files instead of sending them over the network.
+
+    Every batch is appended as one length-prefixed OTLP protobuf record. The
+    file being written carries a ``.part`` suffix and is renamed to ``.otlp``
+    once it reaches ``max_file_bytes`` or the exporter shuts down, so completed
+    files can be uploaded later with ``python -m agentops.sdk.replay``.
+
+    Data is handed to the OS after every batch but only fsynced every
+    ``fsync_interval`` seconds, on rotation, ``force_flush`` and shutdown.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        fsync_interval: float = 1.0,
+        prefix: str = "spans",
+    ):
+        """
+        Args:
+            directory: Directory the span files are written to
+            max_file_bytes: Size at which the current file is closed and a new one started
+            fsync_interval: Minimum number of seconds between two fsyncs
+            prefix: File name prefix
+        """
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.fsync_interval = fsync_interval
+        self.prefix = prefix
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[str] = None
+        self._size = 0
+        self._sequence = 0
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+        self._stopped = False
+
+        os.makedirs(directory, exist_ok=True)
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # The open file is the parent's to finish; the child starts its own (names include the pid)
+        self._lock = threading.Lock()
+        self._file = self._path = None
+        self._size = 0
+        self._dirty = False
+
+    def _open(self) -> None:
+        name = f"{self.prefix}-{int(time.time() * 1000)}-{os.getpid()}-{self._sequence:06d}"
+        self._sequence += 1
+        self._path = os.path.join(self.directory, name + SPAN_FILE_SUFFIX + PARTIAL_SUFFIX)
+        self._file = open(self._path, "wb")
+        self._file.write(SPAN_FILE_MAGIC)
+        self._size = len(SPAN_FILE_MAGIC)
+
+    def _fsync(self) -> None:
+        if self._file is not None and self._dirty:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self._last_fsync = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        self._fsync()
+        self._file.close()
+        assert self._path is not None
+        os.replace(self._path, self._path[: -len(PARTIAL_SUFFIX)])
+        self._file = self._path = None
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._stopped:
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return SpanExportResult.FAILURE
+
+        try:
+            payload = encode_spans(spans).SerializePartialToString()
+        except Exception as e:
+            logger.error(f"Failed to encode spans for export: {e}")
+            return SpanExportResult.FAILURE
+
+        record_size = _LENGTH.size + len(payload)
+        try:
+            with self._lock:
+                if self._file is not None and self._size + record_size > self.max_file_bytes:
+                    self._close_file()
+                if self._file is None:
+                    self._open()
+                self._file.write(_LENGTH.pack(len(payload)))
+                self._file.write(payload)
+                self._file.flush()
+                self._size += record_size
+                self._dirty = True
+                if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                    self._fsync()
+        except OSError as e:
+            logger.error(f"Failed to write spans to {self.directory}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        try:
+            with self._lock:
+                self._fsync()
+        except OSError as e:
+            logger.error(f"Failed to sync span file: {e}")
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stopped = True
+            try:
+                self._close_file()
+            except OSError as e:
+                logger.error(f"Failed to close span file: {e}")
+
+
+def read_span_file(path: str) -> Iterator[bytes]:
+    """
+    Yield the serialized OTLP payloads stored in a span file.
+
+    A record cut short by a crash ends the iteration instead of raising.
+
+    Args:
+        path: Path of a file written by FileSpanExporter
+
+    Returns:
+        Iterator over the serialized ``ExportTraceServiceRequest`` payloads
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SPAN_FILE_MAGIC)) != SPAN_FILE_MAGIC:
+            raise ValueError(f"Not a span file: {path}")
+        while True:
+            header = f.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                logger.warning(f"Ignoring truncated record at the end of {path}")
+                return
+            yield payload
@@ -5,34 +5,167 @@ This module contains processors for OpenTelemetry spans.
 """
 
 import time
-from threading import Event, Lock, Thread
-from typing import Dict, Optional
+from collections import deque
+from queue import Empty, SimpleQueue
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence
+from weakref import WeakSet
 
+from opentelemetry import metrics
 from opentelemetry.context import Context
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
-from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
 
 from agentops.logging import logger
 from agentops.helpers.dashboard import log_trace_url
+from agentops.helpers.fork import register_at_fork_reinit
+from agentops.sdk.deferred import deferred_attributes
+from agentops.sdk.scheduling import AdaptiveExportScheduler
+from agentops.sdk.spill import SpanSpiller, SpillingSpanExporter, SpillJournal, export_rejected
 from agentops.semconv.core import CoreAttributes
+from agentops.semconv.meters import Meters
 from agentops.logging import upload_logfile
 
+class _Shard:
+    """A slice of the in-flight span registry with its own lock."""
+
+    __slots__ = ("lock", "spans", "fingerprints")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.spans: Dict[int, Span] = {}
+        self.fingerprints: Dict[int, Optional[int]] = {}
+
+
 class LiveSpanProcessor(SpanProcessor):
-    def __init__(self, span_exporter: SpanExporter, **kwargs):
+    """
+    Periodically exports snapshots of spans that have not ended yet.
+
+    In-flight spans are kept in a registry sharded by span id, so concurrent
+    ``on_start``/``on_end`` calls from different threads rarely contend. Ended
+    spans are handed to a background queue and exported by the worker thread;
+    neither hook ever touches the network.
+
+    Only spans whose name, status, attributes or events changed since the last
+    tick are re-exported. Change detection and snapshotting happen outside the
+    shard locks.
+    """
+
+    _SHARD_COUNT = 16
+    _STOP = object()
+
+    def __init__(self, span_exporter: SpanExporter, export_interval: float = 1.0, **kwargs):
+        """
+        Args:
+            span_exporter: Exporter that receives in-flight snapshots and ended spans
+            export_interval: Seconds between two in-flight snapshot exports
+        """
         self.span_exporter = span_exporter
-        self._in_flight: Dict[int, Span] = {}
-        self._lock = Lock()
-        self._stop_event = Event()
+        self._export_interval = export_interval
+        self._shards = [_Shard() for _ in range(self._SHARD_COUNT)]
+        self._ended: "SimpleQueue[object]" = SimpleQueue()
         self._export_thread = Thread(target=self._export_periodically, daemon=True)
         self._export_thread.start()
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # Spans in flight at fork time are exported by the parent
+        self._shards = [_Shard() for _ in range(self._SHARD_COUNT)]
+        self._ended = SimpleQueue()
+        self._export_thread = Thread(target=self._export_periodically, daemon=True)
+        self._export_thread.start()
+
+    def _shard(self, span_id: int) -> _Shard:
+        return self._shards[span_id % self._SHARD_COUNT]
 
     def _export_periodically(self) -> None:
-        while not self._stop_event.is_set():
-            time.sleep(1)
-            with self._lock:
-                to_export = [self._readable_span(span) for span in self._in_flight.values()]
-                if to_export:
-                    self.span_exporter.export(to_export)
+        next_tick = time.monotonic() + self._export_interval
+        while True:
+            try:
+                item = self._ended.get(timeout=max(0.0, next_tick - time.monotonic()))
+            except Empty:
+                item = None
+
+            if item is not None and not self._export_ended(item):
+                return
+
+            if time.monotonic() >= next_tick:
+                self._export_changed_spans()
+                next_tick = time.monotonic() + self._export_interval
+
+    def _export_ended(self, item: object) -> bool:
+        """Export ended spans queued so far. Returns False once the processor is stopping."""
+        batch: List[ReadableSpan] = []
+        waiters: List[Event] = []
+        running = True
+        while item is not None:
+            if item is self._STOP:
+                running = False
+            elif isinstance(item, Event):
+                waiters.append(item)
+            else:
+                batch.append(item)  # type: ignore
+            try:
+                item = self._ended.get_nowait()
+            except Empty:
+                item = None
+
+        if batch:
+            try:
+                self.span_exporter.export(batch)
+            except Exception as e:
+                logger.error(f"[agentops.LiveSpanProcessor] Failed to export ended spans: {e}")
+        for waiter in waiters:
+            waiter.set()
+        return running
+
+    @staticmethod
+    def _fingerprint(span: Span) -> Optional[int]:
+        """Cheap digest of the mutable parts of a span, or None if it cannot be computed."""
+        try:
+            return hash(
+                (
+                    span.name,
+                    span.status.status_code,
+                    len(span.events),
+                    frozenset(span.attributes.items()) if span.attributes else None,
+                )
+            )
+        except (TypeError, RuntimeError):
+            # Unhashable attribute values, or attributes mutated while we were reading them
+            return None
+
+    def _export_changed_spans(self) -> None:
+        to_export = []
+        fingerprints = {}
+        for shard in self._shards:
+            with shard.lock:
+                spans = list(shard.spans.items())
+                exported = dict(shard.fingerprints)
+
+            for span_id, span in spans:
+                fingerprint = self._fingerprint(span)
+                if fingerprint is not None and exported.get(span_id) == fingerprint:
+                    continue
+                to_export.append(self._readable_span(span))
+                fingerprints[span_id] = fingerprint
+
+        if not to_export:
+            return
+
+        try:
+            self.span_exporter.export(to_export)
+        except Exception as e:
+            logger.error(f"[agentops.LiveSpanProcessor] Failed to export in-flight spans: {e}")
+            return
+
+        for span_id, fingerprint in fingerprints.items():
+            shard = self._shard(span_id)
+            with shard.lock:
+                # Spans that ended while we were exporting must not be tracked anymore
+                if span_id in shard.spans:
+                    shard.fingerprints[span_id] = fingerprint
 
     def _readable_span(self, span: Span) -> ReadableSpan:
         readable = span._readable_span()
@@ -46,23 +179,31 @@ class LiveSpanProcessor(SpanProcessor):
     def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
         if not span.context or not span.context.trace_flags.sampled:
             return
-        with self._lock:
-            self._in_flight[span.context.span_id] = span
+        shard = self._shard(span.context.span_id)
+        with shard.lock:
+            shard.spans[span.context.span_id] = span
 
     def on_end(self, span: ReadableSpan) -> None:
         if not span.context or not span.context.trace_flags.sampled:
             return
-        with self._lock:
-            del self._in_flight[span.context.span_id]
-            self.span_exporter.export((span,))
+        shard = self._shard(span.context.span_id)
+        with shard.lock:
+            shard.spans.pop(span.context.span_id, None)
+            shard.fingerprints.pop(span.context.span_id, None)
+        self._ended.put(span)
 
     def shutdown(self) -> None:
-        self._stop_event.set()
+        self._ended.put(self._STOP)
         self._export_thread.join()
         self.span_exporter.shutdown()
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
-        return True
+        """Wait until all spans ended so far have been exported."""
+        if not self._export_thread.is_alive():
+            return True
+        flushed = Event()
+        self._ended.put(flushed)
+        return flushed.wait(timeout_millis / 1000)
 
     def export_in_flight_spans(self) -> None:
         """Export all in-flight spans without ending them.
@@ -70,10 +211,13 @@ class LiveSpanProcessor(SpanProcessor):
         This method is primarily used for testing to ensure all spans
         are exported before assertions are made.
         """
-        with self._lock:
-            to_export = [self._readable_span(span) for span in self._in_flight.values()]
-            if to_export:
-                self.span_exporter.export(to_export)
+        to_export = []
+        for shard in self._shards:
+            with shard.lock:
+                spans = list(shard.spans.values())
+            to_export.extend(self._readable_span(span) for span in spans)
+        if to_export:
+            self.span_exporter.export(to_export)
 
 
 class InternalSpanProcessor(SpanProcessor):
@@ -135,3 +279,427 @@ class InternalSpanProcessor(SpanProcessor):
     def force_flush(self, timeout_millis: int = 30000) -> bool:
         """Force flush the processor."""
         return True
+
+
+class SpillingBatchSpanProcessor(BatchSpanProcessor):
+    """
+    A BatchSpanProcessor that spills to disk instead of dropping spans.
+
+    Spans that arrive while the in-memory queue is full, and batches the
+    exporter fails to deliver, are serialized as OTLP protobuf and appended to
+    a :class:`~agentops.sdk.spill.SpillJournal`. Journaled batches are posted
+    back to the OTLP endpoint oldest-first whenever an export succeeds, on
+    ``force_flush`` and on shutdown, through the exporter's ``export_serialized``
+    when it provides one.
+    """
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        journal: SpillJournal,
+        endpoint: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_millis: float = 5000,
+        drain_batch_limit: int = 4,
+        timeout: int = 10,
+    ):
+        """
+        Args:
+            span_exporter: Exporter that receives batches from the in-memory queue
+            journal: Disk journal used for overflowed and undeliverable batches
+            endpoint: OTLP/HTTP traces endpoint that journaled batches are drained to, used
+                when ``span_exporter`` cannot send pre-serialized payloads itself
+            headers: Headers (e.g. authorization) sent with drained batches
+            max_queue_size: Number of spans held in memory before spilling to disk
+            max_export_batch_size: Maximum number of spans per exported batch
+            schedule_delay_millis: Delay in milliseconds between two consecutive exports
+            drain_batch_limit: Maximum journaled batches drained after each successful export
+            timeout: Timeout in seconds for posting a drained batch
+        """
+        self.spiller = SpanSpiller(journal, span_exporter, endpoint=endpoint, headers=headers, timeout=timeout)
+
+        self._max_queue_size = max_queue_size
+        self._max_export_batch_size = max_export_batch_size
+        self._pending = 0
+        self._overflow: List[ReadableSpan] = []
+        self._lock = Lock()
+        register_at_fork_reinit(self._at_fork_reinit_spilling)
+
+        super().__init__(
+            SpillingSpanExporter(
+                span_exporter, self.spiller, drain_batch_limit=drain_batch_limit, on_exported=self._release
+            ),
+            max_queue_size=max_queue_size,
+            max_export_batch_size=max_export_batch_size,
+            schedule_delay_millis=schedule_delay_millis,
+        )
+
+    def _at_fork_reinit_spilling(self) -> None:
+        # BatchSpanProcessor empties its queue in the child, so nothing is pending anymore
+        self._lock = Lock()
+        self._pending = 0
+        self._overflow = []
+
+    @property
+    def journal(self) -> SpillJournal:
+        return self.spiller.journal
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context or not span.context.trace_flags.sampled:
+            return
+
+        with self._lock:
+            accepted = self._pending < self._max_queue_size
+            if accepted:
+                self._pending += 1
+            else:
+                self._overflow.append(span)
+                overflow = self._take_overflow(self._max_export_batch_size)
+
+        if accepted:
+            super().on_end(span)
+        elif overflow:
+            self.spill(overflow)
+
+    def _take_overflow(self, min_size: int = 1) -> List[ReadableSpan]:
+        # Caller must hold self._lock
+        if len(self._overflow) < min_size:
+            return []
+        overflow, self._overflow = self._overflow, []
+        return overflow
+
+    def _release(self, count: int) -> None:
+        with self._lock:
+            self._pending = max(0, self._pending - count)
+
+    def spill(self, spans: Sequence[ReadableSpan]) -> bool:
+        """Serialize a batch of spans and append it to the journal."""
+        return self.spiller.spill(spans)
+
+    def drain(self, max_records: Optional[int] = None) -> int:
+        """Post journaled batches to the OTLP endpoint, oldest first."""
+        return self.spiller.drain(max_records=max_records)
+
+    def force_flush(self, timeout_millis: Optional[int] = None) -> bool:
+        with self._lock:
+            overflow = self._take_overflow()
+        if overflow:
+            self.spill(overflow)
+        flushed = super().force_flush(timeout_millis)
+        self.drain()
+        return flushed
+
+    def shutdown(self) -> None:
+        with self._lock:
+            overflow = self._take_overflow()
+        if overflow:
+            self.spill(overflow)
+        super().shutdown()
+        self.drain()
+        # Anything still undelivered stays on disk for the next process that opens this journal
+        self.spiller.close()
+
+
+class AdaptiveBatchSpanProcessor(SpanProcessor):
+    """
+    Batches ended spans using an :class:`~agentops.sdk.scheduling.AdaptiveExportScheduler`.
+
+    Unlike ``BatchSpanProcessor``, batch size and flush delay are not fixed:
+    the scheduler grows batches under load, flushes a short queue quickly and
+    backs off while the exporter is failing or slow. Spans that do not fit in
+    the queue, and batches the exporter rejects, go to the optional spiller;
+    without one they are dropped and counted.
+
+    The scheduler's current decisions are reported as observable gauges.
+    """
+
+    _instances: "WeakSet[AdaptiveBatchSpanProcessor]" = WeakSet()
+    _metrics_registered = False
+    _metrics_lock = Lock()
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        scheduler: Optional[AdaptiveExportScheduler] = None,
+        max_queue_size: int = 8192,
+        spiller: Optional[SpanSpiller] = None,
+        drain_batch_limit: int = 4,
+        worker: int = 0,
+    ):
+        """
+        Args:
+            span_exporter: Exporter that receives the batches
+            scheduler: Export policy; defaults to an AdaptiveExportScheduler with default bounds
+            max_queue_size: Number of spans held in memory before spilling or dropping
+            spiller: Optional spiller for overflowed and undeliverable spans
+            drain_batch_limit: Maximum journaled batches drained after each successful export
+            worker: Index reported with the metrics when several processors run side by side
+        """
+        self.span_exporter = span_exporter
+        self.worker = worker
+        self.scheduler = scheduler or AdaptiveExportScheduler()
+        self.max_queue_size = max_queue_size
+        self.spiller = spiller
+        self.drain_batch_limit = drain_batch_limit
+        self.dropped_spans = 0
+
+        self._queue: Deque[ReadableSpan] = deque()
+        self._overflow: List[ReadableSpan] = []
+        self._condition = Condition()
+        self._flush_waiters: List[Event] = []
+        self._stopped = False
+
+        self._instances.add(self)
+        self._register_metrics()
+        self._worker = Thread(target=self._run, name="agentops-adaptive-export", daemon=True)
+        self._worker.start()
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # Spans queued at fork time are exported by the parent
+        self._condition = Condition()
+        self._queue.clear()
+        self._overflow = []
+        self._flush_waiters = []
+        if not self._stopped:
+            self._worker = Thread(target=self._run, name="agentops-adaptive-export", daemon=True)
+            self._worker.start()
+
+    @classmethod
+    def _register_metrics(cls) -> None:
+        # Instruments are registered once; every live processor reports through them
+        with cls._metrics_lock:
+            if cls._metrics_registered:
+                return
+            cls._metrics_registered = True
+
+        def gauge(read: Callable[["AdaptiveBatchSpanProcessor"], float]):
+            def callback(options: CallbackOptions) -> Iterable[Observation]:
+                return [Observation(read(p), {"worker": p.worker}) for p in list(cls._instances)]
+
+            return callback
+
+        meter = metrics.get_meter(__name__)
+        meter.create_observable_gauge(
+            Meters.EXPORT_BATCH_SIZE,
+            callbacks=[gauge(lambda p: p.scheduler.batch_size)],
+            unit="span",
+            description="Current adaptive export batch size",
+        )
+        meter.create_observable_gauge(
+            Meters.EXPORT_DELAY,
+            callbacks=[gauge(lambda p: p.scheduler.delay_millis)],
+            unit="ms",
+            description="Current delay between span exports",
+        )
+        meter.create_observable_gauge(
+            Meters.EXPORT_BACKOFF,
+            callbacks=[gauge(lambda p: p.scheduler.backoff_millis)],
+            unit="ms",
+            description="Current export backoff caused by failed or slow exports",
+        )
+        meter.create_observable_gauge(
+            Meters.EXPORT_QUEUE_SIZE,
+            callbacks=[gauge(lambda p: len(p._queue))],
+            unit="span",
+            description="Spans waiting to be exported",
+        )
+        meter.create_observable_counter(
+            Meters.EXPORT_DROPPED_SPANS,
+            callbacks=[gauge(lambda p: p.dropped_spans)],
+            unit="span",
+            description="Spans dropped because the export queue was full",
+        )
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context or not span.context.trace_flags.sampled:
+            return
+
+        with self._condition:
+            if self._stopped:
+                return
+            if len(self._queue) >= self.max_queue_size:
+                if self.spiller is None:
+                    self.dropped_spans += 1
+                    deferred_attributes.discard((span,))
+                else:
+                    # Spilled by the worker, never on the caller's thread
+                    self._overflow.append(span)
+                return
+            self._queue.append(span)
+            size = len(self._queue)
+            # Wake the worker when the queue stops being empty (to shorten its delay)
+            # and when a full batch is ready; every other span is picked up on schedule
+            if size == 1 or size == self.scheduler.batch_size:
+                self._condition.notify()
+
+    def _wait_for_work(self) -> None:
+        # Caller must hold self._condition
+        deadline = time.monotonic() + self.scheduler.next_delay(len(self._queue))
+        while not (self._stopped or self._flush_waiters):
+            if not self.scheduler.backing_off and len(self._queue) >= self.scheduler.batch_size:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._condition.wait(remaining)
+            deadline = min(deadline, time.monotonic() + self.scheduler.next_delay(len(self._queue)))
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._wait_for_work()
+                stopped = self._stopped
+                waiters, self._flush_waiters = self._flush_waiters, []
+                overflow, self._overflow = self._overflow, []
+
+            if overflow and self.spiller is not None:
+                self.spiller.spill(overflow)
+
+            # Flushes and shutdown empty the queue regardless of backoff
+            self._export_batches(drain=stopped or bool(waiters))
+            for waiter in waiters:
+                waiter.set()
+            if stopped:
+                return
+
+    def _take_batch(self) -> List[ReadableSpan]:
+        with self._condition:
+            count = min(len(self._queue), self.scheduler.batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _export_batches(self, drain: bool) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._export(batch)
+            if not drain and (self.scheduler.backing_off or len(self._queue) < self.scheduler.batch_size):
+                return
+
+    def _export(self, batch: List[ReadableSpan]) -> None:
+        start = time.monotonic()
+        try:
+            success = self.span_exporter.export(batch) is SpanExportResult.SUCCESS
+        except Exception as e:
+            logger.debug(f"Export raised: {e}")
+            success = False
+        self.scheduler.record_export(len(batch), time.monotonic() - start, success)
+
+        if self.spiller is None:
+            return
+        if success:
+            self.spiller.drain(max_records=self.drain_batch_limit)
+        elif not export_rejected(self.span_exporter):
+            # Only transient failures are worth keeping; refused batches would fail again
+            self.spiller.spill(batch)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        waiter = Event()
+        with self._condition:
+            if self._stopped:
+                return False
+            self._flush_waiters.append(waiter)
+            self._condition.notify()
+        flushed = waiter.wait(timeout_millis / 1000)
+        if flushed and self.spiller is not None:
+            self.spiller.drain()
+        return flushed
+
+    def shutdown(self) -> None:
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify()
+        self._worker.join()
+        self._instances.discard(self)
+        if self.spiller is not None:
+            self.spiller.drain()
+            # Anything still undelivered stays on disk for the next process that opens this journal
+            self.spiller.close()
+        self.span_exporter.shutdown()
+
+
+class _SharedSpanExporter(SpanExporter):
+    """Exporter handle given to each worker; the owner shuts the real exporter down once."""
+
+    def __init__(self, span_exporter: SpanExporter):
+        self.span_exporter = span_exporter
+
+    def __getattr__(self, name: str):
+        # Expose optional extensions such as ``export_serialized``
+        return getattr(self.span_exporter, name)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return self.span_exporter.export(spans)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ParallelSpanProcessor(SpanProcessor):
+    """
+    Exports through several batch processors running side by side.
+
+    Each worker is a complete batch processor with its own queue and export
+    thread, so up to ``workers`` OTLP requests are in flight at once and a
+    slow response only stalls the spans queued on that worker. Spans are
+    routed by trace id, which keeps every trace on one worker and therefore
+    exported in the order its spans ended.
+    """
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        processor_factory: Callable[[SpanExporter, int], SpanProcessor],
+        workers: int = 4,
+    ):
+        """
+        Args:
+            span_exporter: Exporter shared by all workers
+            processor_factory: Called with the shared exporter and the worker index to build each worker
+            workers: Number of concurrent export workers
+        """
+        self.span_exporter = span_exporter
+        shared = _SharedSpanExporter(span_exporter)
+        self._workers: List[SpanProcessor] = [processor_factory(shared, i) for i in range(max(1, workers))]
+
+    def _worker_for(self, span: ReadableSpan) -> SpanProcessor:
+        trace_id = span.context.trace_id if span.context else 0
+        return self._workers[trace_id % len(self._workers)]
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._worker_for(span).on_start(span, parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        self._worker_for(span).on_end(span)
+
+    def _run_on_workers(self, call: Callable[[SpanProcessor], object]) -> List[object]:
+        # Run the call on every worker at once so a slow one does not delay the rest
+        results: List[object] = [None] * len(self._workers)
+
+        def run(index: int) -> None:
+            results[index] = call(self._workers[index])
+
+        threads = [Thread(target=run, args=(i,), daemon=True) for i in range(len(self._workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all(self._run_on_workers(lambda worker: worker.force_flush(timeout_millis)))
+
+    def shutdown(self) -> None:
+        self._run_on_workers(lambda worker: worker.shutdown())
+        self.span_exporter.shutdown()
@@ -0,0 +1,147 @@
+"""
+Upload span files written by :class:`~agentops.sdk.exporters.FileSpanExporter`.
+
+Usage::
+
+    python -m agentops.sdk.replay /path/to/spans [--api-key KEY] [--keep]
+
+Completed ``.otlp`` files are uploaded oldest first through
+:class:`~agentops.sdk.exporters.AuthenticatedOTLPExporter` and deleted once
+every batch in them was accepted. A file that fails halfway is rewritten to
+hold only the batches that were not delivered, so running the command again
+resumes where it stopped. ``.part`` files are only uploaded with
+``--include-partial``, and never while the process writing them is running.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+import psutil  # type: ignore
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.client.api import ApiClient
+from agentops.config import Config
+from agentops.logging import logger
+from agentops.sdk.exporters import (
+    PARTIAL_SUFFIX,
+    SPAN_FILE_MAGIC,
+    SPAN_FILE_SUFFIX,
+    AuthenticatedOTLPExporter,
+    read_span_file,
+)
+
+
+def _span_files(directory: str, include_partial: bool) -> List[str]:
+    suffixes = (SPAN_FILE_SUFFIX, SPAN_FILE_SUFFIX + PARTIAL_SUFFIX) if include_partial else (SPAN_FILE_SUFFIX,)
+    names = [name for name in os.listdir(directory) if name.endswith(suffixes)]
+    # File names start with the creation time, so name order is write order
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def _writer_is_running(path: str) -> bool:
+    """Whether the process that named the ``.part`` file ``path`` is still appending to it"""
+    # Names are <prefix>-<milliseconds>-<pid>-<sequence>.otlp.part
+    name = os.path.basename(path)[: -len(SPAN_FILE_SUFFIX + PARTIAL_SUFFIX)]
+    try:
+        pid = int(name.rsplit("-", 2)[1])
+    except (IndexError, ValueError):
+        return False
+    return pid == os.getpid() or psutil.pid_exists(pid)
+
+
+def _rewrite(path: str, payloads: List[bytes]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SPAN_FILE_MAGIC)
+        for payload in payloads:
+            f.write(len(payload).to_bytes(4, "little"))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def replay_directory(
+    directory: str,
+    exporter: AuthenticatedOTLPExporter,
+    delete: bool = True,
+    include_partial: bool = False,
+) -> int:
+    """
+    Upload every span file in ``directory``.
+
+    Args:
+        directory: Directory written by FileSpanExporter
+        exporter: Exporter used to upload the batches
+        delete: Delete files once all of their batches are uploaded
+        include_partial: Also upload ``.part`` files left behind by a process that did not shut down;
+            those of processes that are still running are skipped
+
+    Returns:
+        Number of batches uploaded
+    """
+    uploaded = 0
+    for path in _span_files(directory, include_partial):
+        if path.endswith(PARTIAL_SUFFIX) and _writer_is_running(path):
+            logger.debug(f"Skipping {path}, its process is still writing it")
+            continue
+        try:
+            payloads = list(read_span_file(path))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable span file {path}: {e}")
+            continue
+
+        for index, payload in enumerate(payloads):
+            if exporter.export_serialized(payload) is not SpanExportResult.SUCCESS:
+                logger.error(f"Upload failed at batch {index + 1}/{len(payloads)} of {path}; stopping")
+                if delete and index:
+                    _rewrite(path, payloads[index:])
+                return uploaded
+            uploaded += 1
+
+        if delete:
+            os.unlink(path)
+        logger.info(f"Uploaded {len(payloads)} batch(es) from {path}")
+    return uploaded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Upload span files written by the AgentOps file exporter.")
+    parser.add_argument("directory", help="Directory containing .otlp span files")
+    parser.add_argument("--api-key", help="AgentOps API key (defaults to AGENTOPS_API_KEY)")
+    parser.add_argument("--keep", action="store_true", help="Keep files after uploading them")
+    parser.add_argument(
+        "--include-partial", action="store_true", help="Also upload .part files from processes that did not shut down"
+    )
+    args = parser.parse_args(argv)
+
+    config = Config()
+    api_key = args.api_key or config.api_key
+    if not api_key:
+        parser.error("an API key is required (--api-key or AGENTOPS_API_KEY)")
+
+    response = ApiClient(config.endpoint).v3.fetch_auth_token(api_key)
+    if response is None:
+        return 1
+
+    exporter = AuthenticatedOTLPExporter(
+        endpoint=config.exporter_endpoint,
+        jwt=response["token"],
+        compression=config.export_compression,
+        compression_level=config.export_compression_level,
+    )
+    try:
+        uploaded = replay_directory(
+            args.directory, exporter, delete=not args.keep, include_partial=args.include_partial
+        )
+    finally:
+        exporter.shutdown()
+
+    print(f"Uploaded {uploaded} batch(es) from {args.directory}")
+    return 0 if not _span_files(args.directory, args.include_partial) or args.keep else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Span sampling for AgentOps SDK.
+
+:class:`AgentOpsSampler` decides when a span starts (head sampling), so spans
+it drops are never recorded at all. :class:`TailSamplingSpanProcessor` holds
+every span of a trace until its session span ends, then decides for the
+whole trace at once.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanKind as OTelSpanKind, StatusCode
+from opentelemetry.util.types import Attributes
+
+from agentops.logging import logger
+from agentops.sdk.deferred import deferred_attributes
+from agentops.semconv.span_attributes import SpanAttributes
+from agentops.semconv.span_kinds import SpanKind
+
+_TRACE_ID_MASK = (1 << 64) - 1
+
+
+class _TraceBuffer:
+    """Spans of one undecided trace and the signals collected from them so far."""
+
+    __slots__ = ("spans", "errored", "tokens", "started")
+
+    def __init__(self):
+        self.spans: List[ReadableSpan] = []
+        self.errored = False
+        self.tokens = 0
+        self.started = time.monotonic()
+
+    def add(self, span: ReadableSpan) -> None:
+        self.spans.append(span)
+        if span.status.status_code is StatusCode.ERROR:
+            self.errored = True
+        attributes = span.attributes or {}
+        tokens = attributes.get(SpanAttributes.LLM_USAGE_TOTAL_TOKENS)
+        if tokens is None:
+            tokens = (attributes.get(SpanAttributes.LLM_USAGE_PROMPT_TOKENS) or 0) + (
+                attributes.get(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS) or 0
+            )
+        if isinstance(tokens, (int, float)):
+            self.tokens += int(tokens)
+
+
+def _is_session(span: ReadableSpan) -> bool:
+    return bool(span.attributes) and span.attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) == SpanKind.SESSION
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity; defaults to one second worth of tokens (at least 1)
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def take(self) -> bool:
+        """Take a token, returning False if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class AgentOpsSampler(Sampler):
+    """
+    Head sampler combining a parent-based trace ratio with per-kind rate limits.
+
+    New traces are sampled with probability ``ratio`` and child spans follow
+    their parent, so a trace is kept or dropped as a whole. On top of that,
+    ``rate_limits`` caps how many spans per second are kept for a given key,
+    where a key matches a span's AgentOps span kind (e.g. ``llm``), its exact
+    name, or a dotted name prefix (``openai`` matches ``openai.chat``).
+    Session spans are never rate limited.
+
+    A span dropped here is non-recording, and so are its children, so
+    decorators and instrumentors skip extracting its attributes.
+    """
+
+    def __init__(self, ratio: float = 1.0, rate_limits: Optional[Mapping[str, Union[float, str]]] = None):
+        """
+        Args:
+            ratio: Fraction of new traces to sample, between 0 and 1
+            rate_limits: Maximum spans per second keyed by span kind or span name (prefix)
+        """
+        self.ratio = min(1.0, max(0.0, ratio))
+        self._root = ParentBased(TraceIdRatioBased(self.ratio))
+        self._buckets: Dict[str, TokenBucket] = {}
+        for key, rate in (rate_limits or {}).items():
+            try:
+                self._buckets[key] = TokenBucket(float(rate))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid span rate limit {key}={rate!r}")
+
+    def _bucket_for(self, span_kind: Optional[str], name: str) -> Optional[TokenBucket]:
+        if span_kind is not None and span_kind in self._buckets:
+            return self._buckets[span_kind]
+        while name:
+            if name in self._buckets:
+                return self._buckets[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[OTelSpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[trace.TraceState] = None,
+    ) -> SamplingResult:
+        result = self._root.should_sample(
+            parent_context, trace_id, name, kind=kind, attributes=attributes, links=links, trace_state=trace_state
+        )
+        if not self._buckets or not result.decision.is_sampled():
+            return result
+
+        span_kind = attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) if attributes else None
+        if span_kind == SpanKind.SESSION:
+            return result
+        bucket = self._bucket_for(span_kind, name)
+        if bucket is None or bucket.take():
+            return result
+        parent_state = trace.get_current_span(parent_context).get_span_context().trace_state
+        return SamplingResult(Decision.DROP, None, parent_state)
+
+    def get_description(self) -> str:
+        return f"AgentOpsSampler{{ratio={self.ratio}, rate_limits={sorted(self._buckets)}}}"
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Keeps interesting sessions in full and only a sample of the rest.
+
+    Ended spans are buffered per trace until the trace's session span ends.
+    The trace is then kept if any span errored, the session took longer than
+    ``latency_threshold_millis`` or its LLM calls used at least
+    ``token_threshold`` tokens; otherwise it is kept with probability
+    ``sample_rate``. Kept traces are passed on to ``span_processor``.
+
+    The rate decision is derived from the trace id, like ``TraceIdRatioBased``,
+    so every process sampling the same trace agrees. Traces that never see a
+    session span are decided the same way once they are older than
+    ``decision_wait_millis`` or the buffer exceeds ``max_traces``.
+    """
+
+    def __init__(
+        self,
+        span_processor: SpanProcessor,
+        sample_rate: float = 0.1,
+        latency_threshold_millis: float = 30000,
+        token_threshold: int = 20000,
+        decision_wait_millis: float = 300000,
+        max_traces: int = 10000,
+    ):
+        """
+        Args:
+            span_processor: Processor receiving the spans of kept traces
+            sample_rate: Fraction of uneventful traces to keep, between 0 and 1
+            latency_threshold_millis: Sessions lasting at least this long are always kept
+            token_threshold: Traces using at least this many LLM tokens are always kept
+            decision_wait_millis: Age at which a trace without a session span is decided anyway
+            max_traces: Maximum number of undecided traces held in memory
+        """
+        self.span_processor = span_processor
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.latency_threshold_millis = latency_threshold_millis
+        self.token_threshold = token_threshold
+        self.decision_wait_millis = decision_wait_millis
+        self.max_traces = max_traces
+
+        self.kept_traces = 0
+        self.dropped_traces = 0
+
+        self._rate_bound = round(self.sample_rate * (1 << 64))
+        self._traces: "OrderedDict[int, _TraceBuffer]" = OrderedDict()
+        # Decisions are remembered so spans ending after their session follow them
+        self._decisions: "OrderedDict[int, bool]" = OrderedDict()
+        self._lock = Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self.span_processor.on_start(span, parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context or not span.context.trace_flags.sampled:
+            return
+
+        trace_id = span.context.trace_id
+        decided: List[Tuple[bool, _TraceBuffer]] = []
+        with self._lock:
+            late = self._decisions.get(trace_id)
+            if late is None:
+                buffer = self._traces.get(trace_id)
+                if buffer is None:
+                    buffer = self._traces[trace_id] = _TraceBuffer()
+                buffer.add(span)
+                if _is_session(span):
+                    del self._traces[trace_id]
+                    decided.append((self._decide(trace_id, buffer, span), buffer))
+                decided.extend(self._expire())
+
+        if late is not None:
+            if late:
+                self.span_processor.on_end(span)
+            return
+        self._forward(decided)
+
+    def _expire(self) -> List[Tuple[bool, _TraceBuffer]]:
+        # Caller must hold self._lock; traces are ordered by their first span
+        expired = []
+        cutoff = time.monotonic() - self.decision_wait_millis / 1000
+        while self._traces:
+            trace_id, buffer = next(iter(self._traces.items()))
+            if len(self._traces) <= self.max_traces and buffer.started > cutoff:
+                break
+            del self._traces[trace_id]
+            expired.append((self._decide(trace_id, buffer, None), buffer))
+        return expired
+
+    def _should_keep(self, trace_id: int, buffer: _TraceBuffer, root: Optional[ReadableSpan]) -> bool:
+        """Return whether a completed trace is kept."""
+        if buffer.errored or buffer.tokens >= self.token_threshold:
+            return True
+        if root is not None and root.end_time is not None and root.start_time is not None:
+            if (root.end_time - root.start_time) / 1e6 >= self.latency_threshold_millis:
+                return True
+        return (trace_id & _TRACE_ID_MASK) < self._rate_bound
+
+    def _decide(self, trace_id: int, buffer: _TraceBuffer, root: Optional[ReadableSpan]) -> bool:
+        # Caller must hold self._lock
+        keep = self._should_keep(trace_id, buffer, root)
+        self._decisions[trace_id] = keep
+        while len(self._decisions) > self.max_traces:
+            self._decisions.popitem(last=False)
+        if keep:
+            self.kept_traces += 1
+        else:
+            self.dropped_traces += 1
+            logger.debug(f"Tail sampling dropped trace {trace_id:032x} ({len(buffer.spans)} spans)")
+        return keep
+
+    def _forward(self, decided: List[Tuple[bool, _TraceBuffer]]) -> None:
+        for keep, buffer in decided:
+            if keep:
+                for span in buffer.spans:
+                    self.span_processor.on_end(span)
+            else:
+                # Release inputs and outputs held for serialization at export
+                deferred_attributes.discard(buffer.spans)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        # Undecided traces stay buffered until their session ends
+        return self.span_processor.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            decided = [(self._decide(trace_id, buffer, None), buffer) for trace_id, buffer in self._traces.items()]
+            self._traces.clear()
+        self._forward(decided)
+        self.span_processor.shutdown()
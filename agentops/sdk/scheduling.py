@@ -0,0 +1,139 @@
+"""
+Adaptive export scheduling for span batches.
+
+The scheduler decides how many spans go into each exported batch and how long
+the export worker waits between exports, based on the current queue depth and
+on how the exporter has been behaving:
+
+* batches that go out full while spans keep queueing double the batch size,
+  batches that go out mostly empty halve it;
+* a short queue is flushed after ``min_delay_millis`` so a trickle of spans
+  shows up quickly, a deep one waits until a full batch is ready;
+* failed or slow exports back off exponentially, up to ``max_backoff_millis``.
+"""
+
+import threading
+from typing import Dict, Optional
+
+from agentops.helpers.fork import register_at_fork_reinit
+
+
+class AdaptiveExportScheduler:
+    """
+    Export policy that tunes batch size and flush delay from observed load.
+
+    The scheduler holds no spans itself; a processor asks it for the next
+    batch size and delay, and reports back every export with
+    :meth:`record_export`.
+    """
+
+    def __init__(
+        self,
+        min_batch_size: int = 32,
+        max_batch_size: int = 2048,
+        min_delay_millis: float = 100,
+        max_delay_millis: float = 5000,
+        max_backoff_millis: float = 30000,
+        latency_target_millis: float = 2000,
+    ):
+        """
+        Args:
+            min_batch_size: Smallest batch size the scheduler shrinks to
+            max_batch_size: Largest batch size the scheduler grows to
+            min_delay_millis: Flush delay used when only a few spans are queued
+            max_delay_millis: Flush delay used when the queue is deep or empty
+            max_backoff_millis: Upper bound on the delay after failed or slow exports
+            latency_target_millis: Export latency above which the scheduler backs off
+        """
+        self.min_batch_size = max(1, min(min_batch_size, max_batch_size))
+        self.max_batch_size = max(1, max_batch_size)
+        self.min_delay_millis = min(min_delay_millis, max_delay_millis)
+        self.max_delay_millis = max_delay_millis
+        self.max_backoff_millis = max_backoff_millis
+        self.latency_target_millis = latency_target_millis
+
+        self.batch_size = self.min_batch_size
+        self.delay_millis = self.max_delay_millis
+        self.backoff_millis = 0.0
+        self.latency_millis: Optional[float] = None
+        self.consecutive_failures = 0
+        self._lock = threading.Lock()
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def backing_off(self) -> bool:
+        return self.backoff_millis > 0
+
+    def next_delay(self, queue_size: int) -> float:
+        """
+        Return how long to wait, in seconds, before exporting a queue of ``queue_size`` spans.
+
+        Args:
+            queue_size: Number of spans currently queued
+
+        Returns:
+            The delay in seconds
+        """
+        with self._lock:
+            if queue_size == 0:
+                # Nothing to do; the processor wakes the worker when a span arrives
+                delay = self.max_delay_millis
+            elif queue_size >= self.batch_size:
+                delay = 0
+            elif queue_size * 2 <= self.batch_size:
+                delay = self.min_delay_millis
+            else:
+                # A batch is filling up; give it time to fill
+                delay = self.max_delay_millis
+            self.delay_millis = max(delay, self.backoff_millis)
+            return self.delay_millis / 1000
+
+    def record_export(self, exported: int, latency: float, success: bool) -> None:
+        """
+        Update the policy with the outcome of an export.
+
+        Args:
+            exported: Number of spans in the exported batch
+            latency: Time the export took, in seconds
+            success: Whether the exporter accepted the batch
+        """
+        latency_millis = latency * 1000
+        with self._lock:
+            if self.latency_millis is None:
+                self.latency_millis = latency_millis
+            else:
+                self.latency_millis = 0.8 * self.latency_millis + 0.2 * latency_millis
+
+            if not success:
+                self.consecutive_failures += 1
+                self.backoff_millis = min(
+                    self.max_backoff_millis,
+                    max(self.min_delay_millis, self.backoff_millis * 2),
+                )
+                return
+
+            self.consecutive_failures = 0
+            if self.latency_millis > self.latency_target_millis:
+                # The endpoint is struggling; send fewer, larger requests
+                self.backoff_millis = min(self.max_backoff_millis, self.latency_millis)
+            else:
+                self.backoff_millis = 0.0
+
+            if exported >= self.batch_size:
+                self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+            elif exported * 4 < self.batch_size:
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the scheduler's current decisions."""
+        with self._lock:
+            return {
+                "batch_size": self.batch_size,
+                "delay_millis": self.delay_millis,
+                "backoff_millis": self.backoff_millis,
+                "latency_millis": self.latency_millis or 0.0,
+                "consecutive_failures": self.consecutive_failures,
+            }
@@ -0,0 +1,593 @@
+"""
+Disk-backed spill journal for span batches.
+
+When the in-memory export queue is full, or the OTLP endpoint is unreachable,
+serialized span batches are appended to a segmented, memory-mapped journal on
+disk and drained back to the exporter once capacity returns.
+
+Each segment is a fixed-size file laid out as::
+
+    [magic (4 bytes)][write offset (u64)][read offset (u64)][record]...[record]
+
+where every record is a little-endian u32 length followed by the payload.
+Disk usage is bounded by ``max_bytes``; when the bound is exceeded the oldest
+segments are evicted first.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: journals of exited processes are not claimed
+    fcntl = None  # type: ignore
+
+import requests
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.helpers.fork import register_at_fork_reinit
+from agentops.logging import logger
+from agentops.sdk.deferred import deferred_attributes
+from agentops.sdk.exporters import is_rejection_status
+
+_MAGIC = b"AOSJ"
+_HEADER = struct.Struct("<4sQQ")
+_RECORD = struct.Struct("<I")
+_SUFFIX = ".seg"
+
+DEFAULT_SEGMENT_SIZE = 8 * 1024 * 1024  # 8MB
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+
+# Attempts after which a batch the endpoint keeps refusing is dropped from the journal
+DEFAULT_MAX_REJECTIONS = 3
+
+# Returned by a drain callback when the endpoint refused the batch itself rather than failing to take it
+REJECTED = object()
+
+
+def export_rejected(span_exporter: Any) -> bool:
+    """Whether the last failed export of ``span_exporter`` was refused for good rather than failing transiently."""
+    last_export_rejected = getattr(span_exporter, "last_export_rejected", None)
+    return last_export_rejected is not None and last_export_rejected() is True
+
+
+_LOCK_NAME = ".lock"
+# Subdirectory of a journal under which its forked children claim theirs
+_FORKS_DIR = "forks"
+# Lock files of the claimed journal directories, held open for the life of the process
+_claimed: Dict[str, IO] = {}
+
+
+def _lock_orphaned(directory: str) -> Optional[IO]:
+    """Take the lock of a journal directory, or None while a running process holds it"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        lock_file = open(os.path.join(directory, _LOCK_NAME), "a")
+    except OSError:
+        return None
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _release_claims_at_fork() -> None:
+    # The child shares the parent's locks through the inherited descriptors; closing
+    # its copies leaves the parent's locks in place and lets the child claim its own.
+    for lock_file in _claimed.values():
+        try:
+            lock_file.close()
+        except OSError:
+            pass
+    _claimed.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_release_claims_at_fork)
+
+
+def _adopt_forks(directory: str) -> None:
+    """Move the segments left by exited forked children into the journal ``directory``, after its own"""
+    forks = os.path.join(directory, _FORKS_DIR)
+    if fcntl is None or not os.path.isdir(forks):
+        return
+    seqs = [int(name[: -len(_SUFFIX)]) for name in os.listdir(directory) if name.endswith(_SUFFIX)]
+    seq = max(seqs, default=-1) + 1
+    for name in sorted(os.listdir(forks)):
+        child = os.path.join(forks, name)
+        if child in _claimed or not os.path.isdir(child):
+            continue
+        lock_file = _lock_orphaned(child)
+        if lock_file is None:
+            continue  # The child is still running
+        try:
+            _adopt_forks(child)  # Its own children first
+            for segment in sorted(os.listdir(child)):
+                if segment.endswith(_SUFFIX):
+                    os.rename(os.path.join(child, segment), os.path.join(directory, f"{seq:016d}{_SUFFIX}"))
+                    seq += 1
+            os.unlink(os.path.join(child, _LOCK_NAME))
+            os.rmdir(child)
+            logger.debug(f"Adopted spill journal {child} of an exited child process")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot adopt spill journal {child}: {e}")
+        finally:
+            lock_file.close()
+
+
+def default_spill_root() -> str:
+    """Directory under which processes claim their spill journals by default"""
+    return os.path.join(tempfile.gettempdir(), "agentops", "spill")
+
+
+def claim_spill_directory(root: str) -> str:
+    """
+    Claim a journal directory under ``root`` for this process.
+
+    Every journal directory holds a lock file that its process keeps locked
+    while it runs. A directory whose lock can be taken belonged to a process
+    that has exited, so it is reused and the spans it left undelivered are
+    recovered by the new journal. A new directory is only created when every
+    existing one is in use.
+
+    Args:
+        root: Directory shared by the journals of all processes
+
+    Returns:
+        The claimed journal directory
+    """
+    fallback = os.path.join(root, str(os.getpid()))
+    if fcntl is None:
+        return fallback
+    for directory in _claimed:
+        if os.path.dirname(directory) == root:
+            return directory
+    try:
+        os.makedirs(root, exist_ok=True)
+        candidates = [os.path.join(root, name) for name in sorted(os.listdir(root))]
+    except OSError as e:
+        logger.warning(f"Cannot list spill directory {root}: {e}")
+        return fallback
+
+    # Orphaned journals first; then this process's own, new directory
+    for directory in [path for path in candidates if os.path.isdir(path)] + [fallback]:
+        lock_file = _lock_orphaned(directory)
+        if lock_file is None:
+            continue
+        _claimed[directory] = lock_file
+        if directory != fallback:
+            logger.debug(f"Recovering spill journal {directory} of an exited process")
+        return directory
+    return fallback
+
+
+class _Segment:
+    """A single memory-mapped journal segment."""
+
+    def __init__(self, path: str, seq: int, size: Optional[int] = None):
+        self.path = path
+        self.seq = seq
+
+        if size is not None:
+            # Create and pre-allocate a new segment
+            with open(path, "wb") as f:
+                f.truncate(size)
+
+        self._file = open(path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        if size is not None:
+            self.write_offset = self.read_offset = _HEADER.size
+            self._write_header()
+        else:
+            magic, self.write_offset, self.read_offset = _HEADER.unpack_from(self._mmap, 0)
+            if magic != _MAGIC or not (_HEADER.size <= self.read_offset <= self.write_offset <= len(self._mmap)):
+                self.close()
+                raise ValueError(f"Corrupt spill segment: {path}")
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    @property
+    def empty(self) -> bool:
+        return self.read_offset >= self.write_offset
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self.write_offset, self.read_offset)
+
+    def append(self, payload: bytes) -> bool:
+        """Append a record, returning False if it does not fit."""
+        end = self.write_offset + _RECORD.size + len(payload)
+        if end > self.size:
+            return False
+        _RECORD.pack_into(self._mmap, self.write_offset, len(payload))
+        self._mmap[self.write_offset + _RECORD.size : end] = payload
+        self.write_offset = end
+        self._write_header()
+        return True
+
+    def peek(self) -> Tuple[bytes, int]:
+        """Return the oldest unread record and the offset just past it."""
+        (length,) = _RECORD.unpack_from(self._mmap, self.read_offset)
+        start = self.read_offset + _RECORD.size
+        return self._mmap[start : start + length], start + length
+
+    def advance(self, offset: int) -> None:
+        self.read_offset = offset
+        if self.empty:
+            # Fully drained; rewind so the space is reused in place
+            self.read_offset = self.write_offset = _HEADER.size
+        self._write_header()
+
+    def close(self) -> None:
+        try:
+            self._mmap.flush()
+            self._mmap.close()
+        finally:
+            self._file.close()
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SpillJournal:
+    """
+    Segmented, memory-mapped on-disk queue of serialized span batches.
+
+    Records are appended to the newest segment and consumed oldest-first.
+    Consumers use :meth:`drain` with a send callback; a record is only removed
+    from the journal once the callback reports success.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_rejections: int = DEFAULT_MAX_REJECTIONS,
+    ):
+        """
+        Initialize the journal, recovering any segments left in ``directory``.
+
+        Args:
+            directory: Directory holding the segment files
+            max_bytes: Upper bound on the total size of all segment files
+            segment_size: Size in bytes of each pre-allocated segment
+            max_rejections: Drain attempts after which a record the endpoint keeps refusing is dropped
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_size = min(segment_size, max_bytes)
+        self.max_rejections = max_rejections
+        self._segments: List[_Segment] = []
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self.evicted_segments = 0
+        self.rejected_records = 0
+        # Refusals so far of the record at (segment seq, offset)
+        self._rejections: Dict[Tuple[int, int], int] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # The segments are shared memory maps of the parent's files; writing to them
+        # from the child would corrupt the parent's journal. The child drops its
+        # mappings without touching the files and journals into a directory of its own,
+        # locked like any other journal, so the parent, or whoever next owns its
+        # directory, adopts what the child leaves behind (see _adopt_forks).
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._segments = []
+        self._rejections = {}
+        self.directory = claim_spill_directory(os.path.join(self.directory, _FORKS_DIR))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._recover()  # A reused directory holds the spans of an exited sibling
+        except OSError as e:
+            logger.warning(f"Cannot create spill directory {self.directory}: {e}")
+
+    def _recover(self) -> None:
+        _adopt_forks(self.directory)
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                self._segments.append(_Segment(path, int(name[: -len(_SUFFIX)])))
+            except (ValueError, OSError, struct.error) as e:
+                logger.warning(f"Discarding unreadable spill segment {path}: {e}")
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        if self._segments:
+            logger.debug(f"Recovered {len(self._segments)} spill segment(s) from {self.directory}")
+
+    def _new_segment(self, min_size: int) -> _Segment:
+        seq = self._segments[-1].seq + 1 if self._segments else 0
+        path = os.path.join(self.directory, f"{seq:016d}{_SUFFIX}")
+        segment = _Segment(path, seq, size=max(self.segment_size, min_size))
+        self._segments.append(segment)
+        return segment
+
+    def _evict(self) -> None:
+        # Never evict the segment currently being written to
+        while len(self._segments) > 1 and self.disk_usage > self.max_bytes:
+            oldest = self._segments.pop(0)
+            oldest.remove()
+            self.evicted_segments += 1
+            logger.warning(f"Spill journal over {self.max_bytes} bytes; evicted oldest segment {oldest.path}")
+
+    @property
+    def disk_usage(self) -> int:
+        """Total size in bytes of all segment files."""
+        return sum(segment.size for segment in self._segments)
+
+    def __len__(self) -> int:
+        """Number of segments that still hold unread records."""
+        with self._lock:
+            return sum(1 for segment in self._segments if not segment.empty)
+
+    def append(self, payload: bytes) -> bool:
+        """
+        Append a serialized batch to the journal.
+
+        Args:
+            payload: The serialized span batch
+
+        Returns:
+            True if the payload was written, False if it can never fit within ``max_bytes``
+        """
+        record_size = _HEADER.size + _RECORD.size + len(payload)
+        if record_size > self.max_bytes:
+            logger.warning(f"Span batch of {len(payload)} bytes exceeds spill limit, dropping")
+            return False
+
+        with self._lock:
+            if not self._segments or not self._segments[-1].append(payload):
+                self._new_segment(record_size).append(payload)
+            self._evict()
+        return True
+
+    def drain(self, send: Callable[[bytes], bool], max_records: Optional[int] = None) -> int:
+        """
+        Send journaled batches oldest-first until the journal is empty or ``send`` fails.
+
+        The journal lock is not held while ``send`` runs, so appends are never
+        blocked on network I/O. Only one drain runs at a time. A record that
+        ``send`` reports as ``REJECTED`` ``max_rejections`` times is dropped so
+        it does not hold back the records after it.
+
+        Args:
+            send: Callback that delivers a payload and returns True on success, False on a
+                transient failure, or ``REJECTED`` if the endpoint refused the payload itself
+            max_records: Maximum number of records to send in this call
+
+        Returns:
+            Number of records successfully sent
+        """
+        if not self._drain_lock.acquire(blocking=False):
+            return 0
+
+        sent = 0
+        try:
+            while max_records is None or sent < max_records:
+                with self._lock:
+                    segment = self._oldest_unread()
+                    if segment is None:
+                        break
+                    record = (segment.seq, segment.read_offset)
+                    payload, next_offset = segment.peek()
+
+                result = send(payload)
+                if result is REJECTED:
+                    with self._lock:
+                        rejections = self._rejections.pop(record, 0) + 1
+                        if rejections < self.max_rejections:
+                            self._rejections[record] = rejections
+                            break
+                        self.rejected_records += 1
+                        self._consume(segment, next_offset)
+                    logger.warning(f"Dropping spilled span batch refused {rejections} times by the endpoint")
+                    continue
+                if not result:
+                    break
+                sent += 1
+
+                with self._lock:
+                    self._rejections.pop(record, None)
+                    self._consume(segment, next_offset)
+        finally:
+            self._drain_lock.release()
+        return sent
+
+    def _consume(self, segment: _Segment, next_offset: int) -> None:
+        # Caller must hold self._lock. The segment may have been evicted while its record was being sent.
+        if segment in self._segments:
+            segment.advance(next_offset)
+            if segment.empty and segment is not self._segments[-1]:
+                self._segments.remove(segment)
+                segment.remove()
+
+    def _oldest_unread(self) -> Optional[_Segment]:
+        for segment in self._segments:
+            if not segment.empty:
+                return segment
+        return None
+
+    def close(self) -> None:
+        """Flush and close all segments, removing the ones that are fully drained."""
+        with self._lock:
+            for segment in self._segments:
+                if segment.empty:
+                    segment.remove()
+                else:
+                    segment.close()
+            self._segments = []
+
+
+class SpanSpiller:
+    """
+    Writes span batches to a :class:`SpillJournal` and drains them back to the endpoint.
+
+    Batches are stored as serialized OTLP ``ExportTraceServiceRequest`` protobuf.
+    Draining goes through the exporter's ``export_serialized`` when it provides
+    one (so authentication and compression are reused), otherwise the payload is
+    posted to ``endpoint`` directly.
+    """
+
+    def __init__(
+        self,
+        journal: SpillJournal,
+        span_exporter: Optional[SpanExporter] = None,
+        endpoint: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: int = 10,
+    ):
+        """
+        Args:
+            journal: Disk journal holding spilled batches
+            span_exporter: Exporter used to deliver drained batches, if it supports ``export_serialized``
+            endpoint: OTLP/HTTP traces endpoint used when the exporter cannot send serialized payloads
+            headers: Headers (e.g. authorization) sent with directly posted batches
+            timeout: Timeout in seconds for directly posted batches
+        """
+        self.journal = journal
+        self._span_exporter = span_exporter
+        self._export_serialized = getattr(span_exporter, "export_serialized", None)
+        self._endpoint = endpoint
+        self._headers = {**(headers or {}), "Content-Type": "application/x-protobuf"}
+        self._timeout = timeout
+        self._session: Optional[requests.Session] = None
+        register_at_fork_reinit(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # Pooled connections belong to the parent
+        self._session = None
+
+    def spill(self, spans: Sequence[ReadableSpan]) -> bool:
+        """
+        Serialize a batch of spans and append it to the journal.
+
+        Args:
+            spans: The spans to spill
+
+        Returns:
+            True if the batch was written to disk
+        """
+        try:
+            payload = encode_spans(deferred_attributes.resolve(spans)).SerializePartialToString()
+        except Exception as e:
+            logger.error(f"Failed to encode spans for spilling: {e}")
+            return False
+        written = self.journal.append(payload)
+        if written:
+            logger.debug(f"Spilled {len(spans)} span(s) to disk")
+        return written
+
+    def send(self, payload: bytes) -> Any:
+        """Deliver one serialized batch; returns True on success, or ``REJECTED`` if the endpoint refused it."""
+        if self._export_serialized is not None:
+            if self._export_serialized(payload) is SpanExportResult.SUCCESS:
+                return True
+            return REJECTED if export_rejected(self._span_exporter) else False
+        if not self._endpoint:
+            return False
+        if self._session is None:
+            self._session = requests.Session()
+        try:
+            response = self._session.post(self._endpoint, data=payload, headers=self._headers, timeout=self._timeout)
+        except requests.RequestException as e:
+            logger.debug(f"Failed to drain spilled batch: {e}")
+            return False
+        if is_rejection_status(response.status_code):
+            return REJECTED
+        return 200 <= response.status_code < 300
+
+    def drain(self, max_records: Optional[int] = None) -> int:
+        """
+        Deliver journaled batches oldest-first.
+
+        Args:
+            max_records: Maximum number of batches to send, or None to drain everything
+
+        Returns:
+            Number of batches delivered
+        """
+        return self.journal.drain(self.send, max_records=max_records)
+
+    def close(self) -> None:
+        """Close the journal; undelivered batches stay on disk for the next run."""
+        if self._session is not None:
+            self._session.close()
+        self.journal.close()
+
+
+class SpillingSpanExporter(SpanExporter):
+    """
+    Exporter wrapper that spills failed batches and drains the journal after successful exports.
+    """
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        spiller: SpanSpiller,
+        drain_batch_limit: int = 4,
+        on_exported: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Args:
+            span_exporter: The exporter being wrapped
+            spiller: Spiller receiving batches the exporter fails to deliver
+            drain_batch_limit: Maximum journaled batches drained after each successful export
+            on_exported: Called with the batch size after every export attempt
+        """
+        self.span_exporter = span_exporter
+        self.spiller = spiller
+        self.drain_batch_limit = drain_batch_limit
+        self._on_exported = on_exported
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            result = self.span_exporter.export(spans)
+        except Exception as e:
+            logger.debug(f"Export raised: {e}")
+            result = SpanExportResult.FAILURE
+        finally:
+            if self._on_exported is not None:
+                self._on_exported(len(spans))
+
+        if result is SpanExportResult.SUCCESS:
+            # The endpoint is healthy again; use the spare capacity to catch up on spilled batches
+            self.spiller.drain(max_records=self.drain_batch_limit)
+            return result
+
+        if export_rejected(self.span_exporter):
+            # Refused as invalid: sending it again would fail the same way
+            return result
+
+        # Endpoint outage: keep the batch on disk instead of dropping it
+        if self.spiller.spill(spans):
+            return SpanExportResult.SUCCESS
+        return result
+
+    def shutdown(self) -> None:
+        self.span_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_exporter.force_flush(timeout_millis)
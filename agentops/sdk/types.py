@@ -19,3 +19,19 @@ class TracingConfig(TypedDict, total=False):
     max_queue_size: int  # Required with a default value
     max_wait_time: int  # Required with a default value
     export_flush_interval: int  # Time interval between automatic exports
+    spill_to_disk: bool  # Spill overflowed/undeliverable spans to a disk journal
+    spill_dir: Optional[str]  # Directory for the spill journal
+    spill_max_bytes: int  # Maximum disk usage of the spill journal
+    async_flush: bool  # Flush on a background thread when sessions end
+    export_compression: str  # Compression for exported spans: gzip, deflate, zstd or none
+    export_compression_level: Optional[int]  # Compression level, None for the codec default
+    adaptive_export: bool  # Adapt batch size and flush delay to load
+    export_workers: int  # Number of concurrent export workers
+    export_file_dir: Optional[str]  # Write spans to local files instead of the endpoint
+    tail_sample_rate: Optional[float]  # Tail sampling rate for uneventful sessions, None disables it
+    tail_sample_latency_threshold: int  # Sessions at least this slow (ms) are always kept
+    tail_sample_token_threshold: int  # Sessions using at least this many tokens are always kept
+    sample_rate: float  # Head sampling ratio for new traces
+    span_rate_limits: Dict[str, float]  # Spans per second keyed by span kind or name prefix
+    lazy_serialization: bool  # Serialize decorator inputs/outputs at export time
+    background_auth: bool  # Buffer exports until the JWT is provided with TracingCore.authenticate
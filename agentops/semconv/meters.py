@@ -22,3 +22,10 @@ class Meters:
     AGENT_RUNS = "gen_ai.agent.runs"
     AGENT_TURNS = "gen_ai.agent.turns"
     AGENT_EXECUTION_TIME = "gen_ai.agent.execution_time"
+
+    # Span export metrics
+    EXPORT_BATCH_SIZE = "agentops.export.batch_size"
+    EXPORT_DELAY = "agentops.export.delay"
+    EXPORT_BACKOFF = "agentops.export.backoff"
+    EXPORT_QUEUE_SIZE = "agentops.export.queue_size"
+    EXPORT_DROPPED_SPANS = "agentops.export.dropped_spans"
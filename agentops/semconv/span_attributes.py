@@ -87,6 +87,15 @@ class SpanAttributes:
     AGENTOPS_SPAN_KIND = "agentops.span.kind"
     AGENTOPS_ENTITY_NAME = "agentops.entity.name"
 
+    # Aggregated entity calls (one summary span for many calls)
+    AGENTOPS_AGGREGATE_CALL_COUNT = "agentops.aggregate.call_count"
+    AGENTOPS_AGGREGATE_ERROR_COUNT = "agentops.aggregate.error_count"
+    AGENTOPS_AGGREGATE_DURATION_TOTAL = "agentops.aggregate.duration.total_ms"
+    AGENTOPS_AGGREGATE_DURATION_MIN = "agentops.aggregate.duration.min_ms"
+    AGENTOPS_AGGREGATE_DURATION_MAX = "agentops.aggregate.duration.max_ms"
+    AGENTOPS_AGGREGATE_LATENCY_BOUNDS = "agentops.aggregate.latency.bucket_bounds_ms"
+    AGENTOPS_AGGREGATE_LATENCY_COUNTS = "agentops.aggregate.latency.bucket_counts"
+
     # Operation attributes
     OPERATION_NAME = "operation.name"
     OPERATION_VERSION = "operation.version"
\ No newline at end of file
@@ -0,0 +1,98 @@
+import logging
+import time
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+from agentops.logging import logger
+from agentops.sdk.core import TracingCore
+from agentops.sdk.decorators import agent, task
+
+"""
+Benchmark script for measuring the per-call overhead of the entity decorators.
+
+Spans are exported synchronously to an exporter that discards them, so the
+numbers cover span creation, attribute recording and context handling only.
+"""
+
+
+class _DiscardingExporter(SpanExporter):
+    def export(self, spans):
+        return SpanExportResult.SUCCESS
+
+
+def _setup_tracing():
+    """Initialize TracingCore with a provider that discards every span"""
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(_DiscardingExporter()))
+
+    with mock.patch("agentops.sdk.core.setup_telemetry", return_value=(provider, mock.MagicMock())):
+        core = TracingCore.get_instance()
+        core._initialized = False
+        core._provider = None
+        core.initialize()
+
+
+def _time_calls(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations
+
+
+def run_benchmark(iterations: int = 20000):
+    """
+    Run a benchmark of decorated function calls.
+
+    Args:
+        iterations: Number of calls timed per case
+
+    Returns:
+        Dictionary with the average seconds per call for each case
+    """
+    _setup_tracing()
+
+    def plain(value):
+        return value
+
+    @task
+    def task_call(value):
+        return value
+
+    @agent
+    def agent_call(value):
+        return value
+
+    results = {"plain": _time_calls(plain, iterations)}
+    for level, label in ((logging.INFO, ""), (logging.DEBUG, " (DEBUG logging)")):
+        previous = logger.level
+        logger.setLevel(level)
+        try:
+            results[f"@task{label}"] = _time_calls(task_call, iterations)
+            results[f"@agent{label}"] = _time_calls(agent_call, iterations)
+        finally:
+            logger.setLevel(previous)
+
+    return results
+
+
+def print_results(results):
+    """
+    Print benchmark results in a formatted way.
+
+    Args:
+        results: Dictionary with timing results
+    """
+    print("\n=== BENCHMARK RESULTS ===\n")
+
+    baseline = results["plain"]
+    for name, seconds in results.items():
+        overhead = (seconds - baseline) * 1e6
+        print(f"{name:<28} {seconds * 1e6:8.2f}us/call  (+{overhead:.2f}us)")
+
+
+if __name__ == "__main__":
+    print("Running decorator benchmark...")
+    results = run_benchmark()
+    print_results(results)
@@ -0,0 +1,111 @@
+"""Tests for the async HTTP client and the async API clients."""
+
+import gzip
+import json
+from unittest import mock
+
+import httpx
+import pytest
+
+from agentops.client.api import AsyncApiClient
+from agentops.client.http.async_http_client import AsyncHttpClient
+from agentops.exceptions import ApiServerException
+
+
+@pytest.fixture
+def transport():
+    """Route AsyncHttpClient through a mock transport; set `transport.handler` per test."""
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return handle.handler(request)
+
+    handle.handler = lambda request: httpx.Response(200, json={})
+    handle.requests = requests
+
+    def create_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle), headers={"Content-Type": "application/json"})
+
+    with mock.patch.object(AsyncHttpClient, "_create_client", side_effect=create_client):
+        yield handle
+
+
+class TestAsyncHttpClient:
+    async def test_client_is_shared_within_a_loop(self, transport):
+        client = AsyncHttpClient.get_client()
+        assert AsyncHttpClient.get_client() is client
+        await AsyncHttpClient.aclose()
+        assert client.is_closed
+        assert AsyncHttpClient.get_client() is not client
+        await AsyncHttpClient.aclose()
+
+    async def test_follows_redirects_up_to_the_limit(self, transport):
+        def handler(request):
+            if request.url.path == "/old":
+                return httpx.Response(303, headers={"location": "https://api.test/new"})
+            if request.url.path == "/loop":
+                return httpx.Response(302, headers={"location": "https://api.test/loop"})
+            return httpx.Response(200, json={"path": request.url.path})
+
+        transport.handler = handler
+
+        response = await AsyncHttpClient.request("post", "https://api.test/old", data={"a": 1})
+        assert response.json() == {"path": "/new"}
+        assert [r.method for r in transport.requests] == ["POST", "GET"]
+
+        with pytest.raises(httpx.TooManyRedirects):
+            await AsyncHttpClient.request("get", "https://api.test/loop", max_redirects=2)
+        await AsyncHttpClient.aclose()
+
+    async def test_unsupported_method(self, transport):
+        with pytest.raises(ValueError):
+            await AsyncHttpClient.request("patch", "https://api.test/")
+
+
+class TestAsyncApiClient:
+    async def test_fetch_auth_token(self, transport):
+        transport.handler = lambda request: httpx.Response(200, json={"token": "jwt", "project_id": "p"})
+
+        response = await AsyncApiClient("https://api.test").v3.fetch_auth_token("key")
+
+        assert response == {"token": "jwt", "project_id": "p"}
+        [request] = transport.requests
+        assert request.url == "https://api.test/v3/auth/token"
+        assert json.loads(request.content) == {"api_key": "key"}
+        assert "keep-alive" not in request.headers
+        await AsyncHttpClient.aclose()
+
+    async def test_fetch_auth_token_failure_returns_none(self, transport):
+        transport.handler = lambda request: httpx.Response(401, json={"error": "Invalid API key"})
+
+        assert await AsyncApiClient("https://api.test").v3.fetch_auth_token("bad") is None
+        await AsyncHttpClient.aclose()
+
+    async def test_upload_logfile(self, transport):
+        transport.handler = lambda request: httpx.Response(200, json={"url": "https://store/log", "size": 3})
+        client = AsyncApiClient("https://api.test").v4
+        client.set_auth_token("jwt")
+
+        response = await client.upload_logfile(b"log", trace_id=7)
+
+        assert response.url == "https://store/log"
+        [request] = transport.requests
+        assert request.headers["authorization"] == "Bearer jwt"
+        assert request.headers["trace-id"] == "7"
+        assert request.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(request.content)) == "log"
+
+        transport.handler = lambda request: httpx.Response(500, json={"error": "boom"})
+        with pytest.raises(ApiServerException, match="boom"):
+            await client.upload_object("data")
+        await AsyncHttpClient.aclose()
+
+    async def test_network_errors_are_wrapped(self, transport):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        transport.handler = handler
+        with pytest.raises(Exception, match="POST request failed"):
+            await AsyncApiClient("https://api.test").v3.post("/v3/auth/token", {}, {})
+        await AsyncHttpClient.aclose()
@@ -0,0 +1,96 @@
+"""Tests for JWT caching and refresh."""
+
+import base64
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+from agentops.client.token_manager import TokenManager, jwt_expiry
+
+
+def make_jwt(exp=None, sub="project"):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    claims = {"sub": sub}
+    if exp is not None:
+        claims["exp"] = exp
+    return f"{encode({'alg': 'HS256'})}.{encode(claims)}.signature"
+
+
+def token_fetcher(*tokens):
+    responses = iter({"token": token, "project_id": "project"} for token in tokens)
+    return mock.Mock(side_effect=lambda api_key: next(responses))
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(make_jwt(exp=1700000000)) == 1700000000
+    assert jwt_expiry(make_jwt()) is None
+    assert jwt_expiry("not-a-jwt") is None
+
+
+def test_token_is_fetched_once_while_fresh():
+    fetch = token_fetcher(make_jwt(exp=time.time() + 3600))
+    manager = TokenManager(fetch, "key")
+    try:
+        first = manager.get_token()
+        assert manager.get_token() is first
+        fetch.assert_called_once_with("key")
+    finally:
+        manager.close()
+
+
+def test_file_cache_is_shared_between_managers(tmp_path):
+    token = make_jwt(exp=time.time() + 3600)
+    first = TokenManager(token_fetcher(token), "key", cache_dir=str(tmp_path))
+    other_fetch = token_fetcher(make_jwt(exp=time.time() + 3600, sub="other"))
+    second = TokenManager(other_fetch, "key", cache_dir=str(tmp_path))
+    try:
+        assert first.get_token()["token"] == token
+        assert second.get_token() == {"token": token, "project_id": "project"}
+        other_fetch.assert_not_called()
+        assert "key" not in os.path.basename(first.cache_path)
+        assert os.stat(first.cache_path).st_mode & 0o777 == 0o600
+    finally:
+        first.close()
+        second.close()
+
+
+def test_tokens_without_expiry_are_not_written_to_the_cache(tmp_path):
+    manager = TokenManager(token_fetcher(make_jwt()), "key", cache_dir=str(tmp_path))
+    try:
+        manager.get_token()
+        assert not os.path.exists(manager.cache_path)
+    finally:
+        manager.close()
+
+
+def test_rejected_token_is_replaced_and_listeners_notified(tmp_path):
+    old, new = make_jwt(exp=time.time() + 3600), make_jwt(exp=time.time() + 7200)
+    manager = TokenManager(token_fetcher(old, new), "key", cache_dir=str(tmp_path))
+    refreshed = []
+    manager.add_listener(refreshed.append)
+    try:
+        manager.get_token()
+        # The cache still holds the rejected token, which must not be reused
+        assert manager.refresh(rejected_token=old)["token"] == new
+        assert [response["token"] for response in refreshed] == [new]
+        # A stale rejection of the old token does not refresh again
+        assert manager.refresh(rejected_token=old)["token"] == new
+    finally:
+        manager.close()
+
+
+def test_token_is_refreshed_before_expiry():
+    old, new = make_jwt(exp=time.time() + 0.3), make_jwt(exp=time.time() + 3600)
+    manager = TokenManager(token_fetcher(old, new), "key", refresh_margin=0.2)
+    refreshed = threading.Event()
+    manager.add_listener(lambda response: refreshed.set())
+    try:
+        assert manager.get_token()["token"] == old
+        assert refreshed.wait(2)
+        assert manager.get_token()["token"] == new
+    finally:
+        manager.close()
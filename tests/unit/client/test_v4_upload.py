@@ -0,0 +1,60 @@
+"""Tests for the streamed, compressed uploads of the V4 client."""
+
+import gzip
+import io
+import json
+
+import pytest
+
+from agentops.client.api import ApiClient
+from agentops.client.api.versions.v4 import _gzip_json_string, _json_string
+
+TEXT = 'line "one"\n\tzwei – drei 🎉\n' * 50
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        TEXT,
+        TEXT.encode(),
+        io.StringIO(TEXT),
+        io.BytesIO(TEXT.encode()),
+        [TEXT[:100], TEXT[100:].encode()],
+    ],
+    ids=["str", "bytes", "text-file", "binary-file", "iterable"],
+)
+def test_compressed_stream_is_the_json_string(body):
+    # A chunk size of 7 splits multi-byte characters between chunks
+    chunks = list(_gzip_json_string(body, chunk_size=7))
+    assert len(chunks) > 1 and all(chunks)
+    assert gzip.decompress(b"".join(chunks)).decode() == json.dumps(TEXT)
+
+
+def test_upload_logfile_streams_compressed_body(mock_req, endpoint):
+    mock_req.post(endpoint + "/v4/logs/upload/", json={"url": "https://store/log", "size": 3})
+    client = ApiClient(endpoint).v4
+    client.set_auth_token("jwt")
+
+    response = client.upload_logfile(iter(["first\n", "second\n"]), trace_id=7)
+
+    assert response.url == "https://store/log"
+    request = mock_req.last_request
+    assert request.headers["Content-Encoding"] == "gzip"
+    assert request.headers["Trace-Id"] == "7"
+    assert request.headers["Authorization"] == "Bearer jwt"
+    body = request.body if isinstance(request.body, bytes) else b"".join(request.body)
+    assert json.loads(gzip.decompress(body)) == "first\nsecond\n"
+
+
+def test_upload_is_plain_json_when_compression_is_off(mock_req, endpoint):
+    mock_req.post(endpoint + "/v4/objects/upload/", json={"url": "https://store/obj", "size": 3})
+    client = ApiClient(endpoint).v4
+    client.set_auth_token("jwt")
+    client.compress_uploads = False
+
+    client.upload_object(TEXT)
+
+    request = mock_req.last_request
+    assert "Content-Encoding" not in request.headers
+    body = request.body if isinstance(request.body, bytes) else b"".join(request.body)
+    assert body == b"".join(_json_string(TEXT)) and json.loads(body) == TEXT
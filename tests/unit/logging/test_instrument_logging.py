@@ -44,6 +44,7 @@ def test_upload_logfile_sends_buffer_content_and_clears_buffer(mock_get_client):
     test_message = "Test upload message"
     print(test_message)
     mock_client = MagicMock()
+    mock_client.config.export_file_dir = None
     mock_get_client.return_value = mock_client
     upload_logfile(trace_id=123)
     mock_client.api.v4.upload_logfile.assert_called_once()
@@ -54,4 +55,63 @@ def test_upload_logfile_does_nothing_when_buffer_is_empty():
     """Test that upload_logfile does nothing and does not call the client when the buffer is empty."""
     with patch('agentops.get_client') as mock_get_client:
         upload_logfile(trace_id=123)
-        mock_get_client.assert_not_called() 
\ No newline at end of file
+        mock_get_client.assert_not_called()
+
+
+@patch('agentops.get_client')
+def test_upload_logfile_keeps_output_logged_during_upload(mock_get_client):
+    """Test that the buffer is streamed in chunks and output logged meanwhile is kept for the next upload."""
+    import agentops.logging.instrument_logging as il
+    setup_print_logger()
+    buffer_logger = logging.getLogger('agentops_buffer_logger')
+    buffer_logger.info("before upload")
+    uploaded = []
+
+    def upload(chunks, trace_id):
+        for chunk in chunks:
+            uploaded.append(chunk)
+            buffer_logger.info("during upload")
+
+    mock_get_client.return_value.config.export_file_dir = None
+    mock_get_client.return_value.api.v4.upload_logfile.side_effect = upload
+    with patch.object(il, '_UPLOAD_CHUNK_SIZE', 8):
+        upload_logfile(trace_id=123)
+
+    assert len(uploaded) > 1
+    assert "before upload" in "".join(uploaded) and "during upload" not in "".join(uploaded)
+    remaining = buffer_logger.handlers[0].stream.getvalue()
+    assert "before upload" not in remaining and "during upload" in remaining
+    il._clear_log_buffer()
+
+
+@patch('agentops.get_client')
+def test_upload_logfile_is_deferred_while_authenticating(mock_get_client):
+    """Test that upload_logfile waits a bounded time for authentication and keeps the buffer if it is not done."""
+    import agentops.logging.instrument_logging as il
+    il._log_buffer.write("pending output\n")
+    mock_client = mock_get_client.return_value
+    mock_client.config.export_file_dir = None
+    mock_client.wait_for_auth.return_value = False
+
+    upload_logfile(trace_id=123)
+
+    mock_client.wait_for_auth.assert_called_once_with(timeout=il._AUTH_WAIT_TIMEOUT)
+    mock_client.api.v4.upload_logfile.assert_not_called()
+    assert il._log_buffer.getvalue() == "pending output\n"
+    il._clear_log_buffer()
+
+
+@patch('agentops.get_client')
+def test_upload_logfile_writes_next_to_span_files(mock_get_client, tmp_path):
+    """Test that with export_file_dir set the log is written to that directory and the API is not contacted."""
+    import agentops.logging.instrument_logging as il
+    il._log_buffer.write("offline output\n")
+    mock_client = mock_get_client.return_value
+    mock_client.config.export_file_dir = str(tmp_path)
+
+    upload_logfile(trace_id=123)
+
+    mock_client.wait_for_auth.assert_not_called()
+    mock_client.api.v4.upload_logfile.assert_not_called()
+    assert (tmp_path / f"agentops-{123:032x}.log").read_text() == "offline output\n"
+    assert il._log_buffer.getvalue() == ""
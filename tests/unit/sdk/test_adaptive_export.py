@@ -0,0 +1,131 @@
+"""
+Unit tests for the adaptive export scheduler and AdaptiveBatchSpanProcessor.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.sdk.processors import AdaptiveBatchSpanProcessor
+from agentops.sdk.scheduling import AdaptiveExportScheduler
+
+
+class TestAdaptiveExportScheduler:
+    def test_batch_size_grows_under_load_and_shrinks_when_idle(self):
+        scheduler = AdaptiveExportScheduler(min_batch_size=8, max_batch_size=64)
+
+        for _ in range(5):
+            scheduler.record_export(scheduler.batch_size, 0.01, True)
+        assert scheduler.batch_size == 64
+
+        for _ in range(5):
+            scheduler.record_export(1, 0.01, True)
+        assert scheduler.batch_size == 8
+
+    def test_delay_is_short_for_small_queue(self):
+        scheduler = AdaptiveExportScheduler(
+            min_batch_size=64, min_delay_millis=50, max_delay_millis=1000
+        )
+
+        assert scheduler.next_delay(1) == pytest.approx(0.05)
+        assert scheduler.next_delay(0) == pytest.approx(1.0)
+        assert scheduler.next_delay(64) == 0
+
+    def test_failures_back_off_exponentially(self):
+        scheduler = AdaptiveExportScheduler(min_delay_millis=100, max_backoff_millis=500)
+
+        delays = []
+        for _ in range(4):
+            scheduler.record_export(10, 0.01, False)
+            delays.append(scheduler.next_delay(scheduler.batch_size))
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5])
+
+        scheduler.record_export(10, 0.01, True)
+        assert not scheduler.backing_off
+        assert scheduler.snapshot()["consecutive_failures"] == 0
+
+    def test_slow_exports_back_off(self):
+        scheduler = AdaptiveExportScheduler(latency_target_millis=100)
+
+        scheduler.record_export(10, 0.5, True)
+
+        assert scheduler.backing_off
+        assert scheduler.snapshot()["backoff_millis"] == pytest.approx(500)
+
+
+@pytest.fixture
+def tracer_and_processor():
+    exporter = MagicMock()
+    exporter.export.return_value = SpanExportResult.SUCCESS
+    scheduler = AdaptiveExportScheduler(min_batch_size=4, max_batch_size=64, max_delay_millis=3600_000)
+    processor = AdaptiveBatchSpanProcessor(exporter, scheduler, max_queue_size=256)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    yield provider.get_tracer("test"), processor, exporter
+    processor.shutdown()
+
+
+def _exported_count(exporter):
+    return sum(len(call.args[0]) for call in exporter.export.call_args_list)
+
+
+class TestAdaptiveBatchSpanProcessor:
+    def test_force_flush_exports_everything(self, tracer_and_processor):
+        tracer, processor, exporter = tracer_and_processor
+
+        for i in range(100):
+            tracer.start_span(f"span-{i}").end()
+        assert processor.force_flush()
+
+        assert _exported_count(exporter) == 100
+        # Full batches made the scheduler grow past its minimum
+        assert processor.scheduler.batch_size > 4
+
+    def test_small_queue_is_exported_without_flush(self, tracer_and_processor):
+        tracer, processor, exporter = tracer_and_processor
+        exported = threading.Event()
+        exporter.export.side_effect = lambda spans: exported.set() or SpanExportResult.SUCCESS
+
+        tracer.start_span("single").end()
+
+        # Far below the hour-long max delay: one queued span uses the short delay
+        assert exported.wait(5)
+
+    def test_queue_overflow_is_dropped_and_counted(self):
+        release = threading.Event()
+        exporter = MagicMock()
+        exporter.export.side_effect = lambda spans: release.wait(5) and SpanExportResult.SUCCESS
+        processor = AdaptiveBatchSpanProcessor(
+            exporter, AdaptiveExportScheduler(min_batch_size=1, max_batch_size=1), max_queue_size=2
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        for i in range(10):
+            tracer.start_span(f"span-{i}").end()
+        release.set()
+        processor.shutdown()
+
+        assert processor.dropped_spans > 0
+        assert _exported_count(exporter) + processor.dropped_spans == 10
+
+    def test_failed_batches_are_spilled(self):
+        exporter = MagicMock()
+        exporter.export.return_value = SpanExportResult.FAILURE
+        spiller = MagicMock()
+        processor = AdaptiveBatchSpanProcessor(exporter, spiller=spiller)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+
+        provider.get_tracer("test").start_span("lost").end()
+        assert processor.force_flush()
+        processor.shutdown()
+
+        spilled = [span.name for call in spiller.spill.call_args_list for span in call.args[0]]
+        assert spilled == ["lost"]
+        assert processor.scheduler.backing_off
+        spiller.close.assert_called_once()
@@ -0,0 +1,155 @@
+"""
+Unit tests for aggregated recording of entity calls.
+"""
+
+import asyncio
+
+import pytest
+from opentelemetry.trace import StatusCode
+
+from agentops.sdk.aggregation import (
+    EXEMPLAR_EVENT,
+    AggregatingSpanProcessor,
+    CallAggregator,
+    entity_call_aggregator,
+)
+from agentops.sdk.decorators import agent, task, tool
+from agentops.semconv import SpanAttributes, SpanKind
+from tests.unit.sdk.instrumentation_tester import InstrumentationTester
+
+
+@pytest.fixture
+def aggregating(instrumentation: InstrumentationTester):
+    processor = AggregatingSpanProcessor(instrumentation.tracer_provider)
+    instrumentation.tracer_provider.add_span_processor(processor)
+    yield instrumentation
+    entity_call_aggregator.pop_all()
+    entity_call_aggregator.on_evict = None
+
+
+def _spans_by_name(instrumentation):
+    spans = {}
+    for span in instrumentation.get_finished_spans():
+        spans.setdefault(span.name, []).append(span)
+    return spans
+
+
+class TestAggregatedTools:
+    def test_calls_are_summarized_under_parent(self, aggregating):
+        @tool(aggregate=True)
+        def lookup(key):
+            if key == 3:
+                raise KeyError(key)
+            return key * 2
+
+        @task
+        def step():
+            for key in range(10):
+                try:
+                    lookup(key)
+                except KeyError:
+                    pass
+
+        step()
+
+        spans = _spans_by_name(aggregating)
+        [summary] = spans["lookup.tool"]
+        [parent] = spans["step.task"]
+        assert summary.parent.span_id == parent.context.span_id
+        attributes = summary.attributes
+        assert attributes[SpanAttributes.AGENTOPS_SPAN_KIND] == SpanKind.TOOL
+        assert attributes[SpanAttributes.AGENTOPS_AGGREGATE_CALL_COUNT] == 10
+        assert attributes[SpanAttributes.AGENTOPS_AGGREGATE_ERROR_COUNT] == 1
+        assert sum(attributes[SpanAttributes.AGENTOPS_AGGREGATE_LATENCY_COUNTS]) == 10
+        assert summary.status.status_code == StatusCode.ERROR
+        assert [event.name for event in summary.events] == [EXEMPLAR_EVENT] * 3
+        assert summary.start_time <= summary.end_time <= parent.end_time
+
+    def test_separate_parents_get_separate_summaries(self, aggregating):
+        @tool(aggregate=True)
+        async def fetch(value):
+            return value
+
+        @agent
+        class Researcher:
+            @task
+            async def research(self, count):
+                return [await fetch(i) for i in range(count)]
+
+        async def run():
+            researcher = Researcher()
+            await researcher.research(2)
+            await researcher.research(3)
+
+        asyncio.run(run())
+
+        counts = sorted(
+            span.attributes[SpanAttributes.AGENTOPS_AGGREGATE_CALL_COUNT]
+            for span in _spans_by_name(aggregating)["fetch.tool"]
+        )
+        assert counts == [2, 3]
+
+    def test_call_without_parent_is_traced(self, aggregating):
+        @tool(aggregate=True)
+        def lookup(key):
+            return key
+
+        assert lookup(1) == 1
+
+        [span] = aggregating.get_finished_spans()
+        assert span.name == "lookup.tool"
+        assert SpanAttributes.AGENTOPS_AGGREGATE_CALL_COUNT not in span.attributes
+        assert SpanAttributes.AGENTOPS_ENTITY_OUTPUT in span.attributes
+
+
+class TestCallAggregator:
+    def test_exemplars_are_bounded_and_evicted_parents_emitted(self):
+        from opentelemetry.trace import SpanContext
+
+        emitted = []
+        aggregator = CallAggregator(max_exemplars=2, max_parents=1)
+        aggregator.on_evict = lambda parent, calls: emitted.append((parent, calls))
+        first = SpanContext(trace_id=1, span_id=1, is_remote=False)
+        second = SpanContext(trace_id=1, span_id=2, is_remote=False)
+
+        for i in range(100):
+            aggregator.record(first, "fn.tool", {}, i, i + 1_000_000, (i,), {}, result=i)
+        aggregator.record(second, "fn.tool", {}, 0, 1, (), {})
+
+        [(parent, calls)] = emitted
+        assert parent == first
+        stats = calls["fn.tool"]
+        assert stats.count == 100
+        assert len(stats.exemplars) == 2
+        assert stats.buckets[1] == 100  # 1ms falls in the (0, 5] bucket
+        assert len(aggregator) == 1
+
+    def test_exemplars_are_serialized_outside_the_lock(self):
+        import threading
+        from unittest.mock import patch
+
+        from opentelemetry.trace import SpanContext
+
+        aggregator = CallAggregator(max_exemplars=2)
+        parent = SpanContext(trace_id=1, span_id=1, is_remote=False)
+        serializing, release = threading.Event(), threading.Event()
+
+        def slow_serialize(value, max_bytes):
+            if value == {"args": ("slow",), "kwargs": {}}:
+                serializing.set()
+                release.wait(5)
+            return repr(value)
+
+        with patch("agentops.sdk.aggregation.safe_serialize_capped", slow_serialize):
+            slow = threading.Thread(target=aggregator.record, args=(parent, "fn.tool", {}, 0, 1, ("slow",), {}))
+            slow.start()
+            assert serializing.wait(5)
+            # Not blocked by the serialization in progress
+            aggregator.record(parent, "fn.tool", {}, 0, 1, ("fast",), {})
+            release.set()
+            slow.join(5)
+
+        stats = aggregator.pop(parent)["fn.tool"]
+        assert stats.count == 2
+        inputs = sorted(exemplar[SpanAttributes.AGENTOPS_ENTITY_INPUT] for _, exemplar in stats.exemplars)
+        assert inputs == [repr({"args": ("fast",), "kwargs": {}}), repr({"args": ("slow",), "kwargs": {}})]
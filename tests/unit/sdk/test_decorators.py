@@ -1,11 +1,12 @@
 from typing import TYPE_CHECKING, cast, AsyncGenerator, Generator
 import asyncio
+from unittest.mock import patch
 
 import pytest
 from opentelemetry import trace
 from opentelemetry.sdk.trace import ReadableSpan
 
-from agentops.sdk.decorators import agent, operation, session, workflow, task
+from agentops.sdk.decorators import agent, operation, session, workflow, task, tool
 from agentops.semconv import SpanKind
 from agentops.semconv.span_attributes import SpanAttributes
 from agentops.semconv import SpanAttributes
@@ -568,4 +569,317 @@ class TestSpanNesting:
         # Verify transform_task is a child of the workflow span
         assert transform_task.parent is not None
         assert workflow_span.context is not None
-        assert transform_task.parent.span_id == workflow_span.context.span_id
\ No newline at end of file
+        assert transform_task.parent.span_id == workflow_span.context.span_id
+
+class TestDecoratorFastPath:
+    """Tests for the work done once at decoration time."""
+
+    def test_callable_classified_once(self, instrumentation: InstrumentationTester):
+        """Calls must not inspect the wrapped callable again."""
+
+        @task(name="lookup", version=2)
+        def lookup(key):
+            return key.upper()
+
+        with patch("agentops.sdk.decorators.factory.inspect") as mock_inspect:
+            assert [lookup("a"), lookup("b")] == ["A", "B"]
+        mock_inspect.assert_not_called()
+        assert not mock_inspect.method_calls
+
+        spans = instrumentation.get_finished_spans()
+        assert [span.name for span in spans] == ["lookup.task", "lookup.task"]
+        for span in spans:
+            assert span.attributes[SpanAttributes.OPERATION_NAME] == "lookup"
+            assert span.attributes[SpanAttributes.OPERATION_VERSION] == 2
+            assert span.attributes[SpanAttributes.AGENTOPS_SPAN_KIND] == SpanKind.TASK
+
+    def test_methods_still_bind(self, instrumentation: InstrumentationTester):
+        """The specialized wrappers keep method binding intact."""
+
+        class Counter:
+            def __init__(self):
+                self.count = 0
+
+            @operation
+            def increment(self):
+                self.count += 1
+                return self.count
+
+            @operation
+            async def increment_async(self):
+                return self.increment()
+
+        counter = Counter()
+        assert counter.increment() == 1
+        assert asyncio.run(counter.increment_async()) == 2
+        assert len(instrumentation.get_finished_spans()) == 3
+
+    def test_records_with_configured_json_backend(self, instrumentation: InstrumentationTester):
+        """Recorded inputs and outputs are encoded by the selected JSON backend."""
+        from agentops.helpers.serialization import set_json_backend
+
+        pytest.importorskip("orjson")
+
+        @task
+        def answer(question):
+            return {"answer": 42}
+
+        set_json_backend("orjson")
+        try:
+            answer(["why"])
+        finally:
+            set_json_backend("json")
+
+        [span] = instrumentation.get_finished_spans()
+        # orjson writes compact JSON, unlike the json module's default separators
+        assert span.attributes[SpanAttributes.AGENTOPS_ENTITY_OUTPUT] == '{"answer":42}'
+        assert span.attributes[SpanAttributes.AGENTOPS_ENTITY_INPUT] == '{"args":[["why"]],"kwargs":{}}'
+
+    def test_debug_introspection_skipped_when_not_debugging(self, instrumentation: InstrumentationTester):
+        """Context introspection only runs when DEBUG logging is enabled."""
+        import logging
+
+        from agentops.logging import logger
+
+        @task
+        def work():
+            return 1
+
+        previous = logger.level
+        try:
+            with patch("agentops.sdk.decorators.utility._get_current_span_info") as span_info:
+                logger.setLevel(logging.INFO)
+                work()
+                span_info.assert_not_called()
+
+                span_info.return_value = {}
+                logger.setLevel(logging.DEBUG)
+                work()
+                assert span_info.call_count == 2
+        finally:
+            logger.setLevel(previous)
+
+
+class TestClassDecoratorLifecycle:
+    """Tests for the span owned by instances of decorated classes."""
+
+    def _agent_spans(self, instrumentation: InstrumentationTester):
+        return [
+            s for s in instrumentation.get_finished_spans()
+            if s.attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) == SpanKind.AGENT
+        ]
+
+    def test_close_ends_span(self, instrumentation: InstrumentationTester):
+        @agent
+        class Worker:
+            @operation
+            def run(self):
+                return "done"
+
+        worker = Worker()
+        worker.run()
+        assert not self._agent_spans(instrumentation)
+
+        worker.close()
+        worker.close()  # Idempotent
+        [agent_span] = self._agent_spans(instrumentation)
+        [run_span] = [s for s in instrumentation.get_finished_spans() if s.name == "run.task"]
+        assert run_span.parent.span_id == agent_span.context.span_id
+        assert SpanAttributes.AGENTOPS_ENTITY_OUTPUT in agent_span.attributes
+
+        # Spans started after close no longer nest under the instance
+        worker.run()
+        last = [s for s in instrumentation.get_finished_spans() if s.name == "run.task"][-1]
+        assert last.parent is None or last.parent.span_id != agent_span.context.span_id
+
+    def test_with_block_nests_and_records_exception(self, instrumentation: InstrumentationTester):
+        @agent
+        class Worker:
+            pass
+
+        @task
+        def step():
+            return 1
+
+        with pytest.raises(ValueError):
+            with Worker() as worker:
+                assert isinstance(worker, Worker)
+                step()
+                raise ValueError("boom")
+
+        [agent_span] = self._agent_spans(instrumentation)
+        [step_span] = [s for s in instrumentation.get_finished_spans() if s.name == "step.task"]
+        assert step_span.parent.span_id == agent_span.context.span_id
+        assert [event.name for event in agent_span.events] == ["exception"]
+        assert trace.get_current_span() is trace.INVALID_SPAN
+
+    def test_original_close_and_context_manager_are_kept(self, instrumentation: InstrumentationTester):
+        calls = []
+
+        @agent
+        class Resource:
+            def __enter__(self):
+                calls.append("enter")
+                return "resource"
+
+            def __exit__(self, *exc):
+                calls.append("exit")
+
+            def close(self):
+                calls.append("close")
+
+        with Resource() as resource:
+            assert resource == "resource"
+        Resource().close()
+
+        assert calls == ["enter", "exit", "close"]
+        assert len(self._agent_spans(instrumentation)) == 2
+
+    def test_span_ends_when_cycle_is_collected(self, instrumentation: InstrumentationTester):
+        import gc
+
+        @agent
+        class Node:
+            def __init__(self):
+                self.me = self
+
+        Node()
+        gc.collect()
+
+        assert len(self._agent_spans(instrumentation)) == 1
+
+
+class TestGeneratorContext:
+    """Tests for the context handling of decorated generators."""
+
+    def test_span_current_only_inside_body(self, instrumentation: InstrumentationTester):
+        @task
+        def inner():
+            return 1
+
+        @operation
+        def stream():
+            inner()
+            received = yield trace.get_current_span()
+            yield received
+
+        gen = stream()
+        body_span = next(gen)
+        # The consumer's context is untouched between steps
+        assert trace.get_current_span() is trace.INVALID_SPAN
+        assert gen.send("value") == "value"
+        with pytest.raises(StopIteration):
+            next(gen)
+
+        spans = {span.name: span for span in instrumentation.get_finished_spans()}
+        assert spans["stream.task"].context.span_id == body_span.get_span_context().span_id
+        assert spans["inner.task"].parent.span_id == body_span.get_span_context().span_id
+
+    def test_close_and_errors_end_span(self, instrumentation: InstrumentationTester):
+        closed = []
+
+        @operation
+        def stream():
+            try:
+                yield 1
+                yield 2
+            finally:
+                closed.append(trace.get_current_span())
+
+        @operation
+        def failing():
+            yield 1
+            raise RuntimeError("broken")
+
+        gen = stream()
+        next(gen)
+        gen.close()
+        assert closed[0] is not trace.INVALID_SPAN
+
+        with pytest.raises(RuntimeError):
+            list(failing())
+
+        spans = {span.name: span for span in instrumentation.get_finished_spans()}
+        assert set(spans) == {"stream.task", "failing.task"}
+        assert not spans["stream.task"].events
+        assert [event.name for event in spans["failing.task"].events] == ["exception"]
+        assert trace.get_current_span() is trace.INVALID_SPAN
+
+    def test_thrown_exception_reaches_generator(self, instrumentation: InstrumentationTester):
+        @operation
+        def stream():
+            try:
+                yield 1
+            except KeyError:
+                yield "handled"
+
+        gen = stream()
+        next(gen)
+        assert gen.throw(KeyError("k")) == "handled"
+        gen.close()
+        assert len(instrumentation.get_finished_spans()) == 1
+
+    def test_span_starts_on_first_iteration(self, instrumentation: InstrumentationTester):
+        import gc
+
+        @operation
+        def stream():
+            yield 1
+
+        @task
+        def producer():
+            return stream()
+
+        # Never iterated: no span is opened, so none is left unended
+        unstarted = stream()
+        unstarted.close()
+        del unstarted
+        abandoned = stream()
+        del abandoned
+        gc.collect()
+        assert instrumentation.get_finished_spans() == []
+
+        # Created inside another span, the generator's span is parented to it
+        gen = producer()
+        assert list(gen) == [1]
+        spans = {span.name: span for span in instrumentation.get_finished_spans()}
+        assert set(spans) == {"producer.task", "stream.task"}
+        assert spans["stream.task"].parent.span_id == spans["producer.task"].context.span_id
+
+    def test_async_generator_context(self, instrumentation: InstrumentationTester):
+        @operation
+        async def stream():
+            yield trace.get_current_span()
+            yield 2
+
+        async def consume():
+            gen = stream()
+            body_span = await gen.__anext__()
+            assert trace.get_current_span() is trace.INVALID_SPAN
+            await gen.aclose()
+            return body_span
+
+        body_span = asyncio.run(consume())
+
+        [span] = instrumentation.get_finished_spans()
+        assert span.context.span_id == body_span.get_span_context().span_id
+
+
+class TestDisabledDecorators:
+    def test_disabled_decorators_return_target(self):
+        from agentops.sdk.decorators import factory
+
+        def plain():
+            return 1
+
+        class Plain:
+            pass
+
+        factory.set_decorators_disabled(True)
+        try:
+            assert task(plain) is plain
+            assert agent(name="named")(Plain) is Plain
+            assert tool(aggregate=True)(plain) is plain
+        finally:
+            factory.set_decorators_disabled(False)
+        assert task(plain) is not plain
@@ -0,0 +1,93 @@
+"""
+Unit tests for lazy (deferred) serialization of decorator inputs and outputs.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+
+from agentops.sdk.decorators.utility import _record_entity_input, _record_entity_output
+from agentops.sdk.deferred import DeferredAttributeStore, DeferredSerializingExporter, deferred_attributes
+from agentops.semconv.span_attributes import SpanAttributes
+
+
+@pytest.fixture
+def lazy_tracer():
+    exporter = MagicMock()
+    exporter.export.return_value = SpanExportResult.SUCCESS
+    lazy_exporter = DeferredSerializingExporter(exporter)
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(lazy_exporter))
+    yield provider.get_tracer("test"), exporter
+    lazy_exporter.shutdown()
+
+
+def test_serialization_happens_at_export(lazy_tracer):
+    tracer, exporter = lazy_tracer
+    span = tracer.start_span("tool")
+
+    with patch("agentops.sdk.decorators.utility.safe_serialize_capped", wraps=lambda value, max_bytes: json.dumps(value)) as serialize:
+        _record_entity_input(span, ("doc",), {"limit": 3})
+        _record_entity_output(span, {"answer": 42})
+        assert serialize.call_count == 0
+        assert SpanAttributes.AGENTOPS_ENTITY_INPUT not in span.attributes
+
+        span.end()
+        assert serialize.call_count == 2
+
+    (exported,) = exporter.export.call_args.args[0]
+    assert json.loads(exported.attributes[SpanAttributes.AGENTOPS_ENTITY_INPUT]) == {
+        "args": ["doc"],
+        "kwargs": {"limit": 3},
+    }
+    assert json.loads(exported.attributes[SpanAttributes.AGENTOPS_ENTITY_OUTPUT]) == {"answer": 42}
+    assert len(deferred_attributes) == 0
+
+
+def test_disabled_after_shutdown():
+    exporter = DeferredSerializingExporter(MagicMock())
+    assert deferred_attributes.enabled
+    exporter.shutdown()
+    assert not deferred_attributes.enabled
+
+
+def test_store_serializes_oldest_values_over_its_memory_bound():
+    store = DeferredAttributeStore(max_bytes=5000)
+    tracer = TracerProvider().get_tracer("test")
+    spans = [tracer.start_span(f"span-{i}") for i in range(5)]
+
+    for span in spans:
+        store.defer(span, "key", ["x" * 1000], lambda value: f"{len(value[0])} chars")
+        span.end()
+
+    assert store.size <= 5000
+    assert len(store) == 5
+    # The oldest value was serialized in place instead of being dropped
+    [first] = store.resolve([spans[0]])
+    assert first.attributes["key"] == "1000 chars"
+    assert store.evicted_spans == 0
+
+
+def test_discarded_spans_release_their_values():
+    store = DeferredAttributeStore()
+    span = TracerProvider().get_tracer("test").start_span("dropped")
+    store.defer(span, "key", "value", str)
+    span.end()
+
+    store.discard([span])
+
+    assert len(store) == 0 and store.size == 0
+
+
+def test_long_lived_span_input_is_serialized_immediately(lazy_tracer):
+    tracer, _ = lazy_tracer
+    session = tracer.start_span("run.session", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: "session"})
+
+    _record_entity_input(session, ("doc",), {})
+
+    assert json.loads(session.attributes[SpanAttributes.AGENTOPS_ENTITY_INPUT])["args"] == ["doc"]
+    assert len(deferred_attributes) == 0
+    session.end()
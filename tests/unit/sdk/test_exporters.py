@@ -0,0 +1,176 @@
+"""
+Unit tests for the AuthenticatedOTLPExporter.
+"""
+
+import gzip
+import zlib
+from unittest.mock import patch
+
+import pytest
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
+
+ENDPOINT = "https://otlp.agentops.ai/v1/traces"
+
+
+@pytest.fixture
+def spans():
+    memory_exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    with provider.get_tracer("test").start_as_current_span("prompt") as span:
+        span.set_attribute("gen_ai.prompt", "Tell me a story. " * 200)
+    return memory_exporter.get_finished_spans()
+
+
+def test_gzip_is_the_default(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=200)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token")
+
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+
+    request = mock_req.last_request
+    assert request.headers["Content-Encoding"] == "gzip"
+    assert request.headers["Authorization"] == "Bearer token"
+    expected = encode_spans(spans).SerializePartialToString()
+    assert gzip.decompress(request.body) == expected
+    assert len(request.body) < len(expected)
+
+
+def test_otlp_environment_variables_are_honoured(mock_req, spans, monkeypatch, tmp_path):
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_HEADERS", "x-proxy=generic,x-team=agents")
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_TRACES_HEADERS", "x-proxy=traces")
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_CERTIFICATE", str(tmp_path / "ca.pem"))
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_TRACES_TIMEOUT", "3")
+    mock_req.post(ENDPOINT, status_code=200)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token")
+
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+
+    request = mock_req.last_request
+    # The traces variant takes precedence over the generic variable, as in the stock exporter
+    assert request.headers["x-proxy"] == "traces"
+    assert "x-team" not in request.headers
+    assert request.headers["Authorization"] == "Bearer token"
+    assert request.verify == str(tmp_path / "ca.pem")
+    assert request.timeout == 3
+
+
+def test_deflate_with_level(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=200)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token", compression="deflate", compression_level=9)
+
+    # The compressor template is reused across batches
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+
+    assert mock_req.last_request.headers["Content-Encoding"] == "deflate"
+    assert zlib.decompress(mock_req.last_request.body) == encode_spans(spans).SerializePartialToString()
+
+
+def test_no_compression(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=200)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token", compression="none")
+
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert "Content-Encoding" not in mock_req.last_request.headers
+    assert mock_req.last_request.body == encode_spans(spans).SerializePartialToString()
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard():
+    with patch("agentops.sdk.exporters.zstandard", None):
+        exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token", compression="zstd")
+    assert exporter.compression == "gzip"
+
+
+def test_retries_transient_errors(mock_req, spans):
+    mock_req.post(ENDPOINT, [{"status_code": 503}, {"status_code": 200}])
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token")
+
+    with patch("agentops.sdk.exporters.time.sleep"):
+        assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert mock_req.call_count == 2
+
+
+def test_rejected_token_fails_without_retry(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=401)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="expired")
+
+    assert exporter.export(spans) is SpanExportResult.FAILURE
+    assert mock_req.call_count == 1
+    # Fixed by a refreshed token, so the batch is still worth keeping
+    assert not exporter.last_export_rejected()
+
+
+def test_refused_batch_is_reported_as_rejected(mock_req, spans):
+    mock_req.post(ENDPOINT, [{"status_code": 413}, {"status_code": 503}])
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="token")
+
+    assert exporter.export(spans) is SpanExportResult.FAILURE
+    assert exporter.last_export_rejected()
+    with patch("agentops.sdk.exporters.time.sleep"):
+        assert exporter.export(spans) is SpanExportResult.FAILURE
+    assert not exporter.last_export_rejected()
+
+
+def test_rejected_token_is_reported_and_refreshed_token_used(mock_req, spans):
+    mock_req.post(ENDPOINT, [{"status_code": 401}, {"status_code": 200}])
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt="expired")
+    rejected = []
+
+    with patch.object(AuthenticatedOTLPExporter, "on_jwt_rejected", rejected.append):
+        assert exporter.export(spans) is SpanExportResult.FAILURE
+    assert rejected == ["expired"]
+
+    AuthenticatedOTLPExporter.authenticate_all("fresh")
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert mock_req.last_request.headers["Authorization"] == "Bearer fresh"
+
+
+def test_batches_are_buffered_until_jwt_is_set(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=200)
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt=None, await_jwt=True)
+
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert mock_req.call_count == 0
+
+    exporter.set_jwt("token", {"agentops.project.id": "project"})
+
+    assert mock_req.call_count == 2
+    request = mock_req.last_request
+    assert request.headers["Authorization"] == "Bearer token"
+    payload = ExportTraceServiceRequest.FromString(gzip.decompress(request.body))
+    attributes = {kv.key: kv.value.string_value for kv in payload.resource_spans[0].resource.attributes}
+    assert attributes["agentops.project.id"] == "project"
+
+    # Later batches are sent right away
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert mock_req.call_count == 3
+
+
+def test_pending_buffer_is_bounded(mock_req, spans):
+    mock_req.post(ENDPOINT, status_code=200)
+    size = len(encode_spans(spans).SerializePartialToString())
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt=None, await_jwt=True, max_pending_bytes=size * 2)
+
+    for _ in range(5):
+        exporter.export(spans)
+    exporter.set_jwt("token")
+
+    assert mock_req.call_count == 2
+
+
+def test_discarded_exporter_drops_batches(mock_req, spans):
+    exporter = AuthenticatedOTLPExporter(ENDPOINT, jwt=None, await_jwt=True)
+    exporter.export(spans)
+
+    AuthenticatedOTLPExporter.discard_awaiting()
+
+    assert exporter.export(spans) is SpanExportResult.FAILURE
+    assert mock_req.call_count == 0
@@ -0,0 +1,115 @@
+"""
+Unit tests for the FileSpanExporter and span file replay.
+"""
+
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.sdk.exporters import FileSpanExporter, read_span_file
+from agentops.sdk.replay import replay_directory
+
+
+@pytest.fixture
+def spans():
+    memory_exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    for i in range(3):
+        provider.get_tracer("test").start_span(f"span-{i}").end()
+    return memory_exporter.get_finished_spans()
+
+
+def test_batches_round_trip_through_files(tmp_path, spans):
+    exporter = FileSpanExporter(str(tmp_path))
+    assert exporter.export(spans) is SpanExportResult.SUCCESS
+    assert exporter.export(spans[:1]) is SpanExportResult.SUCCESS
+
+    # Still being written
+    assert [name.endswith(".otlp.part") for name in os.listdir(tmp_path)] == [True]
+    exporter.shutdown()
+
+    (name,) = os.listdir(tmp_path)
+    assert name.endswith(".otlp")
+    assert list(read_span_file(os.path.join(tmp_path, name))) == [
+        encode_spans(spans).SerializePartialToString(),
+        encode_spans(spans[:1]).SerializePartialToString(),
+    ]
+    assert exporter.export(spans) is SpanExportResult.FAILURE
+
+
+def test_files_rotate_at_size_limit(tmp_path, spans):
+    exporter = FileSpanExporter(str(tmp_path), max_file_bytes=64)
+    for _ in range(3):
+        exporter.export(spans)
+    exporter.shutdown()
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 3
+    assert all(name.endswith(".otlp") for name in names)
+
+
+def test_truncated_record_is_ignored(tmp_path, spans):
+    exporter = FileSpanExporter(str(tmp_path))
+    exporter.export(spans)
+    exporter.export(spans)
+    exporter.shutdown()
+    (path,) = [os.path.join(tmp_path, name) for name in os.listdir(tmp_path)]
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    assert len(list(read_span_file(path))) == 1
+
+
+def test_replay_uploads_and_removes_files(tmp_path, spans):
+    exporter = FileSpanExporter(str(tmp_path), max_file_bytes=64)
+    for _ in range(3):
+        exporter.export(spans)
+    exporter.shutdown()
+    uploader = MagicMock()
+    uploader.export_serialized.return_value = SpanExportResult.SUCCESS
+
+    assert replay_directory(str(tmp_path), uploader) == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay_resumes_after_failure(tmp_path, spans):
+    exporter = FileSpanExporter(str(tmp_path))
+    for i in range(3):
+        exporter.export(spans[i : i + 1])
+    exporter.shutdown()
+    uploader = MagicMock()
+    uploader.export_serialized.side_effect = [SpanExportResult.SUCCESS, SpanExportResult.FAILURE]
+
+    assert replay_directory(str(tmp_path), uploader) == 1
+
+    # Only the batches that were not delivered are left
+    (name,) = os.listdir(tmp_path)
+    assert list(read_span_file(os.path.join(tmp_path, name))) == [
+        encode_spans(spans[1:2]).SerializePartialToString(),
+        encode_spans(spans[2:3]).SerializePartialToString(),
+    ]
+
+
+def test_replay_skips_partial_files_of_running_processes(tmp_path, spans, monkeypatch):
+    exporter = FileSpanExporter(str(tmp_path))
+    exporter.export(spans)
+    uploader = MagicMock()
+    uploader.export_serialized.return_value = SpanExportResult.SUCCESS
+
+    # Still being appended to by this process
+    assert replay_directory(str(tmp_path), uploader, include_partial=True) == 0
+    assert [name.endswith(".otlp.part") for name in os.listdir(tmp_path)] == [True]
+
+    # Left behind by a process that has exited
+    (name,) = os.listdir(tmp_path)
+    os.rename(os.path.join(tmp_path, name), os.path.join(tmp_path, name.replace(f"-{os.getpid()}-", "-1-")))
+    monkeypatch.setattr("agentops.sdk.replay.psutil.pid_exists", lambda pid: False)
+    assert replay_directory(str(tmp_path), uploader, include_partial=True) == 1
+    assert os.listdir(tmp_path) == []
+    exporter.shutdown()
@@ -0,0 +1,66 @@
+"""
+Unit tests for blocking and background flushing in TracingCore.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+from agentops.sdk.core import TracingCore
+
+
+def _make_core(provider, async_flush=False):
+    core = TracingCore()
+    core._provider = provider
+    core._config = {"max_wait_time": 0, "async_flush": async_flush}
+    core._initialized = True
+    return core
+
+
+def test_blocking_flush_runs_on_caller_thread():
+    provider = MagicMock()
+    provider.force_flush.side_effect = lambda: threading.current_thread().name
+    core = _make_core(provider)
+
+    future = core.flush(blocking=True)
+
+    assert future.done()
+    assert future.result() == threading.current_thread().name
+
+
+def test_async_flush_returns_before_flush_completes():
+    release = threading.Event()
+    provider = MagicMock()
+    provider.force_flush.side_effect = lambda: release.wait(5)
+    core = _make_core(provider, async_flush=True)
+
+    future = core.flush()
+    assert not future.done()
+
+    release.set()
+    assert future.result(timeout=5) is True
+    provider.force_flush.assert_called_once()
+
+
+def test_async_flush_requests_are_coalesced():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_flush():
+        started.set()
+        return release.wait(5)
+
+    provider = MagicMock()
+    provider.force_flush.side_effect = slow_flush
+    core = _make_core(provider)
+
+    first = core.flush(blocking=False)
+    started.wait(5)
+    # While the first flush runs, further requests share a single pending flush
+    second = core.flush(blocking=False)
+    third = core.flush(blocking=False)
+    assert second is third
+    assert second is not first
+
+    release.set()
+    assert first.result(timeout=5) and second.result(timeout=5)
+    assert provider.force_flush.call_count == 2
@@ -0,0 +1,101 @@
+"""
+Unit tests for reinitializing export components in forked processes.
+"""
+
+import os
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.client.http.http_client import HttpClient
+from agentops.logging.instrument_logging import _log_buffer
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.sdk.processors import AdaptiveBatchSpanProcessor
+from agentops.sdk.spill import SpillJournal
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def run_in_child(check):
+    """Run ``check`` in a forked child and return its exit status (0 when it returned True)."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            code = 0 if check() else 1
+        except BaseException:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def test_adaptive_processor_exports_in_child():
+    exporter = InMemorySpanExporter()
+    processor = AdaptiveBatchSpanProcessor(exporter)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+
+    def check():
+        tracer.start_span("child").end()
+        return processor.force_flush(5000) and [s.name for s in exporter.get_finished_spans()] == ["child"]
+
+    try:
+        assert run_in_child(check) == 0
+    finally:
+        provider.shutdown()
+
+
+def test_connections_and_buffers_are_not_shared_with_child(tmp_path):
+    exporter = AuthenticatedOTLPExporter("https://otlp.test/v1/traces", jwt="token")
+    parent_exporter_session = exporter._http
+    parent_http_session = HttpClient.get_session()
+    journal = SpillJournal(str(tmp_path / "spill"), max_bytes=1024 * 1024, segment_size=64 * 1024)
+    journal.append(b"parent batch")
+    _log_buffer.write("parent output\n")
+
+    def check():
+        return (
+            exporter._http is not parent_exporter_session
+            and exporter._request_headers["Authorization"] == "Bearer token"
+            and HttpClient.get_session() is not parent_http_session
+            and _log_buffer.getvalue() == ""
+            and journal.append(b"child batch")
+            and journal.directory != str(tmp_path / "spill")
+        )
+
+    try:
+        assert run_in_child(check) == 0
+        # The child journaled elsewhere; the parent's segment only holds its own batch
+        sent = []
+        journal.drain(lambda payload: sent.append(payload) or True)
+        assert sent == [b"parent batch"]
+    finally:
+        journal.close()
+        exporter.shutdown()
+        _log_buffer.seek(0)
+        _log_buffer.truncate()
+
+
+def test_child_journal_is_adopted_after_the_child_exits(tmp_path):
+    directory = str(tmp_path / "spill")
+    journal = SpillJournal(directory, max_bytes=1024 * 1024, segment_size=64 * 1024)
+    journal.append(b"parent batch")
+
+    def check():
+        return journal.append(b"child batch") and os.path.dirname(journal.directory) == os.path.join(directory, "forks")
+
+    try:
+        assert run_in_child(check) == 0
+    finally:
+        journal.close()
+
+    reopened = SpillJournal(directory, max_bytes=1024 * 1024, segment_size=64 * 1024)
+    try:
+        sent = []
+        reopened.drain(lambda payload: sent.append(payload) or True)
+        assert sent == [b"parent batch", b"child batch"]
+        assert os.listdir(os.path.join(directory, "forks")) == []
+    finally:
+        reopened.close()
@@ -0,0 +1,80 @@
+"""
+Unit tests for head sampling and per-kind rate limits.
+"""
+
+from unittest.mock import patch
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.sdk.decorators.utility import _record_entity_input
+from agentops.sdk.sampling import AgentOpsSampler, TokenBucket
+from agentops.semconv.span_attributes import SpanAttributes
+from agentops.semconv.span_kinds import SpanKind
+
+
+def _tracer(sampler):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=sampler)
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider.get_tracer("test"), exporter
+
+
+def test_ratio_samples_whole_traces():
+    tracer, exporter = _tracer(AgentOpsSampler(ratio=0.5))
+
+    for _ in range(400):
+        with tracer.start_as_current_span("root"):
+            tracer.start_span("child").end()
+
+    spans = exporter.get_finished_spans()
+    roots = [s for s in spans if s.name == "root"]
+    assert 120 < len(roots) < 280
+    # Children follow their parent's decision
+    assert len(spans) == 2 * len(roots)
+
+
+def test_rate_limit_by_name_prefix_and_kind():
+    sampler = AgentOpsSampler(rate_limits={"openai": 0.001, SpanKind.TOOL: "0.001"})
+    tracer, exporter = _tracer(sampler)
+
+    for _ in range(10):
+        tracer.start_span("openai.chat").end()
+        tracer.start_span("search.tool", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.TOOL}).end()
+        tracer.start_span("anthropic.messages").end()
+
+    names = [s.name for s in exporter.get_finished_spans()]
+    # One token of burst each, then the limits hold
+    assert names.count("openai.chat") == 1
+    assert names.count("search.tool") == 1
+    assert names.count("anthropic.messages") == 10
+
+
+def test_sessions_are_never_rate_limited():
+    tracer, exporter = _tracer(AgentOpsSampler(rate_limits={SpanKind.SESSION: 0.001}))
+
+    for _ in range(5):
+        tracer.start_span("run.session", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.SESSION}).end()
+
+    assert len(exporter.get_finished_spans()) == 5
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=10, burst=1)
+    with patch("agentops.sdk.sampling.time.monotonic", side_effect=[0.0, 0.05, 0.1]):
+        bucket._updated = 0.0
+        assert bucket.take()
+        assert not bucket.take()
+        assert bucket.take()
+
+
+def test_unsampled_span_skips_serialization():
+    tracer, _ = _tracer(AgentOpsSampler(ratio=0.0))
+    span = tracer.start_span("dropped")
+
+    with patch("agentops.sdk.decorators.utility.safe_serialize_capped") as serialize:
+        _record_entity_input(span, ("arg",), {})
+
+    assert not span.is_recording()
+    serialize.assert_not_called()
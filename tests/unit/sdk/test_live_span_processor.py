@@ -0,0 +1,105 @@
+"""
+Unit tests for the LiveSpanProcessor.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+
+from agentops.sdk.processors import LiveSpanProcessor
+from agentops.semconv.core import CoreAttributes
+
+
+@pytest.fixture
+def live_processor():
+    exporter = MagicMock()
+    # Drive in-flight ticks manually instead of waiting on the background thread
+    processor = LiveSpanProcessor(exporter, export_interval=3600)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    yield processor, exporter, provider.get_tracer("test")
+    processor.shutdown()
+
+
+def _exported_names(exporter):
+    return [span.name for call in exporter.export.call_args_list for span in call.args[0]]
+
+
+def test_in_flight_span_is_exported_once_until_changed(live_processor):
+    processor, exporter, tracer = live_processor
+    span = tracer.start_span("work")
+
+    processor._export_changed_spans()
+    processor._export_changed_spans()
+    assert _exported_names(exporter) == ["work"]
+    assert exporter.export.call_args.args[0][0].attributes[CoreAttributes.IN_FLIGHT] is True
+
+    span.set_attribute("progress", 1)
+    processor._export_changed_spans()
+    assert _exported_names(exporter) == ["work", "work"]
+
+    span.add_event("checkpoint")
+    processor._export_changed_spans()
+    assert _exported_names(exporter) == ["work", "work", "work"]
+    span.end()
+
+
+def test_only_changed_spans_are_exported(live_processor):
+    processor, exporter, tracer = live_processor
+    idle = tracer.start_span("idle")
+    busy = tracer.start_span("busy")
+    processor._export_changed_spans()
+    exporter.export.reset_mock()
+
+    busy.set_attribute("step", 2)
+    processor._export_changed_spans()
+
+    assert _exported_names(exporter) == ["busy"]
+    idle.end()
+    busy.end()
+
+
+def test_ended_span_is_exported_and_forgotten(live_processor):
+    processor, exporter, tracer = live_processor
+    span = tracer.start_span("work")
+    processor._export_changed_spans()
+    span.end()
+    assert processor.force_flush()
+
+    assert not any(shard.spans or shard.fingerprints for shard in processor._shards)
+    assert _exported_names(exporter) == ["work", "work"]
+
+
+def test_on_end_does_not_export_on_caller_thread(live_processor):
+    processor, exporter, tracer = live_processor
+    caller = threading.current_thread()
+    export_threads = []
+    exporter.export.side_effect = lambda spans: export_threads.append(threading.current_thread())
+
+    for i in range(50):
+        tracer.start_span(f"span-{i}").end()
+    assert processor.force_flush()
+
+    assert len(_exported_names(exporter)) == 50
+    assert caller not in export_threads
+
+
+def test_concurrent_spans_are_tracked(live_processor):
+    processor, exporter, tracer = live_processor
+
+    def worker():
+        spans = [tracer.start_span("work") for _ in range(100)]
+        for span in spans:
+            span.end()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert processor.force_flush()
+
+    assert not any(shard.spans for shard in processor._shards)
+    assert len(_exported_names(exporter)) == 800
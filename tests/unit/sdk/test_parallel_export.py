@@ -0,0 +1,85 @@
+"""
+Unit tests for the ParallelSpanProcessor.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExportResult
+
+from agentops.sdk.processors import ParallelSpanProcessor
+
+
+def _make_processor(exporter, workers=4):
+    processor = ParallelSpanProcessor(
+        exporter,
+        lambda span_exporter, worker: BatchSpanProcessor(span_exporter, schedule_delay_millis=3600_000),
+        workers=workers,
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return processor, provider.get_tracer("test")
+
+
+def test_traces_keep_their_order_on_one_worker():
+    exporter = MagicMock()
+    exporter.export.return_value = SpanExportResult.SUCCESS
+    processor, tracer = _make_processor(exporter)
+
+    for t in range(20):
+        with tracer.start_as_current_span(f"trace-{t}"):
+            for i in range(5):
+                tracer.start_span(f"trace-{t}-{i}").end()
+    assert processor.force_flush()
+    processor.shutdown()
+
+    per_trace = {}
+    for call in exporter.export.call_args_list:
+        for span in call.args[0]:
+            per_trace.setdefault(span.context.trace_id, []).append(span.name)
+    assert len(per_trace) == 20
+    for names in per_trace.values():
+        prefix = names[-1]
+        assert names == [f"{prefix}-{i}" for i in range(5)] + [prefix]
+
+
+def test_workers_export_concurrently():
+    in_flight = threading.Semaphore(0)
+    release = threading.Event()
+    exporter = MagicMock()
+
+    def slow_export(spans):
+        in_flight.release()
+        release.wait(5)
+        return SpanExportResult.SUCCESS
+
+    exporter.export.side_effect = slow_export
+    processor, tracer = _make_processor(exporter, workers=2)
+
+    # Find one trace per worker, then flush both while the exporter is blocked
+    routed = set()
+    while len(routed) < 2:
+        span = tracer.start_span("span")
+        routed.add(span.context.trace_id % 2)
+        span.end()
+    flush = threading.Thread(target=processor.force_flush)
+    flush.start()
+
+    assert in_flight.acquire(timeout=5)
+    assert in_flight.acquire(timeout=5)
+    release.set()
+    flush.join()
+    processor.shutdown()
+
+
+def test_shared_exporter_is_shut_down_once():
+    exporter = MagicMock()
+    exporter.export.return_value = SpanExportResult.SUCCESS
+    processor, tracer = _make_processor(exporter)
+
+    tracer.start_span("last").end()
+    processor.shutdown()
+
+    exporter.shutdown.assert_called_once()
+    assert [s.name for c in exporter.export.call_args_list for s in c.args[0]] == ["last"]
@@ -0,0 +1,212 @@
+"""
+Unit tests for the disk spill journal and SpillingBatchSpanProcessor.
+"""
+
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.sdk.processors import SpillingBatchSpanProcessor
+from agentops.sdk import spill
+from agentops.sdk.spill import REJECTED, SpanSpiller, SpillingSpanExporter, SpillJournal, claim_spill_directory
+
+
+class TestSpillJournal:
+    def test_drain_returns_records_oldest_first(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), segment_size=1024)
+        for i in range(5):
+            assert journal.append(f"batch-{i}".encode())
+
+        received = []
+        sent = journal.drain(lambda payload: received.append(payload) or True)
+
+        assert sent == 5
+        assert received == [f"batch-{i}".encode() for i in range(5)]
+        assert len(journal) == 0
+
+    def test_failed_send_keeps_record(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), segment_size=1024)
+        journal.append(b"payload")
+
+        assert journal.drain(lambda payload: False) == 0
+        assert journal.drain(lambda payload: True) == 1
+        assert journal.drain(lambda payload: True) == 0
+
+    def test_rolls_over_to_new_segments(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), segment_size=128)
+        for _ in range(10):
+            journal.append(b"x" * 50)
+
+        assert len(list(tmp_path.glob("*.seg"))) > 1
+        assert journal.drain(lambda payload: True) == 10
+        # Drained segments are removed, only the active one is kept
+        assert len(list(tmp_path.glob("*.seg"))) == 1
+
+    def test_evicts_oldest_segments_over_limit(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), max_bytes=512, segment_size=128)
+        for i in range(20):
+            journal.append(bytes([i]) * 50)
+
+        assert journal.disk_usage <= 512
+        assert journal.evicted_segments > 0
+
+        received = []
+        journal.drain(lambda payload: received.append(payload) or True)
+        # The newest batch always survives eviction
+        assert received[-1] == bytes([19]) * 50
+        assert bytes([0]) * 50 not in received
+
+    def test_recovers_segments_from_directory(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), segment_size=1024)
+        journal.append(b"first")
+        journal.append(b"second")
+        journal.drain(lambda payload: True, max_records=1)
+        journal.close()
+
+        recovered = SpillJournal(str(tmp_path), segment_size=1024)
+        received = []
+        recovered.drain(lambda payload: received.append(payload) or True)
+        assert received == [b"second"]
+
+    def test_refused_record_is_dropped_after_max_rejections(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), segment_size=1024, max_rejections=2)
+        journal.append(b"invalid")
+        journal.append(b"valid")
+        received = []
+
+        def send(payload):
+            if payload == b"invalid":
+                return REJECTED
+            received.append(payload)
+            return True
+
+        assert journal.drain(send) == 0
+        assert journal.drain(send) == 1
+        assert received == [b"valid"]
+        assert journal.rejected_records == 1
+        assert len(journal) == 0
+
+    def test_rejects_payload_larger_than_limit(self, tmp_path):
+        journal = SpillJournal(str(tmp_path), max_bytes=256, segment_size=128)
+        assert not journal.append(b"x" * 1024)
+
+
+@pytest.mark.skipif(spill.fcntl is None, reason="requires fcntl")
+class TestClaimSpillDirectory:
+    @pytest.fixture(autouse=True)
+    def release_claims(self):
+        yield
+        for lock_file in spill._claimed.values():
+            lock_file.close()
+        spill._claimed.clear()
+
+    def _exit(self, directory):
+        """Release a claim as if its process had exited."""
+        spill._claimed.pop(directory).close()
+
+    def test_journal_of_exited_process_is_recovered(self, tmp_path):
+        root = str(tmp_path)
+        directory = claim_spill_directory(root)
+        assert claim_spill_directory(root) == directory
+        journal = SpillJournal(directory, segment_size=1024)
+        journal.append(b"undelivered")
+        journal.close()
+        self._exit(directory)
+
+        assert claim_spill_directory(root) == directory
+        received = []
+        SpillJournal(directory, segment_size=1024).drain(lambda payload: received.append(payload) or True)
+        assert received == [b"undelivered"]
+
+    def test_directories_in_use_are_skipped(self, tmp_path):
+        busy = tmp_path / "busy"
+        busy.mkdir()
+        # A separate open file description stands in for another running process
+        with open(busy / ".lock", "a") as held:
+            spill.fcntl.flock(held.fileno(), spill.fcntl.LOCK_EX)
+            directory = claim_spill_directory(str(tmp_path))
+        assert directory == os.path.join(str(tmp_path), str(os.getpid()))
+
+
+def test_refused_batch_is_not_spilled(tmp_path):
+    exporter = MagicMock()
+    exporter.export.return_value = SpanExportResult.FAILURE
+    exporter.last_export_rejected.return_value = True
+    journal = SpillJournal(str(tmp_path), segment_size=1024)
+    spilling = SpillingSpanExporter(exporter, SpanSpiller(journal, exporter))
+    span = TracerProvider().get_tracer("test").start_span("span")
+    span.end()
+
+    assert spilling.export([span]) is SpanExportResult.FAILURE
+    assert len(journal) == 0
+
+
+class TestSpillingBatchSpanProcessor:
+    def _make_processor(self, tmp_path, exporter, **kwargs):
+        processor = SpillingBatchSpanProcessor(
+            exporter,
+            SpillJournal(str(tmp_path)),
+            endpoint="https://otlp.agentops.ai/v1/traces",
+            schedule_delay_millis=60_000,
+            **kwargs,
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        return processor, provider.get_tracer("test")
+
+    def test_failed_export_is_spilled(self, tmp_path):
+        exporter = MagicMock()
+        exporter.export.return_value = SpanExportResult.FAILURE
+        processor, tracer = self._make_processor(tmp_path, exporter)
+        processor.drain = MagicMock(return_value=0)
+
+        with tracer.start_as_current_span("span"):
+            pass
+        processor.force_flush()
+
+        exporter.export.assert_called_once()
+        assert len(processor.journal) == 1
+        processor.shutdown()
+
+    def test_queue_overflow_is_spilled(self, tmp_path):
+        # Hold the export worker so the in-memory queue stays full
+        release = threading.Event()
+        exporter = MagicMock()
+        exporter.export.side_effect = lambda spans: release.wait(5) and SpanExportResult.SUCCESS
+        processor, tracer = self._make_processor(tmp_path, exporter, max_queue_size=2, max_export_batch_size=2)
+        processor.drain = MagicMock(return_value=0)
+        processor.spill = MagicMock(wraps=processor.spill)
+
+        for i in range(5):
+            with tracer.start_as_current_span(f"span-{i}"):
+                pass
+
+        # Two spans fit in memory, the rest went to disk
+        assert processor._pending == 2
+        release.set()
+        processor.force_flush()
+
+        exported = sum(len(call.args[0]) for call in exporter.export.call_args_list)
+        spilled = sum(len(call.args[0]) for call in processor.spill.call_args_list)
+        assert exported == 2
+        assert spilled == 3
+        processor.shutdown()
+
+    def test_successful_export_drains_journal(self, tmp_path):
+        exporter = MagicMock()
+        exporter.export.return_value = SpanExportResult.SUCCESS
+        processor, tracer = self._make_processor(tmp_path, exporter)
+        processor.journal.append(b"spilled")
+        processor.spiller.send = MagicMock(return_value=True)
+
+        with tracer.start_as_current_span("span"):
+            pass
+        processor.force_flush()
+
+        processor.spiller.send.assert_called_once_with(b"spilled")
+        assert len(processor.journal) == 0
+        processor.shutdown()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the TailSamplingSpanProcessor.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace import Status, StatusCode
+
+from agentops.sdk.sampling import TailSamplingSpanProcessor
+from agentops.semconv.span_attributes import SpanAttributes
+from agentops.semconv.span_kinds import SpanKind
+
+SESSION = {SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.SESSION}
+
+
+@pytest.fixture
+def sampling():
+    downstream = MagicMock()
+    processor = TailSamplingSpanProcessor(downstream, sample_rate=0.0, token_threshold=1000)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return processor, downstream, provider.get_tracer("test")
+
+
+def _kept(downstream):
+    return [call.args[0].name for call in downstream.on_end.call_args_list]
+
+
+def _run_session(tracer, child_attributes=None, child_status=None):
+    with tracer.start_as_current_span("session", attributes=SESSION):
+        with tracer.start_as_current_span("llm", attributes=child_attributes or {}) as child:
+            if child_status is not None:
+                child.set_status(child_status)
+
+
+def test_spans_are_held_until_session_ends():
+    downstream = MagicMock()
+    provider = TracerProvider()
+    provider.add_span_processor(TailSamplingSpanProcessor(downstream, sample_rate=1.0))
+    tracer = provider.get_tracer("test")
+
+    with tracer.start_as_current_span("session", attributes=SESSION):
+        tracer.start_span("llm").end()
+        assert _kept(downstream) == []
+
+    assert _kept(downstream) == ["llm", "session"]
+
+
+def test_uneventful_session_is_dropped(sampling):
+    processor, downstream, tracer = sampling
+
+    _run_session(tracer)
+
+    assert _kept(downstream) == []
+    assert processor.dropped_traces == 1
+
+
+def test_errored_session_is_kept(sampling):
+    processor, downstream, tracer = sampling
+
+    _run_session(tracer, child_status=Status(StatusCode.ERROR, "boom"))
+
+    assert _kept(downstream) == ["llm", "session"]
+
+
+def test_expensive_session_is_kept(sampling):
+    processor, downstream, tracer = sampling
+
+    _run_session(tracer, child_attributes={SpanAttributes.LLM_USAGE_TOTAL_TOKENS: 5000})
+
+    assert _kept(downstream) == ["llm", "session"]
+
+
+def test_slow_session_is_kept(sampling):
+    processor, downstream, tracer = sampling
+    processor.latency_threshold_millis = 0
+
+    _run_session(tracer)
+
+    assert _kept(downstream) == ["llm", "session"]
+
+
+def test_late_spans_follow_the_decision(sampling):
+    processor, downstream, tracer = sampling
+
+    session = tracer.start_span("session", attributes=SESSION)
+    late = tracer.start_span("late", context=trace.set_span_in_context(session))
+    session.set_status(Status(StatusCode.ERROR))
+    session.end()
+    late.end()
+
+    assert _kept(downstream) == ["session", "late"]
+
+
+def test_rate_keeps_a_fraction_of_uneventful_sessions():
+    downstream = MagicMock()
+    processor = TailSamplingSpanProcessor(downstream, sample_rate=0.25)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+
+    for _ in range(2000):
+        tracer.start_span("session", attributes=SESSION).end()
+
+    assert 400 < processor.kept_traces < 600
@@ -84,3 +84,49 @@ def test_config_override_env(mock_env, valid_uuid):
 
 def test_invalid_api_key():
     """Test handling of invalid API key raises InvalidApiKeyException"""
+
+
+def test_disabled_init_is_a_no_op():
+    """Test that a disabled client neither needs an API key nor initializes tracing"""
+    from agentops.sdk.decorators import factory
+
+    os.environ.pop("AGENTOPS_API_KEY")
+    os.environ["AGENTOPS_DISABLED"] = "true"
+    client = Client()
+    try:
+        with mock.patch("agentops.client.client.TracingCore") as tracing_core:
+            assert client.init() is None
+        tracing_core.initialize_from_config.assert_not_called()
+        assert client.config.disabled is True
+        assert factory._disabled is True
+    finally:
+        factory.set_decorators_disabled(False)
+
+
+def test_background_auth_does_not_wait_for_the_token():
+    """Test that init() returns before the token is fetched and hands it to tracing afterwards"""
+    import threading
+
+    os.environ["AGENTOPS_BACKGROUND_AUTH"] = "true"
+    release = threading.Event()
+
+    def fetch_auth_token(api_key):
+        release.wait(5)
+        return {"token": "jwt", "project_id": "project"}
+
+    client = Client()
+    with mock.patch("agentops.client.client.TracingCore") as tracing_core, mock.patch(
+        "agentops.client.client.ApiClient"
+    ) as api_client:
+        api_client.return_value.v3.fetch_auth_token.side_effect = fetch_auth_token
+        client.init()
+
+        tracing_core.initialize_from_config.assert_called_once()
+        assert "jwt" not in tracing_core.initialize_from_config.call_args.kwargs
+        tracing_core.get_instance.return_value.authenticate.assert_not_called()
+
+        release.set()
+        assert client.wait_for_auth(timeout=5)
+
+    tracing_core.get_instance.return_value.authenticate.assert_called_once_with("jwt", "project")
+    api_client.return_value.v4.set_auth_token.assert_called_once_with("jwt")
@@ -6,6 +6,7 @@ from datetime import datetime
 from decimal import Decimal
 from enum import Enum, auto
 from typing import Dict, List, Optional
+from unittest.mock import patch
 
 import pytest
 from pydantic import BaseModel
@@ -15,7 +16,14 @@ from agentops.helpers.serialization import (
     filter_unjsonable,
     is_jsonable,
     model_to_dict,
+    register_model_schema,
     safe_serialize,
+    safe_serialize_capped,
+    set_json_backend,
+    TRUNCATION_MARKER,
+    orjson,
+    _MODEL_CONVERTERS,
+    _MODEL_SCHEMAS,
 )
 
 
@@ -186,6 +194,127 @@ class TestSafeSerialize:
         assert result == '"Unserializable object"'
 
 
+class TestIsJsonable:
+    def test_type_dispatch(self):
+        """Test that jsonability is decided from types alone."""
+        assert is_jsonable({"a": [1, 2.5, None, True, ("x",)], 1: "int key"})
+        assert not is_jsonable({"a": {1, 2}})
+        assert not is_jsonable([uuid.uuid4()])
+        assert not is_jsonable({("tuple", "key"): 1})
+
+    def test_circular_reference(self):
+        """Test that circular structures are reported as not jsonable."""
+        loop = []
+        loop.append(loop)
+        assert not is_jsonable(loop)
+
+    def test_filter_unjsonable(self):
+        """Test that unjsonable leaves are blanked and UUIDs stringified."""
+        uid = uuid.UUID("00000000-0000-0000-0000-000000000001")
+        assert filter_unjsonable({"a": [1, uid, object()], "b": {"c": {1, 2}}, "d": (1, 2)}) == {
+            "a": [1, str(uid), ""],
+            "b": {"c": ""},
+            "d": (1, 2),
+        }
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+class TestJsonBackends:
+    @pytest.fixture(autouse=True)
+    def restore_backend(self):
+        yield
+        set_json_backend("json")
+
+    def test_backends_agree(self):
+        """Test that the native backend produces the same values as the json module."""
+        obj = {
+            "text": "line 1\nline 2 \u00e9",
+            "numbers": [1, 2.5, 2**70],
+            1: None,
+            "when": datetime(2023, 1, 1, 12, 0, 0),
+            "id": uuid.UUID("00000000-0000-0000-0000-000000000001"),
+            "amount": Decimal("123.45"),
+            "enum": SampleEnum.THREE,
+            "to_json": ModelWithToJson({"key": "value"}),
+            "model": SimpleModel("value"),
+        }
+
+        assert set_json_backend("json") == "json"
+        expected = json.loads(safe_serialize(obj))
+        assert set_json_backend("orjson") == "orjson"
+        assert json.loads(safe_serialize(obj)) == expected
+
+    def test_unknown_backend_falls_back_to_json(self):
+        assert set_json_backend("missing") == "json"
+
+
+class TestSafeSerializeCapped:
+    def test_matches_safe_serialize_within_budget(self):
+        """Test that small objects serialize exactly like safe_serialize."""
+        test_cases = [
+            {"key": "value", "list": [1, 2.5, None, True], 1: "int key"},
+            [uuid.UUID("00000000-0000-0000-0000-000000000001"), datetime(2023, 1, 1), Decimal("1.5")],
+            PydanticV2Model(name="test", value=42),
+            SampleEnum.THREE,
+            "plain string",
+            "line 1\nline 2 \u00e9",
+        ]
+
+        for input_obj in test_cases:
+            if isinstance(input_obj, str):
+                assert safe_serialize_capped(input_obj) == input_obj
+            else:
+                assert json.loads(safe_serialize_capped(input_obj)) == json.loads(safe_serialize(input_obj))
+
+    def test_output_is_bounded_and_valid(self):
+        """Test that oversized payloads are cut at the budget and stay valid JSON."""
+        huge = {"doc": "x" * 10_000_000, "rows": list(range(100_000))}
+
+        result = safe_serialize_capped(huge, max_bytes=1000)
+
+        assert len(result) < 1100
+        parsed = json.loads(result)
+        assert parsed["doc"].endswith(TRUNCATION_MARKER)
+        assert "rows" not in parsed
+
+    def test_collection_and_depth_caps(self):
+        """Test that long collections and deep nesting are truncated with a marker."""
+        result = json.loads(safe_serialize_capped(list(range(50)), max_items=10))
+        assert result[:10] == list(range(10))
+        assert result[10] == f"{TRUNCATION_MARKER} 40 more items"
+
+        nested = current = {}
+        for _ in range(10):
+            current["child"] = {}
+            current = current["child"]
+        result = json.loads(safe_serialize_capped(nested, max_depth=3))
+        assert result["child"]["child"]["child"] == f"{TRUNCATION_MARKER} max depth"
+
+    def test_small_values_use_the_native_encoder(self):
+        """Test that values within the caps are encoded by the JSON backend, not the budgeted encoder."""
+        rows = [{"id": i, "name": f"row {i}"} for i in range(200)]
+        with patch("agentops.helpers.serialization._BudgetedEncoder") as budgeted:
+            assert safe_serialize_capped(rows) == json.dumps(rows)
+        budgeted.assert_not_called()
+
+    def test_oversized_value_is_never_fully_encoded(self):
+        """Test that a value too large for the budget skips the native encoder, however deep the excess lies."""
+        rows = [{"id": i} for i in range(300)] + [{"doc": "x" * 10_000}]
+
+        with patch("agentops.helpers.serialization._serialize") as native:
+            result = safe_serialize_capped(rows, max_bytes=5000)
+        native.assert_not_called()
+
+        assert len(result) < 5100
+        assert TRUNCATION_MARKER in result
+        json.loads(result)
+
+    def test_long_top_level_string_is_cut(self):
+        """Test that top-level strings are only truncated when over budget."""
+        assert safe_serialize_capped("short", max_bytes=10) == "short"
+        assert safe_serialize_capped("x" * 20, max_bytes=10) == "x" * 10 + TRUNCATION_MARKER
+
+
 class TestModelToDict:
     def test_none_returns_empty_dict(self):
         """Test that None returns an empty dict."""
@@ -215,4 +344,58 @@ class TestModelToDict:
     def test_dict_fallback(self):
         """Test fallback to __dict__."""
         simple_model = SimpleModel("test value")
-        assert model_to_dict(simple_model) == {"value": "test value"}
\ No newline at end of file
+        assert model_to_dict(simple_model) == {"value": "test value"}
+
+
+class TestModelSchemas:
+    @pytest.fixture(autouse=True)
+    def clear_schemas(self):
+        yield
+        _MODEL_SCHEMAS.clear()
+        _MODEL_CONVERTERS.clear()
+
+    def test_conversion_resolved_once_per_class(self):
+        """Test that the conversion of a model class is cached."""
+        model_to_dict(PydanticV2Model(name="a"))
+        assert PydanticV2Model in _MODEL_CONVERTERS
+        assert model_to_dict(PydanticV2Model(name="b")) == {"name": "b"}
+
+    def test_cached_conversion_does_not_keep_class_alive(self):
+        """Test that classes created at runtime can be collected once converted."""
+        import gc
+        import weakref
+
+        from pydantic import create_model
+
+        Dynamic = create_model("Dynamic", name=(str, ...))
+        model_to_dict(Dynamic(name="a"))
+        assert Dynamic in _MODEL_CONVERTERS
+        collected = weakref.ref(Dynamic)
+        del Dynamic
+        gc.collect()
+        assert collected() is None
+
+    def test_pydantic_include_exclude(self):
+        """Test that registered field selections are passed to pydantic."""
+
+        class Response(BaseModel):
+            id: str
+            content: str
+            raw: Optional[Dict] = None
+
+        class StreamedResponse(Response):
+            pass
+
+        register_model_schema(Response, exclude=["raw"])
+        response = StreamedResponse(id="1", content="hi", raw={"big": "payload"})
+        assert model_to_dict(response) == {"id": "1", "content": "hi"}
+
+        register_model_schema(StreamedResponse, include=["id"])
+        assert json.loads(safe_serialize(response)) == {"id": "1"}
+
+    def test_dict_fallback_include(self):
+        """Test that field selections apply to plain objects."""
+        obj = SimpleModel("kept")
+        obj.secret = "dropped"
+        register_model_schema(SimpleModel, include=["value"])
+        assert model_to_dict(obj) == {"value": "kept"}
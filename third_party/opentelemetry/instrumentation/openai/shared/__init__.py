@@ -26,6 +26,10 @@ PROMPT_FILTER_KEY = "prompt_filter_results"
 PROMPT_ERROR = "prompt_error"
 
 _PYDANTIC_VERSION = version("pydantic")
+_PYDANTIC_V1 = _PYDANTIC_VERSION < "2.0.0"
+
+# model_as_dict conversion per response class
+_model_as_dict_converters = {}
 
 # tiktoken encodings map for different model, key is model_name, value is tiktoken encoding
 tiktoken_encodings = {}
@@ -214,17 +218,33 @@ def is_streaming_response(response):
     return isinstance(response, types.GeneratorType) or isinstance(response, types.AsyncGeneratorType)
 
 
-def model_as_dict(model):
-    if isinstance(model, dict):
-        return model
-    if _PYDANTIC_VERSION < "2.0.0":
-        return model.dict()
-    if hasattr(model, "model_dump"):
-        return model.model_dump()
-    elif hasattr(model, "parse"):  # Raw API response
-        return model_as_dict(model.parse())
+def _identity(model):
+    return model
+
+
+def _resolve_model_as_dict(target):
+    if isinstance(target, dict) or (isinstance(target, type) and issubclass(target, dict)):
+        return _identity
+    if _PYDANTIC_V1:
+        return lambda model: model.dict()
+    if hasattr(target, "model_dump"):
+        return lambda model: model.model_dump()
+    elif hasattr(target, "parse"):  # Raw API response
+        return lambda model: model_as_dict(model.parse())
     else:
-        return model
+        return _identity
+
+
+def model_as_dict(model):
+    # The conversion depends only on the type, so it is resolved once per class;
+    # objects resolving attributes dynamically are inspected every time
+    cls = type(model)
+    converter = _model_as_dict_converters.get(cls)
+    if converter is None:
+        if hasattr(cls, "__getattr__"):
+            return _resolve_model_as_dict(model)(model)
+        converter = _model_as_dict_converters[cls] = _resolve_model_as_dict(cls)
+    return converter(model)
 
 
 def get_token_count_from_string(string: str, model_name: str):